@@ -150,6 +150,22 @@ class BarcodeResult:
         self.x4: float = x4
         self.y4: float = y4
 
+    def toDict(self) -> dict:
+        """
+        Convert the result to a JSON-serializable dictionary.
+        
+        Returns:
+            dict: The barcode text, format and the four corner coordinates.
+        """
+        return {
+            "text": self.text,
+            "format": self.format,
+            "x1": self.x1, "y1": self.y1,
+            "x2": self.x2, "y2": self.y2,
+            "x3": self.x3, "y3": self.y3,
+            "x4": self.x4, "y4": self.y4,
+        }
+
 class BarcodeReader:
     """
     Main barcode reader class providing both synchronous and asynchronous barcode detection.
@@ -240,12 +256,12 @@ class BarcodeReader:
             self.receiver = None
         self.cvr_instance.stop_capturing()
         
-    def decode(self, input: Union[str, ImageData]) -> List[BarcodeResult]:
+    def decode(self, input: Union[str, bytes, ImageData]) -> List[BarcodeResult]:
         """
         Core decode method that handles various input types.
         
         Args:
-            input: Can be a file path (str), ImageData object, or other
+            input: Can be a file path (str), file content (bytes), ImageData object, or other
                   supported input format for barcode detection.
         
         Returns:
@@ -285,6 +301,23 @@ class BarcodeReader:
         """
         return self.decode(file_path)
     
+    def decodeFileStream(self, data: bytes) -> List[BarcodeResult]:
+        """
+        Decode barcodes from an encoded image file held in memory.
+        
+        Args:
+            data (bytes): Content of an image file (JPEG, PNG, BMP, ...),
+                         e.g. an HTTP upload or a file read with open(..., 'rb').
+        
+        Returns:
+            list: List of BarcodeResult objects for all detected barcodes.
+        
+        Example:
+            with open("barcode.jpg", "rb") as f:
+                results = reader.decodeFileStream(f.read())
+        """
+        return self.decode(data)
+    
     def decodeMat(self, mat: np.ndarray) -> List[BarcodeResult]:
         """
         Decode barcodes from an OpenCV image matrix.
@@ -458,3 +491,7 @@ def wrapImageData(width: int, height: int, stride: int, pixel_format: EnumImageP
     """
     imagedata = ImageData(bytes, width, height, stride, pixel_format)
     return imagedata
+
+from .pool import ReaderPool
+from .ensemble import EnsembleReader, EnsembleResult, DynamsoftEngine, ZXingEngine
+from .dedup import FrameDeduplicator, dHash, pHash, hammingDistance
@@ -0,0 +1,372 @@
+"""
+Watch-folder ingestion daemon.
+
+Polls one or more directories for new images, waits until each file has stopped
+changing (so partially written scans are not decoded), decodes the files on a
+ReaderPool and appends the results to a JSONL file or an sqlite database. The
+output doubles as the checkpoint: every file is identified by its path, size
+and modification time, and files already present in the output are skipped
+after a restart.
+
+When every reader is busy and the pool queue is full, intake pauses until a
+slot frees up; files that were not submitted are picked up again on the next
+scan.
+
+Example:
+    python -m barcodeQrSDK.daemon /srv/scans/inbox -o results.jsonl -l YOUR_LICENSE_KEY
+    barcodedaemon /srv/scans/a /srv/scans/b -o results.db --workers 8
+"""
+
+import argparse
+import json
+import os
+import queue
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import barcodeQrSDK
+from .dedup import FrameDeduplicator
+from .pool import ReaderPool
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff", ".gif"}
+SQLITE_EXTENSIONS = {".db", ".sqlite", ".sqlite3"}
+
+FileKey = Tuple[str, int, int]
+
+
+class JsonlSink:
+    """
+    Append-only JSONL result store.
+
+    Each line holds one decoded file. Lines are flushed and fsynced in batches,
+    and a line torn by a crash is ignored (and its file decoded again) on the
+    next start.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.done: Set[FileKey] = set()
+        needsNewline = False
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    needsNewline = not line.endswith(b"\n")
+                    try:
+                        record = json.loads(line)
+                        self.done.add((record["path"], record["size"], record["mtime_ns"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        self._file = open(path, "a", encoding="utf-8")
+        if needsNewline:
+            self._file.write("\n")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.done.add((record["path"], record["size"], record["mtime_ns"]))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SqliteSink:
+    """
+    sqlite result store with one row per decoded file.
+
+    Batches are written in a single transaction, so a crash loses at most the
+    batch that was being committed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # Opened by the caller, then written from the thread that runs the daemon
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=FULL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " path TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,"
+            " decoded_at REAL, latency_ms REAL, error TEXT, barcodes TEXT,"
+            " PRIMARY KEY (path, size, mtime_ns))"
+        )
+        self._db.commit()
+        self.done: Set[FileKey] = set(self._db.execute("SELECT path, size, mtime_ns FROM results"))
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (r["path"], r["size"], r["mtime_ns"], r["decoded_at"], r["latency_ms"],
+                     r["error"], json.dumps(r["barcodes"], ensure_ascii=False))
+                    for r in records
+                ],
+            )
+        for r in records:
+            self.done.add((r["path"], r["size"], r["mtime_ns"]))
+
+    def close(self) -> None:
+        self._db.close()
+
+
+def openSink(path: str):
+    """
+    Open the result store for a path, choosing sqlite for .db/.sqlite/.sqlite3
+    and JSONL for anything else.
+    """
+    if os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS:
+        return SqliteSink(path)
+    return JsonlSink(path)
+
+
+class FolderWatcher:
+    """
+    Polling directory scanner with write debouncing.
+
+    A file is reported as ready once its size and modification time have been
+    unchanged for at least ``settle`` seconds.
+    """
+
+    def __init__(self, directories: Iterable[str], recursive: bool = False,
+                 extensions: Iterable[str] = IMAGE_EXTENSIONS, settle: float = 1.0) -> None:
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.recursive = recursive
+        self.extensions = {e.lower() for e in extensions}
+        self.settle = settle
+        # path -> (size, mtime_ns, time the signature was first seen)
+        self._seen: Dict[str, Tuple[int, int, float]] = {}
+
+    def _scan(self, directory: str) -> Iterable[os.DirEntry]:
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if self.recursive:
+                            yield from self._scan(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in self.extensions:
+                        yield entry
+        except FileNotFoundError:
+            return
+
+    def poll(self) -> List[FileKey]:
+        """
+        Scan the watched directories.
+
+        Returns:
+            list: (path, size, mtime_ns) of every file that is ready to decode.
+        """
+        now = time.monotonic()
+        ready: List[FileKey] = []
+        current: Dict[str, Tuple[int, int, float]] = {}
+        for directory in self.directories:
+            for entry in self._scan(directory):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                previous = self._seen.get(entry.path)
+                if previous and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                    firstSeen = previous[2]
+                else:
+                    firstSeen = now
+                current[entry.path] = (st.st_size, st.st_mtime_ns, firstSeen)
+                if st.st_size > 0 and now - firstSeen >= self.settle:
+                    ready.append((entry.path, st.st_size, st.st_mtime_ns))
+        self._seen = current
+        return ready
+
+
+class IngestionDaemon:
+    """
+    Feeds ready files from a FolderWatcher into a ReaderPool and stores the results.
+    """
+
+    def __init__(self, pool: ReaderPool, sink: Any, watcher: FolderWatcher,
+                 interval: float = 1.0, flushInterval: float = 1.0, batchSize: int = 256,
+                 statsInterval: float = 60.0, deduplicator: Optional[FrameDeduplicator] = None) -> None:
+        self.pool = pool
+        self.deduplicator = deduplicator
+        self.sink = sink
+        self.watcher = watcher
+        self.interval = interval
+        self.flushInterval = flushInterval
+        self.batchSize = batchSize
+        self.statsInterval = statsInterval
+        self.stopEvent = threading.Event()
+        self.processed = 0
+        self._inflight: Set[FileKey] = set()
+        self._completed: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        self._lastFlush = time.monotonic()
+        self._lastStats = time.monotonic()
+        self._lastStatsCount = 0
+
+    def _onDone(self, key: FileKey, submitted: float, future: Future) -> None:
+        record: Dict[str, Any] = {
+            "path": key[0],
+            "size": key[1],
+            "mtime_ns": key[2],
+            "decoded_at": time.time(),
+            "latency_ms": (time.perf_counter() - submitted) * 1000.0,
+            "error": None,
+            "barcodes": [],
+        }
+        err = future.exception()
+        if err is not None:
+            record["error"] = str(err)
+        else:
+            record["barcodes"] = [barcode.toDict() for barcode in future.result()]
+        self._completed.put(record)
+
+    def _flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._completed.qsize() < self.batchSize and now - self._lastFlush < self.flushInterval:
+            return
+        records: List[Dict[str, Any]] = []
+        while True:
+            try:
+                records.append(self._completed.get_nowait())
+            except queue.Empty:
+                break
+        if records:
+            self.sink.write(records)
+            for r in records:
+                self._inflight.discard((r["path"], r["size"], r["mtime_ns"]))
+            self.processed += len(records)
+        self._lastFlush = now
+
+    def _reportStats(self) -> None:
+        now = time.monotonic()
+        if self.statsInterval <= 0 or now - self._lastStats < self.statsInterval:
+            return
+        rate = (self.processed - self._lastStatsCount) * 60.0 / (now - self._lastStats)
+        stats = self.pool.stats()
+        line = (f"processed={self.processed} rate={rate:.0f}/min inflight={len(self._inflight)} "
+                f"busy={stats['busy']}/{stats['size']} queued={stats['queued']}")
+        if self.deduplicator is not None:
+            dedup = self.deduplicator.stats()
+            line += f" skipped={dedup['skip_rate']:.1%} saved={dedup['time_saved_s']:.1f}s"
+        print(line, flush=True)
+        self._lastStats = now
+        self._lastStatsCount = self.processed
+
+    def _intake(self) -> None:
+        for key in self.watcher.poll():
+            if self.stopEvent.is_set():
+                return
+            if key in self.sink.done or key in self._inflight:
+                continue
+            submitted = time.perf_counter()
+            try:
+                # Backpressure: wait briefly for a slot, otherwise leave the
+                # file for the next scan and write out what has finished.
+                method = self.deduplicator.decodeFile if self.deduplicator is not None else "decodeFile"
+                future = self.pool.submit(method, key[0], timeout=self.interval)
+            except queue.Full:
+                self._flush()
+                return
+            self._inflight.add(key)
+            future.add_done_callback(
+                lambda f, key=key, submitted=submitted: self._onDone(key, submitted, f))
+            self._flush()
+
+    def run(self) -> None:
+        """
+        Run until stop() is called, then drain the pool and flush the results.
+        """
+        try:
+            while not self.stopEvent.is_set():
+                self._intake()
+                self._flush()
+                self._reportStats()
+                self.stopEvent.wait(self.interval)
+        finally:
+            self.pool.close(wait=True)
+            self._flush(force=True)
+            self.sink.close()
+
+    def stop(self) -> None:
+        self.stopEvent.set()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command-line entry point for the watch-folder daemon.
+    """
+    parser = argparse.ArgumentParser(description='Watch folders and decode barcodes from new images')
+    parser.add_argument('directories', nargs='+', help='Directories to watch')
+    parser.add_argument('-o', '--output', default='results.jsonl', type=str,
+                        help='Result file: .jsonl, or .db/.sqlite/.sqlite3 for sqlite')
+    parser.add_argument('-l', '--license', default='', type=str, help='Set a valid license key')
+    parser.add_argument('-r', '--recursive', action='store_true', help='Watch subdirectories too')
+    parser.add_argument('-w', '--workers', default=0, type=int, help='Number of readers, or the minimum with --max-workers (default: CPU count)')
+    parser.add_argument('--max-workers', default=0, type=int, help='Autoscale the reader pool up to this many readers')
+    parser.add_argument('--latency-target', default=0.0, type=float, help='p95 latency in ms above which an autoscaling pool grows')
+    parser.add_argument('--idle-timeout', default=30.0, type=float, help='Seconds before an idle reader above the minimum is released')
+    parser.add_argument('--queue', default=None, type=int, help='Files allowed to wait for a reader (default: 2 x max readers)')
+    parser.add_argument('--template', default='', type=str, help='JSON template file applied to every reader')
+    parser.add_argument('--interval', default=1.0, type=float, help='Seconds between directory scans')
+    parser.add_argument('--settle', default=2.0, type=float, help='Seconds a file must stay unchanged before decoding')
+    parser.add_argument('--flush-interval', default=1.0, type=float, help='Seconds between result flushes')
+    parser.add_argument('--stats-interval', default=60.0, type=float, help='Seconds between status lines (0 disables)')
+    parser.add_argument('--dedup-distance', default=-1, type=int,
+                        help='Reuse results of a recent image whose perceptual hash differs by at most this many bits (default: off)')
+    parser.add_argument('--dedup-method', default='dhash', choices=['dhash', 'phash'], help='Perceptual hash for --dedup-distance')
+    parser.add_argument('--extensions', default=','.join(sorted(IMAGE_EXTENSIONS)), type=str,
+                        help='Comma-separated image extensions to pick up')
+    args = parser.parse_args(argv)
+
+    if args.license == '':
+        barcodeQrSDK.initLicense("DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ==")
+    else:
+        barcodeQrSDK.initLicense(args.license)
+
+    parameters = None
+    if args.template:
+        with open(args.template, encoding='utf-8') as f:
+            parameters = f.read()
+
+    extensions = {e if e.startswith('.') else '.' + e for e in args.extensions.split(',') if e}
+    try:
+        sink = openSink(args.output)
+    except (OSError, sqlite3.Error) as err:
+        print(err)
+        sys.exit(1)
+
+    if args.max_workers > 0:
+        pool = ReaderPool(minSize=args.workers or 1, maxSize=args.max_workers, maxQueue=args.queue,
+                          parameters=parameters, idleTimeout=args.idle_timeout,
+                          latencyTarget=args.latency_target / 1000.0 if args.latency_target > 0 else None)
+    else:
+        pool = ReaderPool(size=args.workers or None, maxQueue=args.queue, parameters=parameters)
+    readers = f"{pool.minSize}-{pool.maxSize}" if pool.autoscaling else str(pool.size)
+    watcher = FolderWatcher(args.directories, recursive=args.recursive,
+                            extensions=extensions, settle=args.settle)
+    deduplicator = None
+    if args.dedup_distance >= 0:
+        deduplicator = FrameDeduplicator(maxDistance=args.dedup_distance, method=args.dedup_method)
+    daemon = IngestionDaemon(pool, sink, watcher, interval=args.interval,
+                             flushInterval=args.flush_interval, statsInterval=args.stats_interval,
+                             deduplicator=deduplicator)
+
+    signal.signal(signal.SIGINT, lambda *_: daemon.stop())
+    signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+
+    print(f"Watching {', '.join(watcher.directories)} with {readers} readers "
+          f"({len(sink.done)} files already processed)", flush=True)
+    daemon.run()
+    print(f"Stopped after processing {daemon.processed} files", flush=True)
+    if deduplicator is not None:
+        dedup = deduplicator.stats()
+        print(f"Skipped {dedup['skipped']} duplicates ({dedup['skip_rate']:.1%}), "
+              f"saving about {dedup['time_saved_s']:.1f}s of decoding for {dedup['hash_time_s']:.1f}s of hashing", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Duplicate and near-duplicate frame skipping.
+
+Document scanner feeds often contain the same page several times. A
+FrameDeduplicator computes a 64-bit perceptual hash of every frame (dHash or
+pHash, both pure NumPy on a downsampled grayscale copy) and, when the hash is
+within ``maxDistance`` bits of a recently decoded frame, returns that frame's
+results instead of decoding again.
+
+Example:
+    import barcodeQrSDK
+
+    dedup = barcodeQrSDK.FrameDeduplicator(maxDistance=4)
+    with barcodeQrSDK.ReaderPool() as pool:
+        results = pool.decodeFiles(paths, deduplicator=dedup)
+    print(dedup.stats())
+"""
+
+import collections
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from . import BarcodeReader, BarcodeResult
+
+
+# Frames are strided down to at most this many samples per output cell before
+# the float conversion, so hashing a 20 MP photo touches a few thousand pixels.
+SAMPLES_PER_CELL = 8
+
+
+def _grayscale(mat: np.ndarray) -> np.ndarray:
+    if mat.ndim == 3:
+        # ITU-R BT.601 luma; channel order does not matter much for hashing.
+        return mat[..., :3].astype(np.float32) @ np.array([0.114, 0.587, 0.299], dtype=np.float32)
+    return mat.astype(np.float32)
+
+
+def _downsample(mat: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Area-average an image down to width x height grayscale cells.
+    """
+    stepY = max(1, mat.shape[0] // (height * SAMPLES_PER_CELL))
+    stepX = max(1, mat.shape[1] // (width * SAMPLES_PER_CELL))
+    gray = _grayscale(mat[::stepY, ::stepX])
+    rows = np.linspace(0, gray.shape[0], height + 1).astype(np.intp)
+    cols = np.linspace(0, gray.shape[1], width + 1).astype(np.intp)
+    # Sum row bands, then column bands: two vectorised passes.
+    summed = np.add.reduceat(gray, rows[:-1], axis=0)
+    summed = np.add.reduceat(summed, cols[:-1], axis=1)
+    counts = np.outer(np.diff(rows), np.diff(cols))
+    return summed / np.maximum(counts, 1)
+
+
+def _pack(bits: np.ndarray) -> int:
+    value = 0
+    for byte in np.packbits(bits.ravel()).tolist():
+        value = (value << 8) | byte
+    return value
+
+
+def dHash(mat: np.ndarray, hashSize: int = 8) -> int:
+    """
+    Difference hash: compares horizontally adjacent cells of a downsampled image.
+
+    Args:
+        mat (numpy.ndarray): OpenCV image matrix (BGR or grayscale).
+        hashSize (int): The hash has hashSize * hashSize bits.
+
+    Returns:
+        int: The hash as an unsigned integer.
+    """
+    small = _downsample(mat, hashSize + 1, hashSize)
+    return _pack(small[:, 1:] > small[:, :-1])
+
+
+_DCT_CACHE: Dict[int, np.ndarray] = {}
+
+
+def _dctMatrix(size: int) -> np.ndarray:
+    matrix = _DCT_CACHE.get(size)
+    if matrix is None:
+        n = np.arange(size)
+        matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * size))
+        matrix[0] /= np.sqrt(2)
+        matrix *= np.sqrt(2 / size)
+        _DCT_CACHE[size] = matrix
+    return matrix
+
+
+def pHash(mat: np.ndarray, hashSize: int = 8, highFrequencyFactor: int = 4) -> int:
+    """
+    Perceptual hash: thresholds the low-frequency DCT coefficients at their median.
+
+    Slower than dHash but more tolerant of brightness and contrast changes.
+
+    Args:
+        mat (numpy.ndarray): OpenCV image matrix (BGR or grayscale).
+        hashSize (int): The hash has hashSize * hashSize bits.
+        highFrequencyFactor (int): The DCT is computed on a
+                                   (hashSize * factor)^2 downsampled image.
+
+    Returns:
+        int: The hash as an unsigned integer.
+    """
+    size = hashSize * highFrequencyFactor
+    small = _downsample(mat, size, size)
+    dct = _dctMatrix(size)
+    low = (dct @ small @ dct.T)[:hashSize, :hashSize]
+    return _pack(low > np.median(low))
+
+
+def hammingDistance(a: int, b: int) -> int:
+    """
+    Number of differing bits between two hashes.
+    """
+    return bin(a ^ b).count("1")
+
+
+HASH_FUNCTIONS: Dict[str, Callable[[np.ndarray], int]] = {"dhash": dHash, "phash": pHash}
+
+
+class FrameDeduplicator:
+    """
+    LRU of recent frame hashes and their decode results.
+
+    Thread-safe, so one instance can be shared by every worker of a ReaderPool.
+    Two near-identical frames that are decoded at the same time are both
+    decoded; only frames arriving after a similar frame has finished are skipped.
+
+    Note that reused results carry the coordinates of the original frame.
+    """
+
+    def __init__(self, maxDistance: int = 4, capacity: int = 256, method: str = "dhash") -> None:
+        """
+        Args:
+            maxDistance (int): Largest Hamming distance (in bits, out of 64)
+                               at which two frames count as duplicates.
+            capacity (int): Number of recent frames remembered.
+            method (str): "dhash" or "phash".
+        """
+        if method not in HASH_FUNCTIONS:
+            raise ValueError(f"method must be one of {sorted(HASH_FUNCTIONS)}, got {method!r}")
+        self.maxDistance = maxDistance
+        self.capacity = capacity
+        self.method = method
+        self._hash = HASH_FUNCTIONS[method]
+        self._lock = threading.Lock()
+        # hash -> (results, seconds the original decode took)
+        self._recent: "collections.OrderedDict[int, Tuple[List[BarcodeResult], float]]" = collections.OrderedDict()
+        self._frames = 0
+        self._skipped = 0
+        self._timeSaved = 0.0
+        self._hashTime = 0.0
+
+    def _lookup(self, frameHash: int) -> Optional[List[BarcodeResult]]:
+        with self._lock:
+            self._frames += 1
+            for known, (results, decodeTime) in reversed(self._recent.items()):
+                if hammingDistance(known, frameHash) <= self.maxDistance:
+                    self._recent.move_to_end(known)
+                    self._skipped += 1
+                    self._timeSaved += decodeTime
+                    return results
+        return None
+
+    def _store(self, frameHash: int, results: List[BarcodeResult], decodeTime: float) -> None:
+        with self._lock:
+            self._recent[frameHash] = (results, decodeTime)
+            self._recent.move_to_end(frameHash)
+            while len(self._recent) > self.capacity:
+                self._recent.popitem(last=False)
+
+    def decodeMat(self, reader: BarcodeReader, mat: np.ndarray) -> List[BarcodeResult]:
+        """
+        Decode a frame with reader unless a near-identical frame was decoded recently.
+
+        Args:
+            reader (BarcodeReader): Reader used when the frame is new.
+            mat (numpy.ndarray): OpenCV image matrix.
+
+        Returns:
+            list: BarcodeResult objects, possibly shared with an earlier frame.
+        """
+        start = time.perf_counter()
+        frameHash = self._hash(mat)
+        hashTime = time.perf_counter() - start
+        with self._lock:
+            self._hashTime += hashTime
+
+        results = self._lookup(frameHash)
+        if results is not None:
+            return results
+
+        start = time.perf_counter()
+        results = reader.decodeMat(mat)
+        self._store(frameHash, results, time.perf_counter() - start)
+        return results
+
+    def decodeFile(self, reader: BarcodeReader, file_path: str) -> List[BarcodeResult]:
+        """
+        Read an image file once, then behave like decodeMat().
+        """
+        import cv2
+        mat = cv2.imread(file_path)
+        if mat is None:
+            print("Error: cannot read", file_path)
+            return []
+        return self.decodeMat(reader, mat)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the deduplication counters.
+
+        Returns:
+            dict: frames seen, frames skipped, skip rate, estimated decode time
+                  saved and time spent hashing (seconds).
+        """
+        with self._lock:
+            return {
+                "frames": self._frames,
+                "skipped": self._skipped,
+                "skip_rate": self._skipped / self._frames if self._frames else 0.0,
+                "time_saved_s": self._timeSaved,
+                "hash_time_s": self._hashTime,
+            }
@@ -0,0 +1,353 @@
+"""
+Multi-engine barcode decoding.
+
+EnsembleReader runs Dynamsoft Barcode Reader and, when the optional
+``zxing-cpp`` package is installed, ZXing on the same in-memory image and
+merges their results. Three modes are supported:
+
+- ``cascade``:  run engines one after another, cheapest first (ordered by their
+                measured average decode time), and stop as soon as the expected
+                number of barcodes has been found.
+- ``parallel``: run every engine in its own thread and return as soon as one of
+                them has found the expected number of barcodes.
+- ``all``:      run every engine in parallel and merge everything.
+
+Results from different engines are treated as the same barcode when their text
+matches and their quadrilaterals overlap (IoU) by at least ``iouThreshold``.
+
+Example:
+    import barcodeQrSDK
+
+    barcodeQrSDK.initLicense("YOUR_LICENSE_KEY")
+    ensemble = barcodeQrSDK.EnsembleReader(mode="cascade", expectedCount=1)
+    result = ensemble.decodeFile("barcode.jpg")
+    for barcode in result.barcodes:
+        print(barcode.text, barcode.engines)
+    print(result.timings)
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import BarcodeReader, BarcodeResult
+
+try:
+    import zxingcpp
+except ImportError:
+    zxingcpp = None
+
+Point = Tuple[float, float]
+
+# Weight of the newest sample in the per-engine moving average of decode time.
+TIMING_SMOOTHING = 0.2
+
+
+class _Point:
+    def __init__(self, x: float, y: float) -> None:
+        self.x = x
+        self.y = y
+
+
+class _Location:
+    def __init__(self, points: Sequence[Point]) -> None:
+        self.points = [_Point(x, y) for x, y in points]
+
+
+class _ZXingItem:
+    """
+    Adapts a zxingcpp.Barcode to the SDK item interface read by BarcodeResult.
+    """
+
+    def __init__(self, barcode: Any) -> None:
+        self._barcode = barcode
+
+    def get_text(self) -> str:
+        return self._barcode.text
+
+    def get_format_string(self) -> str:
+        return self._barcode.format.name
+
+    def get_location(self) -> _Location:
+        pos = self._barcode.position
+        return _Location([
+            (pos.top_left.x, pos.top_left.y),
+            (pos.top_right.x, pos.top_right.y),
+            (pos.bottom_right.x, pos.bottom_right.y),
+            (pos.bottom_left.x, pos.bottom_left.y),
+        ])
+
+
+class DynamsoftEngine:
+    """
+    Ensemble engine backed by a BarcodeReader.
+    """
+
+    name = "dbr"
+
+    def __init__(self, reader: Optional[BarcodeReader] = None) -> None:
+        self.reader: BarcodeReader = reader or BarcodeReader()
+
+    def decode(self, mat: np.ndarray) -> List[BarcodeResult]:
+        return self.reader.decodeMat(mat)
+
+
+class ZXingEngine:
+    """
+    Ensemble engine backed by zxing-cpp (``pip install zxing-cpp``).
+    """
+
+    name = "zxing"
+
+    def __init__(self) -> None:
+        if zxingcpp is None:
+            raise ImportError("ZXingEngine requires the zxing-cpp package: pip install zxing-cpp")
+
+    def decode(self, mat: np.ndarray) -> List[BarcodeResult]:
+        return [BarcodeResult(_ZXingItem(barcode)) for barcode in zxingcpp.read_barcodes(mat)]
+
+
+def quadPoints(barcode: BarcodeResult) -> List[Point]:
+    """
+    The four corners of a BarcodeResult as (x, y) tuples.
+    """
+    return [(barcode.x1, barcode.y1), (barcode.x2, barcode.y2),
+            (barcode.x3, barcode.y3), (barcode.x4, barcode.y4)]
+
+
+def _area(polygon: Sequence[Point]) -> float:
+    total = 0.0
+    for i in range(len(polygon)):
+        x1, y1 = polygon[i]
+        x2, y2 = polygon[(i + 1) % len(polygon)]
+        total += x1 * y2 - x2 * y1
+    return total / 2.0
+
+
+def _clip(subject: List[Point], clipper: List[Point]) -> List[Point]:
+    # Sutherland-Hodgman clipping of subject against the convex, counter-clockwise clipper.
+    output = subject
+    for i in range(len(clipper)):
+        if not output:
+            break
+        ax, ay = clipper[i]
+        bx, by = clipper[(i + 1) % len(clipper)]
+
+        def inside(p: Point) -> bool:
+            return (bx - ax) * (p[1] - ay) - (by - ay) * (p[0] - ax) >= 0
+
+        def intersect(p: Point, q: Point) -> Point:
+            dx, dy = q[0] - p[0], q[1] - p[1]
+            denom = (bx - ax) * dy - (by - ay) * dx
+            if denom == 0:
+                return q
+            t = ((ax - p[0]) * (by - ay) - (ay - p[1]) * (bx - ax)) / -denom
+            return (p[0] + t * dx, p[1] + t * dy)
+
+        current, output = output, []
+        for j in range(len(current)):
+            p, q = current[j - 1], current[j]
+            if inside(q):
+                if not inside(p):
+                    output.append(intersect(p, q))
+                output.append(q)
+            elif inside(p):
+                output.append(intersect(p, q))
+    return output
+
+
+def quadIoU(a: Sequence[Point], b: Sequence[Point]) -> float:
+    """
+    Intersection over union of two convex quadrilaterals.
+
+    Args:
+        a, b: Four (x, y) corners each, in either winding order.
+
+    Returns:
+        float: IoU between 0.0 and 1.0.
+    """
+    a = list(a) if _area(a) >= 0 else list(reversed(a))
+    b = list(b) if _area(b) >= 0 else list(reversed(b))
+    areaA, areaB = _area(a), _area(b)
+    if areaA <= 0 or areaB <= 0:
+        return 0.0
+    intersection = _clip(a, b)
+    inter = abs(_area(intersection)) if len(intersection) >= 3 else 0.0
+    union = areaA + areaB - inter
+    return inter / union if union > 0 else 0.0
+
+
+class EnsembleResult:
+    """
+    Merged output of an EnsembleReader call.
+
+    Attributes:
+        barcodes (list): Merged BarcodeResult objects. Each one has an extra
+                         ``engines`` attribute listing the engines that found it.
+        timings (dict): Decode time in milliseconds for every engine that ran.
+        counts (dict): Number of barcodes each engine that ran returned.
+        skipped (list): Engines that were not needed (cascade) or whose result
+                        was not waited for (parallel).
+    """
+
+    def __init__(self) -> None:
+        self.barcodes: List[BarcodeResult] = []
+        self.timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.skipped: List[str] = []
+
+
+class EnsembleReader:
+    """
+    Decodes with several engines and merges their results.
+
+    Like BarcodeReader, an instance is meant to be used from one thread at a time.
+    """
+
+    MODES = ("cascade", "parallel", "all")
+
+    def __init__(self, engines: Optional[List[Any]] = None, mode: str = "cascade",
+                 expectedCount: Optional[int] = None, iouThreshold: float = 0.5) -> None:
+        """
+        Args:
+            engines (list, optional): Engine objects with a ``name`` and a
+                ``decode(mat)`` method. Defaults to ZXing (when zxing-cpp is
+                installed) followed by Dynamsoft.
+            mode (str): "cascade", "parallel" or "all".
+            expectedCount (int, optional): Barcodes needed to stop early. When
+                None, the first engine that finds anything wins.
+            iouThreshold (float): Minimum quad IoU for two results with the
+                same text to be merged into one barcode.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"mode must be one of {self.MODES}, got {mode!r}")
+        if engines is None:
+            engines = [ZXingEngine()] if zxingcpp is not None else []
+            engines.append(DynamsoftEngine())
+        self.engines = engines
+        self.mode = mode
+        self.expectedCount = expectedCount
+        self.iouThreshold = iouThreshold
+        self.averageTimes: Dict[str, float] = {}
+        # One single-thread executor per engine, so an engine whose result was
+        # abandoned in parallel mode finishes before it is called again.
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    def _enough(self, barcodes: List[BarcodeResult]) -> bool:
+        if self.expectedCount is None:
+            return len(barcodes) > 0
+        return len(barcodes) >= self.expectedCount
+
+    def _run(self, engine: Any, mat: np.ndarray) -> Tuple[List[BarcodeResult], float]:
+        start = time.perf_counter()
+        barcodes = engine.decode(mat)
+        elapsed = time.perf_counter() - start
+        previous = self.averageTimes.get(engine.name)
+        self.averageTimes[engine.name] = elapsed if previous is None else (
+            previous + TIMING_SMOOTHING * (elapsed - previous))
+        return barcodes, elapsed
+
+    def _executor(self, engine: Any) -> ThreadPoolExecutor:
+        executor = self._executors.get(engine.name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"barcodeQrSDK-{engine.name}")
+            self._executors[engine.name] = executor
+        return executor
+
+    def _merge(self, result: EnsembleResult, name: str, barcodes: List[BarcodeResult]) -> None:
+        for barcode in barcodes:
+            points = quadPoints(barcode)
+            for existing in result.barcodes:
+                if (existing.text == barcode.text and name not in existing.engines
+                        and quadIoU(quadPoints(existing), points) >= self.iouThreshold):
+                    existing.engines.append(name)
+                    break
+            else:
+                barcode.engines = [name]
+                result.barcodes.append(barcode)
+
+    def _cascade(self, mat: np.ndarray, result: EnsembleResult) -> None:
+        # Engines that have not been timed yet keep their configured order.
+        order = sorted(range(len(self.engines)),
+                       key=lambda i: (self.averageTimes.get(self.engines[i].name, 0.0), i))
+        for position, index in enumerate(order):
+            engine = self.engines[index]
+            try:
+                barcodes, elapsed = self._run(engine, mat)
+            except Exception as err:
+                print(f"[{engine.name}] {err}")
+                continue
+            result.timings[engine.name] = elapsed * 1000.0
+            result.counts[engine.name] = len(barcodes)
+            self._merge(result, engine.name, barcodes)
+            if self._enough(result.barcodes):
+                result.skipped = [self.engines[i].name for i in order[position + 1:]]
+                return
+
+    def _parallel(self, mat: np.ndarray, result: EnsembleResult, firstWins: bool) -> None:
+        futures: Dict[Future, Any] = {
+            self._executor(engine).submit(self._run, engine, mat): engine for engine in self.engines
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                engine = futures[future]
+                try:
+                    barcodes, elapsed = future.result()
+                except Exception as err:
+                    print(f"[{engine.name}] {err}")
+                    continue
+                result.timings[engine.name] = elapsed * 1000.0
+                result.counts[engine.name] = len(barcodes)
+                self._merge(result, engine.name, barcodes)
+            if firstWins and self._enough(result.barcodes):
+                result.skipped = [futures[f].name for f in pending]
+                return
+
+    def decodeMat(self, mat: np.ndarray) -> EnsembleResult:
+        """
+        Decode an OpenCV image matrix with the configured engines.
+
+        Args:
+            mat (numpy.ndarray): OpenCV image matrix (BGR or grayscale).
+
+        Returns:
+            EnsembleResult: Merged barcodes with per-engine attribution and timing.
+        """
+        result = EnsembleResult()
+        if self.mode == "cascade":
+            self._cascade(mat, result)
+        else:
+            self._parallel(mat, result, firstWins=self.mode == "parallel")
+        return result
+
+    def decodeFile(self, file_path: str) -> EnsembleResult:
+        """
+        Decode an image file with the configured engines.
+
+        The file is read once and every engine decodes the same in-memory image.
+
+        Args:
+            file_path (str): Path to the image file.
+
+        Returns:
+            EnsembleResult: Merged barcodes with per-engine attribution and timing.
+                            Empty if the file cannot be read.
+        """
+        import cv2
+        mat = cv2.imread(file_path)
+        if mat is None:
+            print("Error: cannot read", file_path)
+            return EnsembleResult()
+        return self.decodeMat(mat)
+
+    def close(self) -> None:
+        """
+        Shut down the threads used by the parallel modes.
+        """
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+        self._executors.clear()
@@ -0,0 +1,128 @@
+"""
+Load generator for the local HTTP decode service.
+
+Sends images to ``barcodeQrSDK.serve`` from a number of concurrent keep-alive
+connections for a fixed duration (closed loop: every connection waits for its
+response before sending the next request) and reports throughput, status codes
+and latency percentiles.
+
+Example:
+    python -m barcodeQrSDK.serve --port 8000 &
+    python -m barcodeQrSDK.loadgen images/test.png -c 16 -d 30
+"""
+
+import argparse
+import collections
+import http.client
+import mimetypes
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .pool import percentile
+
+
+def _worker(url: str, payloads: List[Tuple[bytes, str]], deadline: float, offset: int,
+            latencies: List[float], statuses: Dict[int, int], lock: threading.Lock) -> None:
+    target = urlparse(url)
+    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=60)
+    localLatencies: List[float] = []
+    localStatuses: Dict[int, int] = collections.Counter()
+    index = offset
+    while time.perf_counter() < deadline:
+        body, contentType = payloads[index % len(payloads)]
+        index += 1
+        start = time.perf_counter()
+        try:
+            connection.request("POST", target.path or "/decode", body, {"Content-Type": contentType})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            status = 0
+        localLatencies.append(time.perf_counter() - start)
+        localStatuses[status] += 1
+    connection.close()
+    with lock:
+        latencies.extend(localLatencies)
+        for status, count in localStatuses.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+
+def run(url: str, files: List[str], concurrency: int, duration: float) -> Dict[str, object]:
+    """
+    Drive the service and collect the measurements.
+
+    Args:
+        url (str): Decode endpoint, e.g. http://127.0.0.1:8000/decode.
+        files (list): Image files sent in round-robin order.
+        concurrency (int): Number of concurrent connections.
+        duration (float): Seconds to keep sending requests.
+
+    Returns:
+        dict: requests, throughput, status counts and latency percentiles (ms).
+    """
+    payloads = []
+    for path in files:
+        with open(path, 'rb') as f:
+            payloads.append((f.read(), mimetypes.guess_type(path)[0] or 'application/octet-stream'))
+
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [
+        threading.Thread(target=_worker, args=(url, payloads, deadline, i, latencies, statuses, lock))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ok = statuses.get(200, 0)
+    return {
+        "requests": len(latencies),
+        "elapsed_s": elapsed,
+        "throughput_rps": ok / elapsed if elapsed > 0 else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            f"p{q}": percentile(latencies, q) * 1000.0 for q in (50, 90, 95, 99)
+        },
+        "latency_max_ms": max(latencies) * 1000.0 if latencies else 0.0,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command-line entry point for the load generator.
+    """
+    parser = argparse.ArgumentParser(description='Measure throughput and latency of barcodeQrSDK.serve')
+    parser.add_argument('files', nargs='+', help='Image files to send')
+    parser.add_argument('-u', '--url', default='http://127.0.0.1:8000/decode', type=str, help='Decode endpoint')
+    parser.add_argument('-c', '--concurrency', default=os.cpu_count() or 1, type=int, help='Concurrent connections')
+    parser.add_argument('-d', '--duration', default=10.0, type=float, help='Seconds to run')
+    args = parser.parse_args(argv)
+
+    try:
+        report = run(args.url, args.files, args.concurrency, args.duration)
+    except OSError as err:
+        print(err)
+        sys.exit(1)
+
+    print(f"Requests:    {report['requests']} in {report['elapsed_s']:.1f}s")
+    print(f"Throughput:  {report['throughput_rps']:.1f} successful requests/s")
+    print(f"Status:      {', '.join(f'{k}={v}' for k, v in report['statuses'].items())}")
+    latency = report['latency_ms']
+    print(f"Latency ms:  p50={latency['p50']:.1f} p90={latency['p90']:.1f} "
+          f"p95={latency['p95']:.1f} p99={latency['p99']:.1f} max={report['latency_max_ms']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
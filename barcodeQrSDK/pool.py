@@ -0,0 +1,476 @@
+"""
+Reader pool for concurrent barcode decoding.
+
+A ``CaptureVisionRouter`` is not meant to be shared between threads, so the
+pool gives every worker thread its own ``BarcodeReader`` and feeds the workers
+from a bounded task queue. When the queue is full, ``submit()`` either blocks
+(backpressure) or raises ``queue.Full`` so that callers such as HTTP services
+can reject the request instead of buffering without limit.
+
+Example:
+    import barcodeQrSDK
+
+    barcodeQrSDK.initLicense("YOUR_LICENSE_KEY")
+
+    with barcodeQrSDK.ReaderPool(size=4) as pool:
+        futures = [pool.submit("decodeFile", path) for path in paths]
+        for future in futures:
+            print(future.result())
+"""
+
+import collections
+import math
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import BarcodeReader, BarcodeResult
+
+# Number of recent decode times kept for the latency percentiles in stats().
+LATENCY_WINDOW = 1024
+# Number of autoscaling samples kept by history().
+HISTORY_LENGTH = 3600
+# Side of the blank image new readers decode before taking tasks.
+WARMUP_SIZE = 64
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of a sequence of numbers.
+
+    Args:
+        values: The samples. They do not need to be sorted.
+        q (float): Percentile between 0 and 100.
+
+    Returns:
+        float: The percentile, or 0.0 for an empty sequence.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class ReaderPool:
+    """
+    Pool of worker threads, each owning one BarcodeReader.
+
+    Tasks name a BarcodeReader method (``"decodeFile"``, ``"decodeMat"``,
+    ``"decodeFileStream"``, ...) and its arguments. The method runs on the
+    reader owned by whichever worker picks the task up. A callable can be
+    given instead of a name; it is called with the reader as first argument.
+
+    By default the pool has a fixed size. When ``maxSize`` is larger than
+    ``minSize`` the pool autoscales: a background thread adds readers while
+    tasks are waiting in the queue or the p95 end-to-end latency exceeds
+    ``latencyTarget``, and readers that stay idle for ``idleTimeout`` seconds
+    are released down to ``minSize``. New readers run a warm-up decode before
+    they take tasks.
+
+    Attributes:
+        minSize (int): Smallest number of readers.
+        maxSize (int): Largest number of readers.
+        maxQueue (int): Number of tasks allowed to wait for a free worker.
+    """
+
+    def __init__(self, size: Optional[int] = None, maxQueue: Optional[int] = None,
+                 parameters: Optional[str] = None, minSize: Optional[int] = None,
+                 maxSize: Optional[int] = None, latencyTarget: Optional[float] = None,
+                 idleTimeout: float = 30.0, scaleInterval: float = 0.5, warmup: bool = True) -> None:
+        """
+        Create the pool and start its workers.
+
+        Args:
+            size (int, optional): Number of readers of a fixed-size pool.
+                                  Defaults to the CPU count.
+            maxQueue (int, optional): Number of tasks that may wait for a
+                                      free reader. Defaults to ``2 * maxSize``.
+            parameters (str, optional): JSON settings applied to every reader
+                                        via ``setParameters()``.
+            minSize (int, optional): Readers kept alive when autoscaling.
+                                     Defaults to 1.
+            maxSize (int, optional): Upper bound when autoscaling. Autoscaling
+                                     is enabled when it exceeds minSize.
+            latencyTarget (float, optional): p95 end-to-end latency in seconds
+                                             (queue wait + decode) above which
+                                             the pool grows.
+            idleTimeout (float): Seconds a reader may stay idle before it is
+                                 released, when above minSize.
+            scaleInterval (float): Seconds between autoscaling decisions and
+                                   history samples.
+            warmup (bool): Decode a blank image with every new reader before
+                           it takes tasks.
+
+        Raises:
+            RuntimeError: None of the initial readers could be created.
+        """
+        if maxSize is None:
+            fixed = size or os.cpu_count() or 1
+            self.minSize: int = fixed
+            self.maxSize: int = fixed
+        else:
+            self.minSize = max(1, minSize if minSize is not None else 1)
+            self.maxSize = max(self.minSize, maxSize)
+        self.maxQueue: int = self.maxSize * 2 if maxQueue is None else maxQueue
+        self.parameters: Optional[str] = parameters
+        self.latencyTarget: Optional[float] = latencyTarget
+        self.idleTimeout: float = idleTimeout
+        self.scaleInterval: float = scaleInterval
+        self.warmup: bool = warmup
+
+        # maxsize=0 would make the queue unbounded, so keep at least one slot.
+        self._tasks: "queue.Queue[Optional[tuple]]" = queue.Queue(max(1, self.maxQueue))
+        self._lock = threading.Lock()
+        # Signalled when the last in-flight submit() has queued its task.
+        self._submitted = threading.Condition(self._lock)
+        self._submitting = 0
+        self._live = 0
+        self._starting = 0
+        self._startError: Optional[BaseException] = None
+        self._busy = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._scaleUps = 0
+        self._scaleDowns = 0
+        self._busyTime = 0.0
+        self._readerTime = 0.0
+        self._lastResize = time.monotonic()
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+        # (completion time, queue wait + decode) for the autoscaling window.
+        self._endToEnd: Deque[Tuple[float, float]] = collections.deque(maxlen=LATENCY_WINDOW)
+        self._history: Deque[Dict[str, Any]] = collections.deque(maxlen=HISTORY_LENGTH)
+        self._closed = False
+        self._started = time.monotonic()
+        self._workers: List[threading.Thread] = []
+        self._nextIndex = 0
+        self._scaler: Optional[threading.Thread] = None
+
+        self._spawn(self.minSize, wait=True)
+        if self._live == 0:
+            raise RuntimeError("ReaderPool could not create a reader") from self._startError
+        if self.autoscaling:
+            self._scaler = threading.Thread(target=self._scale, name="barcodeQrSDK-pool-scaler", daemon=True)
+            self._scaler.start()
+
+    @property
+    def autoscaling(self) -> bool:
+        """bool: True when the pool may grow beyond minSize."""
+        return self.maxSize > self.minSize
+
+    @property
+    def size(self) -> int:
+        """int: Number of readers currently taking tasks."""
+        with self._lock:
+            return self._live
+
+    def _createReader(self) -> BarcodeReader:
+        reader = BarcodeReader()
+        if self.parameters:
+            reader.setParameters(self.parameters)
+        if self.warmup:
+            # The first capture loads models and allocates buffers; keep that
+            # cost out of the first real task.
+            reader.decodeMat(np.zeros((WARMUP_SIZE, WARMUP_SIZE), dtype=np.uint8))
+        return reader
+
+    def _resized(self, delta: int) -> None:
+        # Caller holds self._lock. Integrates reader-seconds for utilization.
+        now = time.monotonic()
+        self._readerTime += (now - self._lastResize) * self._live
+        self._lastResize = now
+        self._live += delta
+
+    def _spawn(self, count: int, wait: bool = False) -> None:
+        ready = []
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            self._starting += count
+            for _ in range(count):
+                event = threading.Event()
+                worker = threading.Thread(target=self._work, args=(event,),
+                                          name=f"barcodeQrSDK-pool-{self._nextIndex}", daemon=True)
+                self._nextIndex += 1
+                self._workers.append(worker)
+                ready.append(event)
+                worker.start()
+        if wait:
+            for event in ready:
+                event.wait()
+
+    def _work(self, ready: threading.Event) -> None:
+        try:
+            reader = self._createReader()
+        except BaseException as err:
+            with self._lock:
+                self._starting -= 1
+                self._startError = err
+                orphaned = self._live + self._starting == 0
+            ready.set()
+            # Without any reader left, nothing would ever take queued tasks.
+            if orphaned:
+                self._failPending(err)
+            return
+        with self._lock:
+            self._starting -= 1
+            self._resized(1)
+        ready.set()
+
+        while True:
+            try:
+                task = self._tasks.get(timeout=self.idleTimeout if self.autoscaling else None)
+            except queue.Empty:
+                with self._lock:
+                    if self._live > self.minSize and not self._closed:
+                        self._resized(-1)
+                        self._scaleDowns += 1
+                        return
+                continue
+            if task is None:
+                with self._lock:
+                    self._resized(-1)
+                return
+
+            future, method, args, submitted = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            with self._lock:
+                self._busy += 1
+            start = time.perf_counter()
+            try:
+                if callable(method):
+                    result = method(reader, *args)
+                else:
+                    result = getattr(reader, method)(*args)
+            except BaseException as err:
+                future.set_exception(err)
+                failed = True
+            else:
+                future.set_result(result)
+                failed = False
+            finally:
+                end = time.perf_counter()
+                with self._lock:
+                    self._busy -= 1
+                    self._busyTime += end - start
+                    self._latencies.append(end - start)
+                    self._endToEnd.append((end, end - submitted))
+                    if failed:
+                        self._failed += 1
+                    else:
+                        self._completed += 1
+
+    def _failPending(self, err: BaseException) -> None:
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if task is not None and task[0].set_running_or_notify_cancel():
+                task[0].set_exception(err)
+
+    def _recentP95(self) -> float:
+        # Caller holds self._lock.
+        horizon = time.perf_counter() - max(self.scaleInterval * 4, 1.0)
+        return percentile([latency for end, latency in self._endToEnd if end >= horizon], 95)
+
+    def _scale(self) -> None:
+        while not self._closed:
+            time.sleep(self.scaleInterval)
+            queued = self._tasks.qsize()
+            with self._lock:
+                if self._closed:
+                    return
+                p95 = self._recentP95()
+                capacity = self._live + self._starting
+                idle = self._live - self._busy
+                grow = 0
+                if queued > idle:
+                    # Enough readers for the backlog, but readers that are
+                    # still warming up already count towards it.
+                    grow = queued - idle - self._starting
+                if self.latencyTarget is not None and p95 > self.latencyTarget and queued > 0:
+                    grow = max(grow, 1)
+                grow = max(0, min(grow, self.maxSize - capacity))
+                if grow:
+                    self._scaleUps += grow
+                self._history.append({
+                    "time": time.time(),
+                    "size": self._live,
+                    "starting": self._starting + grow,
+                    "busy": self._busy,
+                    "queued": queued,
+                    "p95_ms": p95 * 1000.0,
+                })
+            if grow:
+                self._spawn(grow)
+
+    def submit(self, method: Union[str, Callable[..., Any]], *args: Any, block: bool = True,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue a BarcodeReader method call on the next free reader.
+
+        Args:
+            method (str or callable): Name of the BarcodeReader method to call,
+                                      or a function taking (reader, *args).
+            *args: Arguments passed to the method.
+            block (bool): Wait for a queue slot when the pool is saturated.
+            timeout (float, optional): Maximum seconds to wait when blocking.
+
+        Returns:
+            Future: Resolves to the method's return value.
+
+        Raises:
+            queue.Full: The queue stayed full (non-blocking or timed out).
+            RuntimeError: The pool has been closed.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ReaderPool is closed")
+            # close() waits for this task to be queued before the sentinels.
+            self._submitting += 1
+
+        future: Future = Future()
+        try:
+            self._tasks.put((future, method, args, time.perf_counter()), block=block, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._rejected += 1
+            raise
+        finally:
+            with self._lock:
+                self._submitting -= 1
+                self._submitted.notify_all()
+        return future
+
+    def decodeFile(self, file_path: str) -> List[BarcodeResult]:
+        """
+        Decode an image file on a pooled reader and wait for the results.
+        """
+        return self.submit("decodeFile", file_path).result()
+
+    def decodeFileStream(self, data: bytes) -> List[BarcodeResult]:
+        """
+        Decode an encoded image (JPEG, PNG, ...) held in memory and wait for the results.
+        """
+        return self.submit("decodeFileStream", data).result()
+
+    def decodeMat(self, mat: Any) -> List[BarcodeResult]:
+        """
+        Decode an OpenCV image matrix on a pooled reader and wait for the results.
+        """
+        return self.submit("decodeMat", mat).result()
+
+    def decodeFiles(self, file_paths: Sequence[str], deduplicator: Any = None) -> List[List[BarcodeResult]]:
+        """
+        Decode a batch of image files in parallel.
+
+        Args:
+            file_paths (list): Image files to decode.
+            deduplicator (FrameDeduplicator, optional): Skip files that look
+                like a recently decoded one and reuse its results.
+
+        Returns:
+            list: One list of BarcodeResult objects per file, in input order.
+        """
+        method = deduplicator.decodeFile if deduplicator is not None else "decodeFile"
+        futures = [self.submit(method, path) for path in file_paths]
+        return [future.result() for future in futures]
+
+    @property
+    def pending(self) -> int:
+        """int: Number of tasks queued or running."""
+        with self._lock:
+            busy = self._busy
+        return self._tasks.qsize() + busy
+
+    @property
+    def saturated(self) -> bool:
+        """bool: True when every reader is busy and the queue is full."""
+        return self._tasks.full()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Snapshot of the pool counters.
+
+        Returns:
+            dict: size, busy, queued, completed, failed, rejected, uptime,
+                  utilization (fraction of reader time spent decoding),
+                  decode latency percentiles over the most recent tasks and,
+                  for autoscaling pools, the scaling counters.
+        """
+        with self._lock:
+            now = time.monotonic()
+            readerTime = self._readerTime + (now - self._lastResize) * self._live
+            latencies = list(self._latencies)
+            endToEnd = [latency for _, latency in self._endToEnd]
+            return {
+                "size": self._live,
+                "starting": self._starting,
+                "min_size": self.minSize,
+                "max_size": self.maxSize,
+                "busy": self._busy,
+                "queued": self._tasks.qsize(),
+                "max_queue": self.maxQueue,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "scale_ups": self._scaleUps,
+                "scale_downs": self._scaleDowns,
+                "uptime_s": now - self._started,
+                "utilization": self._busyTime / readerTime if readerTime > 0 else 0.0,
+                "latency_p50_ms": percentile(latencies, 50) * 1000.0,
+                "latency_p95_ms": percentile(latencies, 95) * 1000.0,
+                "latency_p99_ms": percentile(latencies, 99) * 1000.0,
+                "end_to_end_p95_ms": percentile(endToEnd, 95) * 1000.0,
+            }
+
+    def history(self) -> List[Dict[str, Any]]:
+        """
+        Pool size over time, sampled every scaleInterval by autoscaling pools.
+
+        Returns:
+            list: Dicts with time (epoch seconds), size, starting, busy,
+                  queued and p95_ms (recent end-to-end latency).
+        """
+        with self._lock:
+            return list(self._history)
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stop accepting tasks and shut the workers down.
+
+        Tasks already queued are still processed before the workers exit.
+
+        Args:
+            wait (bool): Block until every worker has exited.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._scaler is not None:
+            self._scaler.join()
+        with self._lock:
+            self._submitted.wait_for(lambda: self._submitting == 0)
+            remaining = self._live + self._starting
+        if remaining == 0:
+            self._failPending(RuntimeError("ReaderPool has no readers"))
+        for _ in range(remaining):
+            self._tasks.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self) -> "ReaderPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,391 @@
+"""
+Local HTTP decode service.
+
+Runs a small multi-threaded HTTP server in front of a ReaderPool so that web
+applications can share one set of readers instead of creating a
+CaptureVisionRouter per request. When the pool queue is full, requests are
+rejected with ``429 Too Many Requests`` instead of piling up.
+
+Endpoints:
+    POST /decode         One image, sent as the raw request body or as the
+                         first file of a multipart/form-data upload.
+    POST /decode/batch   Several images in one multipart/form-data upload.
+                         Responds with a JSON array, or streams one NDJSON
+                         line per image as it finishes when the client sends
+                         ``Accept: application/x-ndjson`` or ``?stream=1``.
+    GET  /health         Liveness probe.
+    GET  /metrics        Pool and request counters in Prometheus text format.
+
+Example:
+    python -m barcodeQrSDK.serve --port 8000 -l YOUR_LICENSE_KEY
+    curl --data-binary @barcode.jpg -H "Content-Type: image/jpeg" http://127.0.0.1:8000/decode
+    curl -F file=@a.jpg -F file=@b.png "http://127.0.0.1:8000/decode/batch?stream=1"
+"""
+
+import argparse
+import collections
+import email.parser
+import email.policy
+import json
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import barcodeQrSDK
+from .pool import ReaderPool, percentile
+
+# Number of recent request durations kept for the /metrics latency quantiles.
+REQUEST_WINDOW = 4096
+
+
+def parseMultipart(contentType: str, body: bytes) -> List[Tuple[str, bytes]]:
+    """
+    Extract the file parts of a multipart/form-data body.
+
+    Args:
+        contentType (str): The request Content-Type header, including the boundary.
+        body (bytes): The raw request body.
+
+    Returns:
+        list: (filename, content) for every part that carries a file.
+    """
+    header = f"Content-Type: {contentType}\r\nMIME-Version: 1.0\r\n\r\n".encode("latin-1")
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+    files: List[Tuple[str, bytes]] = []
+    if not message.is_multipart():
+        return files
+    for part in message.iter_parts():
+        filename = part.get_filename()
+        if filename is None:
+            continue
+        files.append((filename, part.get_payload(decode=True) or b""))
+    return files
+
+
+class DecodeServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer that owns the ReaderPool and the request metrics.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], pool: ReaderPool,
+                 maxBody: int = 32 * 1024 * 1024, queueTimeout: float = 0.0) -> None:
+        super().__init__(address, DecodeRequestHandler)
+        self.pool = pool
+        self.maxBody = maxBody
+        self.queueTimeout = queueTimeout
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, int], int] = collections.Counter()
+        self._durations: Deque[float] = collections.deque(maxlen=REQUEST_WINDOW)
+        self._images = 0
+        self._barcodes = 0
+        self._bytesIn = 0
+
+    def submit(self, data: bytes, block: bool = False) -> Future:
+        """
+        Queue one encoded image on the pool, raising queue.Full when saturated.
+        With block=True, wait for a queue slot instead.
+        """
+        if block:
+            return self.pool.submit("decodeFileStream", data)
+        if self.queueTimeout > 0:
+            return self.pool.submit("decodeFileStream", data, timeout=self.queueTimeout)
+        return self.pool.submit("decodeFileStream", data, block=False)
+
+    def record(self, path: str, status: int, duration: float, images: int = 0,
+               barcodes: int = 0, bytesIn: int = 0) -> None:
+        with self._lock:
+            self._requests[(path, status)] += 1
+            self._durations.append(duration)
+            self._images += images
+            self._barcodes += barcodes
+            self._bytesIn += bytesIn
+
+    def metrics(self) -> str:
+        """
+        Render the counters in the Prometheus text exposition format.
+        """
+        stats = self.pool.stats()
+        with self._lock:
+            requests = dict(self._requests)
+            durations = list(self._durations)
+            images, barcodes, bytesIn = self._images, self._barcodes, self._bytesIn
+
+        lines = [
+            "# TYPE barcodeqr_requests_total counter",
+        ]
+        for (path, status), count in sorted(requests.items()):
+            lines.append(f'barcodeqr_requests_total{{path="{path}",status="{status}"}} {count}')
+        lines += [
+            "# TYPE barcodeqr_request_duration_seconds summary",
+        ]
+        for q in (50, 90, 95, 99):
+            lines.append(f'barcodeqr_request_duration_seconds{{quantile="{q / 100}"}} {percentile(durations, q):.6f}')
+        lines += [
+            "# TYPE barcodeqr_images_total counter",
+            f"barcodeqr_images_total {images}",
+            "# TYPE barcodeqr_barcodes_total counter",
+            f"barcodeqr_barcodes_total {barcodes}",
+            "# TYPE barcodeqr_request_bytes_total counter",
+            f"barcodeqr_request_bytes_total {bytesIn}",
+            "# TYPE barcodeqr_pool_size gauge",
+            f"barcodeqr_pool_size {stats['size']}",
+            "# TYPE barcodeqr_pool_starting gauge",
+            f"barcodeqr_pool_starting {stats['starting']}",
+            "# TYPE barcodeqr_pool_max_size gauge",
+            f"barcodeqr_pool_max_size {stats['max_size']}",
+            "# TYPE barcodeqr_pool_scale_ups_total counter",
+            f"barcodeqr_pool_scale_ups_total {stats['scale_ups']}",
+            "# TYPE barcodeqr_pool_scale_downs_total counter",
+            f"barcodeqr_pool_scale_downs_total {stats['scale_downs']}",
+            "# TYPE barcodeqr_pool_busy gauge",
+            f"barcodeqr_pool_busy {stats['busy']}",
+            "# TYPE barcodeqr_pool_queued gauge",
+            f"barcodeqr_pool_queued {stats['queued']}",
+            "# TYPE barcodeqr_pool_queue_capacity gauge",
+            f"barcodeqr_pool_queue_capacity {stats['max_queue']}",
+            "# TYPE barcodeqr_pool_completed_total counter",
+            f"barcodeqr_pool_completed_total {stats['completed']}",
+            "# TYPE barcodeqr_pool_failed_total counter",
+            f"barcodeqr_pool_failed_total {stats['failed']}",
+            "# TYPE barcodeqr_pool_rejected_total counter",
+            f"barcodeqr_pool_rejected_total {stats['rejected']}",
+            "# TYPE barcodeqr_pool_utilization gauge",
+            f"barcodeqr_pool_utilization {stats['utilization']:.4f}",
+            "# TYPE barcodeqr_decode_duration_seconds summary",
+        ]
+        for q in (50, 95, 99):
+            lines.append(f'barcodeqr_decode_duration_seconds{{quantile="{q / 100}"}} '
+                         f'{stats[f"latency_p{q}_ms"] / 1000.0:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+class DecodeRequestHandler(BaseHTTPRequestHandler):
+    """
+    Request handler for the decode endpoints.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY the
+    # delayed-ACK interaction adds ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+    server: DecodeServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Access logs would dominate the cost of small requests.
+        pass
+
+    def _sendJson(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sendBusy(self) -> None:
+        self._sendJson(429, {"success": False, "error": "Decoder queue is full"}, {"Retry-After": "1"})
+
+    def _readBody(self) -> Tuple[Optional[bytes], int]:
+        """
+        Read the request body, or answer the error and return (None, status).
+        """
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            self.close_connection = True
+            self._sendJson(400, {"success": False, "error": "Invalid Content-Length"})
+            return None, 400
+        if length <= 0:
+            self._sendJson(400, {"success": False, "error": "Empty request body"})
+            return None, 400
+        if length > self.server.maxBody:
+            self.close_connection = True
+            self._sendJson(413, {"success": False, "error": "Request body too large"})
+            return None, 413
+        return self.rfile.read(length), 200
+
+    def _images(self, body: bytes) -> List[Tuple[str, bytes]]:
+        contentType = self.headers.get("Content-Type", "")
+        if contentType.startswith("multipart/form-data"):
+            return parseMultipart(contentType, body)
+        return [("", body)]
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._sendJson(200, {"success": True, "version": barcodeQrSDK.__version__})
+            status = 200
+        elif path == "/metrics":
+            body = self.server.metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            status = 200
+        else:
+            self._sendJson(404, {"success": False, "error": "Not found"})
+            status = 404
+        self.server.record(path, status, time.perf_counter() - start)
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path == "/decode":
+            status, images, barcodes, size = self._decodeOne()
+        elif url.path == "/decode/batch":
+            stream = (parse_qs(url.query).get("stream", ["0"])[0] not in ("", "0", "false")
+                      or "application/x-ndjson" in self.headers.get("Accept", ""))
+            status, images, barcodes, size = self._decodeBatch(stream)
+        else:
+            self._sendJson(404, {"success": False, "error": "Not found"})
+            status, images, barcodes, size = 404, 0, 0, 0
+        self.server.record(url.path, status, time.perf_counter() - start, images, barcodes, size)
+
+    def _decodeOne(self) -> Tuple[int, int, int, int]:
+        body, status = self._readBody()
+        if body is None:
+            return status, 0, 0, 0
+        images = self._images(body)
+        if not images:
+            self._sendJson(400, {"success": False, "error": "No file in upload"})
+            return 400, 0, 0, len(body)
+
+        try:
+            future = self.server.submit(images[0][1])
+        except queue.Full:
+            self._sendBusy()
+            return 429, 0, 0, len(body)
+
+        try:
+            results = future.result()
+        except Exception as err:
+            self._sendJson(500, {"success": False, "error": str(err)})
+            return 500, 1, 0, len(body)
+
+        items = [barcode.toDict() for barcode in results]
+        self._sendJson(200, {"success": True, "count": len(items), "items": items})
+        return 200, 1, len(items), len(body)
+
+    def _decodeBatch(self, stream: bool) -> Tuple[int, int, int, int]:
+        body, status = self._readBody()
+        if body is None:
+            return status, 0, 0, 0
+        images = self._images(body)
+        if not images:
+            self._sendJson(400, {"success": False, "error": "No file in upload"})
+            return 400, 0, 0, len(body)
+
+        # Overload is decided once per request: the first image needs a free
+        # queue slot, the rest of the batch waits for slots as readers finish,
+        # so a batch larger than the queue is not rejected piecemeal.
+        futures: Dict[Future, int] = {}
+        outcomes: List[Dict[str, Any]] = [{} for _ in images]
+        try:
+            futures[self.server.submit(images[0][1])] = 0
+        except queue.Full:
+            self._sendBusy()
+            return 429, 0, 0, len(body)
+        for index in range(1, len(images)):
+            futures[self.server.submit(images[index][1], block=True)] = index
+
+        if stream:
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        barcodes = 0
+        remaining = set(futures)
+        while remaining:
+            done, remaining = wait(remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures[future]
+                outcome: Dict[str, Any] = {"index": index, "filename": images[index][0]}
+                try:
+                    items = [barcode.toDict() for barcode in future.result()]
+                    outcome.update(success=True, count=len(items), items=items)
+                    barcodes += len(items)
+                except Exception as err:
+                    outcome.update(success=False, error=str(err))
+                outcomes[index] = outcome
+                if stream:
+                    self._writeChunk(outcome)
+
+        if stream:
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self._sendJson(200, {"success": True, "count": len(outcomes), "results": outcomes})
+        return 200, len(futures), barcodes, len(body)
+
+    def _writeChunk(self, payload: Dict[str, Any]) -> None:
+        line = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+        self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command-line entry point for the HTTP decode service.
+    """
+    parser = argparse.ArgumentParser(description='Serve barcode decoding over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', type=str, help='Address to bind')
+    parser.add_argument('-p', '--port', default=8000, type=int, help='Port to listen on')
+    parser.add_argument('-l', '--license', default='', type=str, help='Set a valid license key')
+    parser.add_argument('-w', '--workers', default=0, type=int, help='Number of readers, or the minimum with --max-workers (default: CPU count)')
+    parser.add_argument('--max-workers', default=0, type=int, help='Autoscale the reader pool up to this many readers')
+    parser.add_argument('--latency-target', default=0.0, type=float, help='p95 latency in ms above which an autoscaling pool grows')
+    parser.add_argument('--idle-timeout', default=30.0, type=float, help='Seconds before an idle reader above the minimum is released')
+    parser.add_argument('--queue', default=None, type=int, help='Images allowed to wait for a reader before 429 (default: 2 x max readers)')
+    parser.add_argument('--queue-timeout', default=0.0, type=float, help='Seconds to wait for a queue slot before answering 429')
+    parser.add_argument('--max-body', default=32, type=int, help='Maximum request size in MB')
+    parser.add_argument('--template', default='', type=str, help='JSON template file applied to every reader')
+    args = parser.parse_args(argv)
+
+    if args.license == '':
+        barcodeQrSDK.initLicense("DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ==")
+    else:
+        barcodeQrSDK.initLicense(args.license)
+
+    parameters = None
+    if args.template:
+        with open(args.template, encoding='utf-8') as f:
+            parameters = f.read()
+
+    if args.max_workers > 0:
+        pool = ReaderPool(minSize=args.workers or 1, maxSize=args.max_workers, maxQueue=args.queue,
+                          parameters=parameters, idleTimeout=args.idle_timeout,
+                          latencyTarget=args.latency_target / 1000.0 if args.latency_target > 0 else None)
+    else:
+        pool = ReaderPool(size=args.workers or None, maxQueue=args.queue, parameters=parameters)
+    readers = f"{pool.minSize}-{pool.maxSize}" if pool.autoscaling else str(pool.size)
+    try:
+        server = DecodeServer((args.host, args.port), pool, maxBody=args.max_body * 1024 * 1024,
+                              queueTimeout=args.queue_timeout)
+    except OSError as err:
+        print(err)
+        pool.close()
+        sys.exit(1)
+
+    print(f"Serving on http://{args.host}:{args.port} with {readers} readers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""sqlite-backed store for the annotation tool's working set.
+
+Every image is one row in ``images`` with its annotations as JSON, and every
+barcode is one row in ``barcodes``, indexed by text and by engine agreement.
+Edits only mark an image dirty; flush() writes the dirty rows in a single
+transaction, so saving costs the same with 10 images as with 100,000.
+"""
+import json
+import os
+import sqlite3
+import threading
+
+FORMAT = "barcode-benchmark/1.0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id          INTEGER PRIMARY KEY,
+    path        TEXT NOT NULL UNIQUE,
+    file        TEXT NOT NULL,
+    status      TEXT NOT NULL DEFAULT 'pending',
+    annotations TEXT                -- JSON list, NULL until detection ran
+);
+CREATE TABLE IF NOT EXISTS barcodes (
+    image_id INTEGER NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text     TEXT,
+    format   TEXT,
+    source   TEXT,
+    match    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS barcodes_image ON barcodes(image_id);
+CREATE INDEX IF NOT EXISTS barcodes_text ON barcodes(text);
+CREATE INDEX IF NOT EXISTS barcodes_match ON barcodes(match, source);
+CREATE INDEX IF NOT EXISTS images_status ON images(status);
+"""
+
+
+class AnnotationStore:
+    """Per-image annotation rows with dirty tracking and indexed queries.
+
+    put() keeps a reference to the annotation list, so edits made in place
+    after the call are picked up by the next flush(). The connection is
+    shared between threads and guarded by a lock.
+    """
+
+    def __init__(self, path=":memory:"):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirty = {}            # path -> [annotations, status or None]
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def put(self, path, annotations, status=None):
+        """Mark an image dirty. A status of None keeps the stored one."""
+        entry = self._dirty.get(path)
+        if entry is None:
+            self._dirty[path] = [annotations, status]
+        else:
+            entry[0] = annotations
+            if status is not None:
+                entry[1] = status
+
+    @property
+    def dirty(self):
+        return len(self._dirty)
+
+    def flush(self):
+        """Write all dirty images in one transaction; returns the row count.
+
+        On sqlite3.Error the images stay dirty and the error is re-raised.
+        """
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        rows = []
+        barcodes = []
+        for path, (anns, status) in dirty.items():
+            rows.append((path, os.path.basename(path), status or "pending",
+                         json.dumps(anns, ensure_ascii=False) if anns is not None else None,
+                         status))
+            for i, a in enumerate(anns or []):
+                barcodes.append((path, i, a.get("text"), a.get("format"),
+                                 a.get("source"), bool(a.get("match"))))
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO images (path, file, status, annotations) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET annotations = excluded.annotations, "
+                    "status = COALESCE(?, images.status)", rows)
+                self._conn.executemany(
+                    "DELETE FROM barcodes WHERE image_id = (SELECT id FROM images WHERE path = ?)",
+                    [(path,) for path in dirty])
+                self._conn.executemany(
+                    "INSERT INTO barcodes (image_id, position, text, format, source, match) "
+                    "SELECT id, ?, ?, ?, ?, ? FROM images WHERE path = ?",
+                    [(i, text, fmt, source, match, path)
+                     for path, i, text, fmt, source, match in barcodes])
+        except sqlite3.Error:
+            # Keep the edits for the next flush; newer puts take precedence
+            for path, (anns, status) in dirty.items():
+                entry = self._dirty.setdefault(path, [anns, status])
+                if entry[1] is None:
+                    entry[1] = status
+            raise
+        return len(rows)
+
+    def remove(self, paths):
+        paths = list(paths)
+        for path in paths:
+            self._dirty.pop(path, None)
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM images WHERE path = ?",
+                                   [(path,) for path in paths])
+
+    def clear(self):
+        self._dirty.clear()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM barcodes")
+            self._conn.execute("DELETE FROM images")
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Reads (flushed rows only)
+    # ------------------------------------------------------------------
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def load(self):
+        """Every stored image as (path, status, annotations), in insertion order."""
+        return [(path, status, json.loads(anns) if anns is not None else None)
+                for path, status, anns in self._query(
+                    "SELECT path, status, annotations FROM images ORDER BY id")]
+
+    def paths_with_status(self, status):
+        return [row[0] for row in self._query(
+            "SELECT path FROM images WHERE status = ? ORDER BY id", (status,))]
+
+    def disagreements(self):
+        """Images with a barcode that only one of DBR and ZXing decoded."""
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT i.path FROM barcodes b JOIN images i ON i.id = b.image_id "
+            "WHERE b.match = 0 AND b.source IN ('dbr', 'zxing') ORDER BY i.id")]
+
+    def find_text(self, text, prefix=False):
+        """Images with a barcode whose text equals, or starts with, ``text``."""
+        if prefix:
+            # A range instead of LIKE so that the text index is used
+            where, params = "b.text >= ? AND b.text < ?", (text, text + "\U0010ffff")
+        else:
+            where, params = "b.text = ?", (text,)
+        return [row[0] for row in self._query(
+            "SELECT DISTINCT i.path FROM barcodes b JOIN images i ON i.id = b.image_id "
+            f"WHERE {where} ORDER BY i.id", params)]
+
+    def export_json(self, json_path, paths, dataset="Annotated Collection"):
+        """Write ``paths`` to a barcode-benchmark/1.0 JSON file.
+
+        The output is identical to json.dump(..., indent=2) of the whole
+        document, but images are encoded one at a time. Returns the number
+        of images and barcodes written.
+        """
+        stored = {}
+        paths = list(paths)
+        with self._lock:
+            # Chunked to stay below SQLite's host parameter limit
+            for i in range(0, len(paths), 500):
+                chunk = paths[i:i + 500]
+                stored.update(self._conn.execute(
+                    "SELECT path, annotations FROM images WHERE path IN (%s)"
+                    % ",".join("?" * len(chunk)), chunk).fetchall())
+
+        images = []
+        total_barcodes = 0
+        for path in paths:
+            anns = json.loads(stored.get(path) or "null") or []
+            barcodes = [{"text": a["text"], "format": a["format"], "points": a["points"]}
+                        for a in anns]
+            total_barcodes += len(barcodes)
+            images.append({"file": os.path.basename(path), "barcodes": barcodes})
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            head = json.dumps({
+                "format": FORMAT,
+                "dataset": dataset,
+                "total_images": len(images),
+                "total_barcodes": total_barcodes,
+                "images": [],
+            }, indent=2, ensure_ascii=False)
+            if not images:
+                f.write(head)
+                return 0, 0
+            f.write(head[:-len("[]\n}")] + "[\n")
+            for i, entry in enumerate(images):
+                if i:
+                    f.write(",\n")
+                text = json.dumps(entry, indent=2, ensure_ascii=False)
+                f.write("    " + text.replace("\n", "\n    "))
+            f.write("\n  ]\n}")
+        return len(images), total_barcodes
@@ -1,10 +1,17 @@
 import sys
 import os
 import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 import cv2
 import zxingcpp
 
+from annotation_store import AnnotationStore
+
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QPushButton, QFileDialog, QListWidget, QListWidgetItem,
@@ -14,13 +21,14 @@ from PySide6.QtWidgets import (
     QFormLayout, QLineEdit, QDialogButtonBox, QGroupBox, QComboBox,
     QAbstractItemView, QTreeWidget, QTreeWidgetItem, QHeaderView
 )
-from PySide6.QtCore import Qt, QPointF, QRectF, QThread, Signal
+from PySide6.QtCore import Qt, QObject, QPointF, QRectF, QThread, QTimer, Signal
 from PySide6.QtGui import (
-    QImage, QPixmap, QPolygonF, QPen, QColor, QFont, QPainter, QBrush
+    QImage, QPixmap, QPolygonF, QPen, QColor, QFont, QPainter, QBrush, QTransform
 )
 
 from dynamsoft_barcode_reader_bundle import (
-    LicenseManager, CaptureVisionRouter, EnumPresetTemplate, EnumErrorCode
+    LicenseManager, CaptureVisionRouter, EnumPresetTemplate, EnumErrorCode,
+    EnumImagePixelFormat
 )
 
 # ---------------------------------------------------------------------------
@@ -182,6 +190,171 @@ def cv_to_qpixmap(cv_img):
     return QPixmap.fromImage(qimg.copy())
 
 
+def order_quad(points):
+    """Return four points as top-left, top-right, bottom-right, bottom-left.
+    Sorting by angle around the centroid (y down) gives clockwise order on
+    screen whichever way the user clicked, so the warp is never mirrored.
+    """
+    pts = np.float32(points)
+    center = pts.mean(axis=0)
+    pts = pts[np.argsort(np.arctan2(pts[:, 1] - center[1], pts[:, 0] - center[0]))]
+    return np.roll(pts, -int(np.argmin(pts.sum(axis=1))), axis=0)
+
+
+# ---------------------------------------------------------------------------
+# Image cache with background prefetch
+# ---------------------------------------------------------------------------
+PREVIEW_MAX_SIDE = 2048     # longest side of the preview shown at fit-to-view zoom
+PREFETCH_COUNT = 2          # images preloaded before and after the current one
+
+
+class _LRU:
+    """Thread-safe LRU mapping bounded by the total size of its values."""
+
+    def __init__(self, budget, sizeof):
+        self._items = OrderedDict()
+        self._size = 0
+        self._budget = budget
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= self._sizeof(old)
+            self._items[key] = value
+            self._size += self._sizeof(value)
+            # The newest entry is kept even if it alone exceeds the budget
+            while self._size > self._budget and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= self._sizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+
+class ImageCache(QObject):
+    """Decoded images, display previews and pixmaps, each LRU-evicted by a memory budget.
+
+    Previews are at most PREVIEW_MAX_SIDE pixels on their longest side and
+    are what the view shows. Full-resolution images are only kept once they
+    are asked for, for zooming in or decoding a crop. prefetch() decodes
+    previews on background threads; loaded(path, full) is emitted when a
+    background load has finished. pixmap() must be called from the GUI thread.
+    """
+    loaded = Signal(str, bool)         # abs_path, full resolution
+
+    def __init__(self, preview_budget=256 << 20, image_budget=512 << 20,
+                 pixmap_budget=256 << 20, workers=2, parent=None):
+        super().__init__(parent)
+        self._previews = _LRU(preview_budget, lambda entry: entry[0].nbytes)   # path -> (array, (w, h))
+        self._images = _LRU(image_budget, lambda img: img.nbytes)
+        self._pixmaps = _LRU(pixmap_budget, lambda pm: pm.width() * pm.height() * 4)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._pending = {}             # (path, full) -> Future
+        self._lock = threading.Lock()
+
+    def _load(self, path, full):
+        try:
+            img = load_image_cv(path)
+        except Exception as exc:
+            print(f"[Cache] {exc}")
+            return None
+        if img is None:
+            return None
+        h, w = img.shape[:2]
+        scale = PREVIEW_MAX_SIDE / max(h, w)
+        preview = img
+        if scale < 1:
+            size = (max(1, round(w * scale)), max(1, round(h * scale)))
+            preview = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        self._previews.put(path, (preview, (w, h)))
+        if full and preview is not img:
+            self._images.put(path, img)
+        return img if full else preview
+
+    def _run(self, path, full):
+        try:
+            return self._load(path, full)
+        finally:
+            with self._lock:
+                self._pending.pop((path, full), None)
+            self.loaded.emit(path, full)
+
+    def _submit(self, path, full):
+        with self._lock:
+            future = self._pending.get((path, full))
+            if future is None:
+                future = self._pool.submit(self._run, path, full)
+                self._pending[(path, full)] = future
+            return future
+
+    def _wait(self, path, full):
+        """Wait for a background load of path, or load it in this thread."""
+        with self._lock:
+            future = self._pending.get((path, full))
+        return future.result() if future is not None else self._load(path, full)
+
+    def preview(self, path):
+        """(preview array, (full width, full height)), or None if the image cannot be read."""
+        entry = self._previews.get(path)
+        if entry is None:
+            self._wait(path, False)
+            entry = self._previews.get(path)
+        return entry
+
+    def cached_image(self, path):
+        """Full-resolution image if it is already in memory, else None."""
+        entry = self._previews.get(path)
+        if entry is not None and entry[0].shape[1::-1] == entry[1]:
+            return entry[0]
+        return self._images.get(path)
+
+    def image(self, path):
+        """Full-resolution image, loaded on a miss; None if it cannot be read."""
+        img = self.cached_image(path)
+        return img if img is not None else self._wait(path, True)
+
+    def request_image(self, path):
+        """Load the full-resolution image in the background."""
+        if self.cached_image(path) is None:
+            self._submit(path, True)
+
+    def prefetch(self, paths):
+        for path in paths:
+            if self._previews.get(path) is None:
+                self._submit(path, False)
+
+    def pixmap(self, path, full=False):
+        pxmap = self._pixmaps.get((path, full))
+        if pxmap is None:
+            if full:
+                img = self.image(path)
+            else:
+                entry = self.preview(path)
+                img = entry[0] if entry is not None else None
+            if img is None:
+                return None
+            pxmap = cv_to_qpixmap(img)
+            self._pixmaps.put((path, full), pxmap)
+        return pxmap
+
+    def clear(self):
+        self._previews.clear()
+        self._images.clear()
+        self._pixmaps.clear()
+
+
 # ---------------------------------------------------------------------------
 # Draggable vertex handle for quad corners
 # ---------------------------------------------------------------------------
@@ -258,6 +431,7 @@ class DrawableGraphicsView(QGraphicsView):
     quad_drawn = Signal(list)          # list of (x,y) tuples
     crop_drawn = Signal(QRectF)        # bounding rect from drag
     files_dropped = Signal(list)       # list of file paths
+    zoomed = Signal()                  # after a wheel zoom step
 
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
@@ -431,6 +605,7 @@ class DrawableGraphicsView(QGraphicsView):
     def wheelEvent(self, event):
         factor = 1.15 if event.angleDelta().y() > 0 else 1.0 / 1.15
         self.scale(factor, factor)
+        self.zoomed.emit()
 
     # -- drag & drop into view --
     def dragEnterEvent(self, event):
@@ -466,31 +641,82 @@ class DrawableGraphicsView(QGraphicsView):
 # Background detection worker
 # ---------------------------------------------------------------------------
 class DetectionWorker(QThread):
+    """Detects barcodes in a batch of files with DBR and ZXing.
+
+    Files are spread over a small pool of routers. Each image is read once,
+    and DBR and ZXing decode it at the same time. file_done is emitted as
+    soon as a file is finished, so the order may differ from file_paths.
+    """
     progress = Signal(int, int)        # done, total
     file_done = Signal(str, list)      # abs_path, annotations
 
+    # Files detected at the same time, one CaptureVisionRouter each
+    MAX_ROUTERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+
     def __init__(self, file_paths, template_path=None, template_name=None, parent=None):
         super().__init__(parent)
         self._files = list(file_paths)
         self._template_path = template_path
         self._template_name = template_name or EnumPresetTemplate.PT_READ_BARCODES.value
 
-    def run(self):
+    def _create_router(self):
         router = CaptureVisionRouter()
         if self._template_path:
             err, msg = router.init_settings_from_file(self._template_path)
             if err != 0:
                 print(f"[DBR] Template load failed ({err}): {msg}")
+        return router
+
+    def run(self):
         total = len(self._files)
-        for i, path in enumerate(self._files):
-            anns = self._detect(router, path)
-            self.file_done.emit(path, anns)
-            self.progress.emit(i + 1, total)
+        if total == 0:
+            return
+        workers = min(self.MAX_ROUTERS, total)
+        routers = queue.Queue()
+        for _ in range(workers):
+            routers.put(self._create_router())
 
-    def _detect(self, router, path):
+        def detect(path):
+            router = routers.get()
+            try:
+                return self._detect(router, path, zxing_pool)
+            finally:
+                routers.put(router)
+
+        with ThreadPoolExecutor(max_workers=workers) as zxing_pool, \
+                ThreadPoolExecutor(max_workers=workers) as file_pool:
+            futures = {file_pool.submit(detect, path): path for path in self._files}
+            for done, future in enumerate(as_completed(futures), 1):
+                self.file_done.emit(futures[future], future.result())
+                self.progress.emit(done, total)
+
+    def _detect(self, router, path, zxing_pool=None):
+        try:
+            img = load_image_cv(path)
+        except Exception as exc:
+            print(f"[Load] {exc}")
+            img = None
+        # ZXing runs on its own thread while DBR decodes the same array here
+        zxing_future = None
+        if img is not None and zxing_pool is not None:
+            zxing_future = zxing_pool.submit(self._detect_zxing, img)
+        # DBR reads the file itself if OpenCV cannot decode it
+        dbr_items = self._detect_dbr(router, img if img is not None else path, self._template_name)
+        if zxing_future is not None:
+            zxing_items = zxing_future.result()
+        else:
+            zxing_items = self._detect_zxing(img) if img is not None else []
+        return self._merge(dbr_items, zxing_items)
+
+    @staticmethod
+    def _detect_dbr(router, image, template_name):
         dbr_items = []
         try:
-            result = router.capture(path, self._template_name)
+            if isinstance(image, np.ndarray):
+                # load_image_cv arrays are BGR; capture() assumes RGB otherwise
+                result = router.capture(image, EnumImagePixelFormat.IPF_BGR_888, template_name)
+            else:
+                result = router.capture(image, template_name)
             if result:
                 dbr_r = result.get_decoded_barcodes_result()
                 if dbr_r:
@@ -503,26 +729,30 @@ class DetectionWorker(QThread):
                         })
         except Exception as exc:
             print(f"[DBR] {exc}")
+        return dbr_items
 
+    @staticmethod
+    def _detect_zxing(img):
         zxing_items = []
         try:
-            img = cv2.imread(path)
-            if img is not None:
-                for zx in zxingcpp.read_barcodes(img):
-                    pos = zx.position
-                    zxing_items.append({
-                        "text":   zx.text,
-                        "format": zx.format.name,
-                        "points": [
-                            (pos.top_left.x,     pos.top_left.y),
-                            (pos.top_right.x,    pos.top_right.y),
-                            (pos.bottom_right.x, pos.bottom_right.y),
-                            (pos.bottom_left.x,  pos.bottom_left.y),
-                        ],
-                    })
+            for zx in zxingcpp.read_barcodes(img):
+                pos = zx.position
+                zxing_items.append({
+                    "text":   zx.text,
+                    "format": zx.format.name,
+                    "points": [
+                        (pos.top_left.x,     pos.top_left.y),
+                        (pos.top_right.x,    pos.top_right.y),
+                        (pos.bottom_right.x, pos.bottom_right.y),
+                        (pos.bottom_left.x,  pos.bottom_left.y),
+                    ],
+                })
         except Exception as exc:
             print(f"[ZXing] {exc}")
+        return zxing_items
 
+    @staticmethod
+    def _merge(dbr_items, zxing_items):
         # Build merged annotation list, keeping per-engine results
         zxing_text_set = {r["text"] for r in zxing_items}
         dbr_text_set = {r["text"] for r in dbr_items}
@@ -560,6 +790,67 @@ class DetectionWorker(QThread):
         return anns
 
 
+class QuadDecodeWorker(QThread):
+    """Decodes a drawn quad in the background to pre-fill the edit dialog."""
+    decoded = Signal(list)             # annotations, empty when nothing was read
+
+    def __init__(self, decode, parent=None):
+        super().__init__(parent)
+        self._decode = decode
+
+    def run(self):
+        try:
+            anns = self._decode()
+        except Exception as exc:
+            print(f"[Draw] Pre-fill decode failed: {exc}")
+            anns = []
+        self.decoded.emit(anns)
+
+
+# ---------------------------------------------------------------------------
+# Background export from the annotation store
+# ---------------------------------------------------------------------------
+STORE_PATH = os.path.join(os.path.expanduser("~"), ".barcode_annotation_tool", "annotations.db")
+STORE_FLUSH_MS = 1500       # dirty images are written at most this often
+
+
+class ExportWorker(QThread):
+    """Writes a barcode-benchmark/1.0 JSON file, optionally copying the images first."""
+    done = Signal(str, int, list)      # json_path, images written, errors
+
+    def __init__(self, store, json_path, paths, dataset, copy_to=None, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._json_path = json_path
+        self._paths = list(paths)
+        self._dataset = dataset
+        self._copy_to = copy_to
+
+    def run(self):
+        paths = self._paths
+        errors = []
+        if self._copy_to:
+            import shutil
+            copied = []
+            for path in paths:
+                filename = os.path.basename(path)
+                dest = os.path.join(self._copy_to, filename)
+                try:
+                    if os.path.abspath(path) != os.path.abspath(dest):
+                        shutil.copy2(path, dest)
+                except Exception as exc:
+                    errors.append(f"{filename}: {exc}")
+                    continue
+                copied.append(path)
+            paths = copied
+        written = 0
+        try:
+            written, _ = self._store.export_json(self._json_path, paths, self._dataset)
+        except Exception as exc:
+            errors.append(f"{os.path.basename(self._json_path)}: {exc}")
+        self.done.emit(self._json_path, written, errors)
+
+
 # ---------------------------------------------------------------------------
 # Main window
 # ---------------------------------------------------------------------------
@@ -585,7 +876,32 @@ class AnnotationApp(QMainWindow):
         # Workers for per-image re-detection (No Result list)
         self._redetect_workers = []
 
+        # Routers for crop decoding: template path -> (file mtime, router).
+        # The lock serialises crop decodes with the draw-mode pre-fill worker.
+        self._crop_routers = {}
+        self._crop_lock = threading.Lock()
+        self._quad_workers = []
+
+        # Decoded images and pixmaps; the scene shows a preview until zoomed in
+        self._image_cache = ImageCache(parent=self)
+        self._image_cache.loaded.connect(self._on_image_loaded)
+        self._pixmap_item = None
+        self._pixmap_full = False
+
+        # Working set persisted to sqlite; edits are flushed in batches
+        try:
+            self._store = AnnotationStore(STORE_PATH)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"[Store] {exc}; annotations are kept in memory only")
+            self._store = AnnotationStore()
+        self._store_timer = QTimer(self)
+        self._store_timer.setSingleShot(True)
+        self._store_timer.setInterval(STORE_FLUSH_MS)
+        self._store_timer.timeout.connect(self._flush_store)
+        self._export_workers = []
+
         self._build_ui()
+        self._restore_session()
 
     # ------------------------------------------------------------------
     # UI construction
@@ -727,6 +1043,7 @@ class AnnotationApp(QMainWindow):
         self._view = DrawableGraphicsView(self._scene)
         self._view.quad_drawn.connect(self._on_quad_drawn)
         self._view.crop_drawn.connect(self._on_crop_drawn)
+        self._view.zoomed.connect(self._on_view_zoomed)
         self._view.files_dropped.connect(self._add_paths)
         cv.addWidget(self._view, 1)
 
@@ -856,6 +1173,8 @@ class AnnotationApp(QMainWindow):
         for p in new:
             self._files[p] = {"annotations": None}
             self._all_paths.append(p)
+            self._store.put(p, None, "pending")
+        self._mark_dirty()
         self._status_lbl.setText(f"{len(self._all_paths)} image(s) loaded.")
         self._run_detection(new)
 
@@ -885,20 +1204,10 @@ class AnnotationApp(QMainWindow):
         self._worker.start()
 
     def _on_file_detected(self, path, annotations):
+        if path not in self._files:
+            return
         self._files[path]["annotations"] = annotations
-        filename = os.path.basename(path)
-
-        item = QListWidgetItem(filename)
-        item.setData(Qt.UserRole, path)
-        if len(annotations) == 0:
-            item.setForeground(QColor(120, 120, 120))
-            self._list_noresult.addItem(item)
-        elif all(a.get("match") for a in annotations):
-            item.setForeground(QColor(0, 130, 0))
-            self._list_verified.addItem(item)
-        else:
-            item.setForeground(QColor(180, 0, 0))
-            self._list_review.addItem(item)
+        self._add_list_item(path, self._detected_status(annotations))
 
         self._grp_verified.setTitle(f"Verified ({self._list_verified.count()})")
         self._grp_review.setTitle(f"Needs Review ({self._list_review.count()})")
@@ -908,6 +1217,30 @@ class AnnotationApp(QMainWindow):
         if self._current_path is None:
             self._select_file(path)
 
+    @staticmethod
+    def _detected_status(annotations):
+        """List a freshly detected image belongs in."""
+        if len(annotations) == 0:
+            return "noresult"
+        if all(a.get("match") for a in annotations):
+            return "verified"
+        return "review"
+
+    def _add_list_item(self, path, status, store=True):
+        """Append the file to the list for ``status`` and record it in the store."""
+        lst, color = {
+            "verified": (self._list_verified, QColor(0, 130, 0)),
+            "review":   (self._list_review, QColor(180, 0, 0)),
+            "noresult": (self._list_noresult, QColor(120, 120, 120)),
+        }[status]
+        item = QListWidgetItem(os.path.basename(path))
+        item.setData(Qt.UserRole, path)
+        item.setForeground(color)
+        lst.addItem(item)
+        if store:
+            self._store.put(path, self._files[path]["annotations"], status)
+            self._mark_dirty()
+
     def _on_progress(self, done, total):
         self._progress.setMaximum(total)
         self._progress.setValue(done)
@@ -952,6 +1285,8 @@ class AnnotationApp(QMainWindow):
         worker.start()
 
     def _on_redetect_file_done(self, path, annotations):
+        if path not in self._files:
+            return
         if not annotations:
             self.statusBar().showMessage(
                 "Re-detection: still no barcodes found.  "
@@ -969,16 +1304,11 @@ class AnnotationApp(QMainWindow):
                 break
 
         # Add to Verified or Needs Review
-        filename = os.path.basename(path)
-        item = QListWidgetItem(filename)
-        item.setData(Qt.UserRole, path)
         if all(a.get("match") for a in annotations):
-            item.setForeground(QColor(0, 130, 0))
-            self._list_verified.addItem(item)
+            self._add_list_item(path, "verified")
             dest = "Verified"
         else:
-            item.setForeground(QColor(180, 0, 0))
-            self._list_review.addItem(item)
+            self._add_list_item(path, "review")
             dest = "Needs Review"
 
         self._grp_verified.setTitle(f"Verified ({self._list_verified.count()})")
@@ -1004,18 +1334,67 @@ class AnnotationApp(QMainWindow):
         self._show_image(path)
         self._update_nav()
         self._highlight_list_item(path)
+        # Preload the neighbours so that next / previous is instant
+        if path in self._all_paths:
+            idx = self._all_paths.index(path)
+            self._image_cache.prefetch(
+                self._all_paths[idx + 1: idx + 1 + PREFETCH_COUNT]
+                + self._all_paths[max(0, idx - PREFETCH_COUNT): idx][::-1])
+
+    def _set_scene_image(self, path):
+        """Add the image of path to the scene, in full-resolution coordinates.
+
+        The full-resolution pixmap is used if it is already cached, otherwise
+        the preview scaled up to the image size.
+        """
+        self._pixmap_item = None
+        entry = self._image_cache.preview(path)
+        if entry is None:
+            return False
+        preview, (w, h) = entry
+        self._pixmap_full = preview.shape[1::-1] == (w, h)
+        full = not self._pixmap_full and self._image_cache.cached_image(path) is not None
+        pxmap = self._image_cache.pixmap(path, full)
+        if pxmap is None:
+            return False
+        self._pixmap_full = self._pixmap_full or full
+        self._pixmap_item = self._scene.addPixmap(pxmap)
+        self._pixmap_item.setTransformationMode(Qt.SmoothTransformation)
+        self._pixmap_item.setTransform(QTransform.fromScale(w / pxmap.width(), h / pxmap.height()))
+        self._scene.setSceneRect(QRectF(0, 0, w, h))
+        return True
+
+    def _on_view_zoomed(self):
+        path = self._current_path
+        if path is None or self._pixmap_item is None or self._pixmap_full:
+            return
+        # Preview pixels are magnified on screen: switch to full resolution
+        if self._view.transform().m11() * self._pixmap_item.transform().m11() > 1:
+            if self._image_cache.cached_image(path) is not None:
+                self._use_full_pixmap()
+            else:
+                self._image_cache.request_image(path)
+
+    def _on_image_loaded(self, path, full):
+        if full and path == self._current_path and self._pixmap_item is not None \
+                and not self._pixmap_full:
+            self._use_full_pixmap()
+
+    def _use_full_pixmap(self):
+        pxmap = self._image_cache.pixmap(self._current_path, True)
+        if pxmap is None:
+            return
+        self._pixmap_item.setPixmap(pxmap)
+        self._pixmap_item.setTransform(QTransform())
+        self._pixmap_full = True
 
     def _show_image(self, path):
         self._scene.clear()
         self._poly_items = {}
         self._handle_items = []
-        cv_img = load_image_cv(path)
-        if cv_img is None:
+        if not self._set_scene_image(path):
             self._status_lbl.setText(f"Cannot load: {os.path.basename(path)}")
             return
-        pxmap = cv_to_qpixmap(cv_img)
-        self._scene.addPixmap(pxmap)
-        self._scene.setSceneRect(QRectF(pxmap.rect()))
 
         anns = (self._files.get(path) or {}).get("annotations") or []
         self._draw_annotations(path, anns)
@@ -1142,14 +1521,11 @@ class AnnotationApp(QMainWindow):
         self._scene.clear()
         self._poly_items = {}
         self._handle_items = []
-        cv_img = load_image_cv(path)
-        if cv_img is not None:
-            pxmap = cv_to_qpixmap(cv_img)
-            self._scene.addPixmap(pxmap)
-            self._scene.setSceneRect(QRectF(pxmap.rect()))
+        self._set_scene_image(path)
         anns = (self._files.get(path) or {}).get("annotations") or []
         self._draw_annotations(path, anns)
         self._refresh_barcode_tree(anns)
+        self._mark_dirty(path)
 
     def _soft_redraw(self, path):
         """Lightweight redraw: update polygon shapes + tree without clearing scene."""
@@ -1159,6 +1535,14 @@ class AnnotationApp(QMainWindow):
                 pts = anns[i].get("points", [])
                 poly_item.setPolygon(QPolygonF([QPointF(x, y) for x, y in pts]))
         self._refresh_barcode_tree(anns)
+        self._mark_dirty(path)
+
+    def _mark_dirty(self, path=None):
+        """Queue ``path``'s annotations for the next batched store flush."""
+        if path is not None and path in self._files:
+            self._store.put(path, self._files[path]["annotations"])
+        if not self._store_timer.isActive():
+            self._store_timer.start()
 
     # ------------------------------------------------------------------
     # Navigator
@@ -1212,6 +1596,7 @@ class AnnotationApp(QMainWindow):
         # Remove from data
         self._all_paths.remove(path)
         del self._files[path]
+        self._store.remove([path])
 
         # Remove from list widgets
         self._remove_from_lists(path)
@@ -1222,6 +1607,7 @@ class AnnotationApp(QMainWindow):
         else:
             self._current_path = None
             self._scene.clear()
+            self._pixmap_item = None
             self._poly_items = {}
             self._handle_items = []
             self._tree_barcodes.clear()
@@ -1241,6 +1627,7 @@ class AnnotationApp(QMainWindow):
             return
         self._files.clear()
         self._all_paths.clear()
+        self._store.clear()
         self._current_path = None
         self._list_verified.clear()
         self._list_review.clear()
@@ -1249,6 +1636,8 @@ class AnnotationApp(QMainWindow):
         self._grp_review.setTitle("Needs Review (0)")
         self._grp_noresult.setTitle("No Result (0)")
         self._scene.clear()
+        self._pixmap_item = None
+        self._image_cache.clear()
         self._poly_items = {}
         self._handle_items = []
         self._tree_barcodes.clear()
@@ -1320,7 +1709,17 @@ class AnnotationApp(QMainWindow):
     def _on_quad_drawn(self, quad_points):
         if not self._current_path:
             return
-        dlg = BarcodeEditDialog(text="", fmt="Unknown")
+        path = self._current_path
+        dlg = BarcodeEditDialog()
+        dlg.text_edit.setPlaceholderText("Decoding...")
+        # Pre-fill with whatever the engines read in the rectified quad; the
+        # dialog opens at once and is filled in when the decode finishes
+        worker = QuadDecodeWorker(
+            lambda: self._decode_quad_region(path, quad_points, rectify=True))
+        worker.decoded.connect(lambda anns, d=dlg: self._prefill_quad_dialog(d, anns))
+        worker.finished.connect(lambda w=worker: self._quad_workers.remove(w))
+        self._quad_workers.append(worker)
+        worker.start()
         if dlg.exec() != QDialog.Accepted:
             return
         ann = {
@@ -1332,119 +1731,97 @@ class AnnotationApp(QMainWindow):
             "dbr":    None,
             "zxing":  None,
         }
-        path = self._current_path
         if self._files[path]["annotations"] is None:
             self._files[path]["annotations"] = []
         self._files[path]["annotations"].append(ann)
         self._redraw(path)
 
-    def _decode_quad_region(self, path, quad_points):
+    @staticmethod
+    def _prefill_quad_dialog(dlg, anns):
+        """Fill the draw-mode dialog, unless it was closed or the user already typed."""
+        dlg.text_edit.setPlaceholderText("")
+        if not anns or not dlg.isVisible() or dlg.text_edit.text():
+            return
+        dlg.text_edit.setText(anns[0]["text"])
+        idx = dlg.fmt_combo.findText(anns[0]["format"], Qt.MatchFixedString)
+        if idx >= 0:
+            dlg.fmt_combo.setCurrentIndex(idx)
+        else:
+            dlg.fmt_combo.setCurrentText(anns[0]["format"])
+
+    def _crop_router(self):
+        """Router with the active template, created once per template file."""
+        path = self._active_template_path
+        try:
+            mtime = os.path.getmtime(path) if path else None
+        except OSError:
+            mtime = None
+        cached = self._crop_routers.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        router = CaptureVisionRouter()
+        if path:
+            err, msg = router.init_settings_from_file(path)
+            if err != 0:
+                print(f"[DBR crop] Template load failed ({err}): {msg}")
+        # Reloaded whenever the template file changes on disk
+        self._crop_routers[path] = (mtime, router)
+        return router
+
+    def _decode_quad_region(self, path, quad_points, rectify=False):
         """Crop the bounding rect of quad_points, run DBR + ZXing, return annotations.
+        With rectify=True a four-point quad is warped to an upright rectangle
+        first, which helps with barcodes photographed at an angle.
         Coordinates are adjusted back to the original image space.
         """
-        cv_img = load_image_cv(path)
+        cv_img = self._image_cache.image(path)
         if cv_img is None:
             return []
 
-        h, w = cv_img.shape[:2]
-        xs = [p[0] for p in quad_points]
-        ys = [p[1] for p in quad_points]
-        x1 = max(0, int(min(xs)))
-        y1 = max(0, int(min(ys)))
-        x2 = min(w, int(max(xs)) + 1)
-        y2 = min(h, int(max(ys)) + 1)
-
-        if x2 <= x1 or y2 <= y1:
-            return []
-
-        crop = cv_img[y1:y2, x1:x2]
-
-        # --- Dynamsoft ---
-        dbr_items = []
-        try:
-            router = CaptureVisionRouter()
-            if self._active_template_path:
-                err, msg = router.init_settings_from_file(self._active_template_path)
-                if err != 0:
-                    print(f"[DBR crop] Template load failed ({err}): {msg}")
-            # Encode crop to temp PNG in memory and pass as numpy array path
-            import tempfile, os as _os
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-                tmp_path = tmp.name
-            cv2.imwrite(tmp_path, crop)
-            result = router.capture(tmp_path, self._active_template_name)
-            _os.unlink(tmp_path)
-            if result:
-                dbr_r = result.get_decoded_barcodes_result()
-                if dbr_r:
-                    for item in (dbr_r.get_items() or []):
-                        pts = item.get_location().points
-                        dbr_items.append({
-                            "text":   item.get_text(),
-                            "format": item.get_format_string(),
-                            "points": [(p.x + x1, p.y + y1) for p in pts],
-                        })
-        except Exception as exc:
-            print(f"[DBR crop] {exc}")
-
-        # --- ZXing ---
-        zxing_items = []
-        try:
-            for zx in zxingcpp.read_barcodes(crop):
-                pos = zx.position
-                zxing_items.append({
-                    "text":   zx.text,
-                    "format": zx.format.name,
-                    "points": [
-                        (pos.top_left.x + x1,     pos.top_left.y + y1),
-                        (pos.top_right.x + x1,    pos.top_right.y + y1),
-                        (pos.bottom_right.x + x1, pos.bottom_right.y + y1),
-                        (pos.bottom_left.x + x1,  pos.bottom_left.y + y1),
-                    ],
-                })
-        except Exception as exc:
-            print(f"[ZXing crop] {exc}")
+        # A perspective warp needs exactly four corners; other polygons are cropped
+        if rectify and len(quad_points) == 4:
+            src = order_quad(quad_points)
+            w = int(round(max(np.linalg.norm(src[1] - src[0]), np.linalg.norm(src[2] - src[3]))))
+            h = int(round(max(np.linalg.norm(src[3] - src[0]), np.linalg.norm(src[2] - src[1]))))
+            if w < 2 or h < 2:
+                return []
+            dst = np.float32([(0, 0), (w - 1, 0), (w - 1, h - 1), (0, h - 1)])
+            matrix = cv2.getPerspectiveTransform(src, dst)
+            crop = cv2.warpPerspective(cv_img, matrix, (w, h))
+            inverse = np.linalg.inv(matrix)
+
+            def to_image(points):
+                pts = np.float32(points).reshape(-1, 1, 2)
+                return [tuple(p) for p in cv2.perspectiveTransform(pts, inverse).reshape(-1, 2).tolist()]
+        else:
+            h, w = cv_img.shape[:2]
+            xs = [p[0] for p in quad_points]
+            ys = [p[1] for p in quad_points]
+            x1 = max(0, int(min(xs)))
+            y1 = max(0, int(min(ys)))
+            x2 = min(w, int(max(xs)) + 1)
+            y2 = min(h, int(max(ys)) + 1)
+
+            if x2 <= x1 or y2 <= y1:
+                return []
+
+            # DBR needs a contiguous buffer; ZXing accepts either
+            crop = np.ascontiguousarray(cv_img[y1:y2, x1:x2])
+
+            def to_image(points):
+                return [(x + x1, y + y1) for x, y in points]
+
+        # Both engines decode the crop array directly, no temporary file
+        with self._crop_lock:
+            dbr_items = DetectionWorker._detect_dbr(self._crop_router(), crop, self._active_template_name)
+            zxing_items = DetectionWorker._detect_zxing(crop)
+        for item in dbr_items + zxing_items:
+            item["points"] = to_image(item["points"])
 
         if not dbr_items and not zxing_items:
             return []
 
-        # Merge results, same logic as DetectionWorker._detect
-        zxing_text_set = {r["text"] for r in zxing_items}
-        dbr_text_set   = {r["text"] for r in dbr_items}
-        zxing_by_text  = {}
-        for r in zxing_items:
-            zxing_by_text.setdefault(r["text"], []).append(r)
-
-        anns = []
-        for r in dbr_items:
-            match = r["text"] in zxing_text_set
-            zxing_pair = None
-            if match and zxing_by_text.get(r["text"]):
-                zxing_pair = zxing_by_text[r["text"]].pop(0)
-            # Use the engine's detected quad points as the display polygon
-            display_pts = r["points"]
-            anns.append({
-                "text":   r["text"],
-                "format": r["format"],
-                "points": display_pts,
-                "match":  match,
-                "source": "dbr",
-                "dbr":    {"text": r["text"], "format": r["format"], "points": r["points"]},
-                "zxing":  {"text": zxing_pair["text"], "format": zxing_pair["format"],
-                           "points": zxing_pair["points"]} if zxing_pair else None,
-            })
-        for r in zxing_items:
-            if r["text"] not in dbr_text_set:
-                anns.append({
-                    "text":   r["text"],
-                    "format": r["format"],
-                    "points": r["points"],
-                    "match":  False,
-                    "source": "zxing",
-                    "dbr":    None,
-                    "zxing":  {"text": r["text"], "format": r["format"], "points": r["points"]},
-                })
-        return anns
+        return DetectionWorker._merge(dbr_items, zxing_items)
 
     # ------------------------------------------------------------------
     # Verify current image / Save verified dataset
@@ -1471,10 +1848,7 @@ class AnnotationApp(QMainWindow):
 
         # Add to Verified list
         filename = os.path.basename(path)
-        item = QListWidgetItem(filename)
-        item.setData(Qt.UserRole, path)
-        item.setForeground(QColor(0, 130, 0))
-        self._list_verified.addItem(item)
+        self._add_list_item(path, "verified")
         self._grp_verified.setTitle(f"Verified ({self._list_verified.count()})")
         self._grp_review.setTitle(f"Needs Review ({self._list_review.count()})")
         self._grp_noresult.setTitle(f"No Result ({self._list_noresult.count()})")
@@ -1497,55 +1871,40 @@ class AnnotationApp(QMainWindow):
         if not folder:
             return
 
-        import shutil
-        images_out = []
-        errors = []
-        total_barcodes = 0
-
-        for i in range(self._list_verified.count()):
-            path = self._list_verified.item(i).data(Qt.UserRole)
-            filename = os.path.basename(path)
-            dest = os.path.join(folder, filename)
+        paths = [self._list_verified.item(i).data(Qt.UserRole)
+                 for i in range(self._list_verified.count())]
+        self._start_export(os.path.join(folder, "annotations.json"), paths,
+                           "Verified Collection", copy_to=folder)
 
-            # Copy image file
-            try:
-                if os.path.abspath(path) != os.path.abspath(dest):
-                    shutil.copy2(path, dest)
-            except Exception as exc:
-                errors.append(f"{filename}: {exc}")
-                continue
-
-            anns = (self._files.get(path) or {}).get("annotations") or []
-            barcodes = [
-                {"text": a["text"], "format": a["format"], "points": a["points"]}
-                for a in anns
-            ]
-            total_barcodes += len(barcodes)
-            images_out.append({"file": filename, "barcodes": barcodes})
-
-        # Write JSON
-        out = {
-            "format":        "barcode-benchmark/1.0",
-            "dataset":       "Verified Collection",
-            "total_images":  len(images_out),
-            "total_barcodes": total_barcodes,
-            "images":        images_out,
-        }
-        json_path = os.path.join(folder, "annotations.json")
+    def _start_export(self, json_path, paths, dataset, copy_to=None):
+        """Flush pending edits, then write the JSON (and copy images) in the background."""
         try:
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(out, f, indent=2, ensure_ascii=False)
-        except Exception as exc:
-            errors.append(f"annotations.json: {exc}")
+            self._store.flush()
+        except sqlite3.Error as exc:
+            QMessageBox.warning(self, "Export Failed", str(exc))
+            return
+        worker = ExportWorker(self._store, json_path, paths, dataset, copy_to=copy_to)
+        worker.done.connect(
+            lambda json_path, written, errors, folder=copy_to:
+                self._on_export_done(json_path, written, errors, folder))
+        worker.finished.connect(lambda w=worker: self._export_workers.remove(w))
+        self._export_workers.append(worker)
+        self.statusBar().showMessage(f"Saving {len(paths)} image(s)...")
+        worker.start()
 
-        msg = (
-            f"Saved {len(images_out)} image(s) and annotations.json to:\n{folder}"
-        )
+    def _on_export_done(self, json_path, written, errors, folder=None):
+        self.statusBar().clearMessage()
+        if folder:
+            msg = f"Saved {written} image(s) and annotations.json to:\n{folder}"
+            title = "Verified Dataset Saved"
+        else:
+            msg = f"Annotations saved to:\n{json_path}"
+            title = "Saved"
         if errors:
             msg += "\n\nErrors:\n" + "\n".join(errors)
             QMessageBox.warning(self, "Saved with Errors", msg)
         else:
-            QMessageBox.information(self, "Verified Dataset Saved", msg)
+            QMessageBox.information(self, title, msg)
 
     # ------------------------------------------------------------------
     # DBR template import / export / reset
@@ -1737,14 +2096,7 @@ class AnnotationApp(QMainWindow):
 
             # Move item to the correct list
             self._remove_from_lists(img_path)
-            item = QListWidgetItem(basename)
-            item.setData(Qt.UserRole, img_path)
-            if annotations:
-                item.setForeground(QColor(0, 130, 0))
-                self._list_verified.addItem(item)
-            else:
-                item.setForeground(QColor(120, 120, 120))
-                self._list_noresult.addItem(item)
+            self._add_list_item(img_path, "verified" if annotations else "noresult")
 
             applied += 1
 
@@ -1773,33 +2125,63 @@ class AnnotationApp(QMainWindow):
             QMessageBox.warning(self, "No Files", "No images loaded.")
             return
 
-        images_out = []
-        total_barcodes = 0
-        for path in self._all_paths:
-            filename = os.path.basename(path)
-            anns = (self._files.get(path) or {}).get("annotations") or []
-            barcodes = [
-                {"text": a["text"], "format": a["format"], "points": a["points"]}
-                for a in anns
-            ]
-            total_barcodes += len(barcodes)
-            images_out.append({"file": filename, "barcodes": barcodes})
-
-        out = {
-            "format":  "barcode-benchmark/1.0",
-            "dataset": "Annotated Collection",
-            "total_images": len(images_out),
-            "total_barcodes": total_barcodes,
-            "images":  images_out,
-        }
-
         save_path, _ = QFileDialog.getSaveFileName(
             self, "Save Annotations", "annotations.json", "JSON (*.json)"
         )
         if save_path:
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(out, f, indent=2, ensure_ascii=False)
-            QMessageBox.information(self, "Saved", f"Annotations saved to:\n{save_path}")
+            self._start_export(save_path, self._all_paths, "Annotated Collection")
+
+    # ------------------------------------------------------------------
+    # Session store
+    # ------------------------------------------------------------------
+    def _restore_session(self):
+        """Reload the images and annotations saved by the previous session."""
+        missing = []
+        pending = []
+        for path, status, annotations in self._store.load():
+            if not os.path.isfile(path):
+                missing.append(path)
+                continue
+            for ann in annotations or []:
+                ann["points"] = [tuple(p) for p in ann.get("points", [])]
+            self._files[path] = {"annotations": annotations}
+            self._all_paths.append(path)
+            if annotations is None:
+                pending.append(path)
+            elif status in ("verified", "review", "noresult"):
+                self._add_list_item(path, status, store=False)
+            else:
+                # Edited before its list was stored; file it as detection would
+                self._add_list_item(path, self._detected_status(annotations))
+        if missing:
+            self._store.remove(missing)
+        if not self._all_paths:
+            return
+        self._grp_verified.setTitle(f"Verified ({self._list_verified.count()})")
+        self._grp_review.setTitle(f"Needs Review ({self._list_review.count()})")
+        self._grp_noresult.setTitle(f"No Result ({self._list_noresult.count()})")
+        self._status_lbl.setText(f"{len(self._all_paths)} image(s) restored.")
+        self._select_file(self._all_paths[0])
+        if pending:
+            self._run_detection(pending)
+
+    def _flush_store(self):
+        """Timer slot: write dirty images, retrying later if sqlite fails."""
+        try:
+            self._store.flush()
+        except sqlite3.Error as exc:
+            print(f"[Store] {exc}")
+            self.statusBar().showMessage(f"Could not save annotations: {exc}", 5000)
+            self._store_timer.start()
+
+    def closeEvent(self, event):
+        for worker in list(self._export_workers) + list(self._quad_workers):
+            worker.wait()
+        try:
+            self._store.close()
+        except sqlite3.Error as exc:
+            print(f"[Store] {exc}; unsaved edits were lost")
+        super().closeEvent(event)
 
 
 # ---------------------------------------------------------------------------
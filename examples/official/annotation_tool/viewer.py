@@ -23,6 +23,9 @@ Keyboard shortcuts
 import sys
 import os
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
@@ -46,6 +49,97 @@ except ImportError:
 _COLORS = ["#00c850", "#1e90ff", "#ffa000", "#dc32c8", "#00d2d2"]
 
 
+# ---------------------------------------------------------------------------
+# Image cache with background prefetch
+# ---------------------------------------------------------------------------
+PREVIEW_MAX_SIDE = 2048     # longest side of the preview shown until zoomed in
+PREFETCH_COUNT = 2          # images preloaded before and after the current one
+_EXIF_ORIENTATION = 0x0112
+
+
+class _ImageCache:
+    """LRU cache of decoded PIL images, bounded by a memory budget.
+
+    Entries are keyed by (path, full) and hold (image, full-resolution
+    size). Previews of JPEGs are decoded at a reduced scale with draft
+    mode, which is much faster than decoding the whole photo. Loads run
+    on a small thread pool; Tk objects are never touched off the main thread.
+    """
+
+    def __init__(self, budget=768 << 20, workers=2):
+        self._entries = OrderedDict()
+        self._size = 0
+        self._budget = budget
+        self._lock = threading.Lock()
+        self._pending = {}          # (path, full) -> Future
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def _load(path, full):
+        img = Image.open(path)
+        w, h = img.size
+        if img.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+            w, h = h, w
+        scale = PREVIEW_MAX_SIDE / max(w, h)
+        if not full and scale < 1:
+            img.draft("RGB", (int(img.size[0] * scale), int(img.size[1] * scale)))
+        img = ImageOps.exif_transpose(img)   # EXIF orientation
+        img = img.convert("RGB")
+        if not full and scale < 1:
+            img.thumbnail((PREVIEW_MAX_SIDE, PREVIEW_MAX_SIDE), Image.LANCZOS)
+        return img, (w, h)
+
+    def _put(self, key, entry):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[0].width * old[0].height * 3
+            self._entries[key] = entry
+            self._size += entry[0].width * entry[0].height * 3
+            # The newest entry is kept even if it alone exceeds the budget
+            while self._size > self._budget and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted[0].width * evicted[0].height * 3
+
+    def _run(self, path, full):
+        try:
+            entry = self._load(path, full)
+            self._put((path, full), entry)
+            return entry
+        finally:
+            with self._lock:
+                self._pending.pop((path, full), None)
+
+    def cached(self, path, full=False):
+        """(image, full size) if it is in memory, else None."""
+        with self._lock:
+            entry = self._entries.get((path, full))
+            if entry is not None:
+                self._entries.move_to_end((path, full))
+            return entry
+
+    def loading(self, path, full=False):
+        with self._lock:
+            return (path, full) in self._pending
+
+    def submit(self, path, full=False):
+        """Load in the background unless already loaded or loading."""
+        with self._lock:
+            if (path, full) in self._entries or (path, full) in self._pending:
+                return
+            self._pending[(path, full)] = self._pool.submit(self._run, path, full)
+
+    def get(self, path, full=False):
+        """(image, full size), loaded in this thread on a miss; raises if unreadable."""
+        entry = self.cached(path, full)
+        if entry is not None:
+            return entry
+        with self._lock:
+            future = self._pending.get((path, full))
+        return future.result() if future is not None else self._run(path, full)
+
+
+
 # ---------------------------------------------------------------------------
 # Main window
 # ---------------------------------------------------------------------------
@@ -69,8 +163,12 @@ class ViewerApp(_TkBase):
         self._pan_x = 0.0
         self._pan_y = 0.0
         self._drag_start = None
-        self._original_image = None   # PIL Image for the displayed frame
+        self._preview_image = None    # PIL preview of the displayed frame
+        self._image_size = None       # full-resolution (width, height)
         self._photo_ref = None        # ImageTk.PhotoImage (keep reference)
+        self._photo_key = None        # what _photo_ref was rendered from
+        self._full_job = None         # poll id while the full image loads
+        self._image_cache = _ImageCache()
         self._resize_job = None       # debounce id for resize events
 
         self._build_ui()
@@ -374,9 +472,7 @@ class ViewerApp(_TkBase):
         self._tree.delete(*self._tree.get_children())
 
         try:
-            pil_img = Image.open(abs_path)
-            pil_img = ImageOps.exif_transpose(pil_img)   # EXIF orientation
-            pil_img = pil_img.convert("RGB")
+            pil_img, image_size = self._image_cache.get(abs_path)
         except Exception as exc:
             self._canvas.create_text(
                 20, 20, anchor=tk.NW, text=f"Cannot read:\n{exc}", fill="red",
@@ -385,7 +481,8 @@ class ViewerApp(_TkBase):
             self._set_status(f"Cannot read: {basename}")
             return
 
-        self._original_image = pil_img
+        self._preview_image = pil_img
+        self._image_size = image_size
         self._zoom = 1.0
         self._pan_x = 0.0
         self._pan_y = 0.0
@@ -394,6 +491,11 @@ class ViewerApp(_TkBase):
         barcodes = self._json_records.get(basename, [])
         self._populate_tree(barcodes)
 
+        # Preload the neighbours so that next / previous is instant
+        for path in (self._image_paths[idx + 1: idx + 1 + PREFETCH_COUNT]
+                     + self._image_paths[max(0, idx - PREFETCH_COUNT): idx][::-1]):
+            self._image_cache.submit(path)
+
         if barcodes:
             self._set_status(f"{basename}  —  {len(barcodes)} barcode(s) from JSON")
         else:
@@ -402,11 +504,11 @@ class ViewerApp(_TkBase):
 
     def _fit_image(self):
         """Scale image to fill ~95 % of the canvas, centered."""
-        if self._original_image is None:
+        if self._image_size is None:
             return
         cw = self._canvas.winfo_width()  or 800
         ch = self._canvas.winfo_height() or 600
-        iw, ih = self._original_image.size
+        iw, ih = self._image_size
         scale = min(cw / iw, ch / ih) * 0.95
         self._zoom = scale
         self._pan_x = (cw - iw * scale) / 2
@@ -415,18 +517,36 @@ class ViewerApp(_TkBase):
 
     def _render(self):
         """Redraw the image (resized) and all overlay polygons."""
-        if self._original_image is None:
+        if self._image_size is None:
             return
         self._canvas.delete("all")
 
-        iw, ih = self._original_image.size
-        new_w = max(1, int(iw * self._zoom))
-        new_h = max(1, int(ih * self._zoom))
-
-        resized = self._original_image.resize((new_w, new_h), Image.LANCZOS)
-        self._photo_ref = ImageTk.PhotoImage(resized)
-        self._canvas.create_image(int(self._pan_x), int(self._pan_y),
-                                   anchor=tk.NW, image=self._photo_ref)
+        iw, ih = self._image_size
+        cw = self._canvas.winfo_width()  or 800
+        ch = self._canvas.winfo_height() or 600
+        # Only the visible part of the image is resized, in image coordinates
+        left = max(0.0, -self._pan_x / self._zoom)
+        top = max(0.0, -self._pan_y / self._zoom)
+        right = min(float(iw), (cw - self._pan_x) / self._zoom)
+        bottom = min(float(ih), (ch - self._pan_y) / self._zoom)
+
+        if right > left and bottom > top:
+            source, full = self._source_image()
+            sx = source.width / iw
+            sy = source.height / ih
+            box = (left * sx, top * sy, right * sx, bottom * sy)
+            size = (max(1, round((right - left) * self._zoom)),
+                    max(1, round((bottom - top) * self._zoom)))
+            # id(source) could be reused by the next image once this one is freed
+            path = self._image_paths[self._current_idx] if self._current_idx is not None else None
+            key = (path, full, box, size)
+            if key != self._photo_key:
+                resized = source.resize(size, Image.LANCZOS, box=box)
+                self._photo_ref = ImageTk.PhotoImage(resized)
+                self._photo_key = key
+            self._canvas.create_image(round(self._pan_x + left * self._zoom),
+                                      round(self._pan_y + top * self._zoom),
+                                      anchor=tk.NW, image=self._photo_ref)
 
         # Draw barcode overlays for the current image
         if self._current_idx is not None:
@@ -434,6 +554,31 @@ class ViewerApp(_TkBase):
             barcodes = self._json_records.get(basename, [])
             self._draw_overlays(barcodes)
 
+    def _source_image(self):
+        """(image, full): the preview, or the full image once zoomed past the preview's resolution."""
+        preview = self._preview_image
+        if preview.width >= self._image_size[0] or self._current_idx is None \
+                or self._image_size[0] * self._zoom <= preview.width:
+            return preview, False
+        path = self._image_paths[self._current_idx]
+        entry = self._image_cache.cached(path, full=True)
+        if entry is not None:
+            return entry[0], True
+        # Keep showing the upscaled preview until the full image is loaded
+        self._image_cache.submit(path, full=True)
+        if self._full_job is None:
+            self._full_job = self.after(50, self._check_full_image, path)
+        return preview, False
+
+    def _check_full_image(self, path):
+        self._full_job = None
+        if self._current_idx is None or self._image_paths[self._current_idx] != path:
+            return
+        if self._image_cache.cached(path, full=True) is not None:
+            self._render()
+        elif self._image_cache.loading(path, full=True):
+            self._full_job = self.after(50, self._check_full_image, path)
+
     def _draw_overlays(self, barcodes):
         for i, bc in enumerate(barcodes):
             pts_raw = bc.get("points", [])
@@ -494,7 +639,7 @@ class ViewerApp(_TkBase):
     # Canvas interactions: zoom + pan
     # ------------------------------------------------------------------
     def _on_wheel(self, event):
-        if self._original_image is None:
+        if self._image_size is None:
             return
         if event.num == 4 or getattr(event, "delta", 0) > 0:
             factor = 1.15
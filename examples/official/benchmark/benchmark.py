@@ -3,20 +3,35 @@
 from __future__ import annotations
 
 import argparse
+import gc
 import hashlib
 import json
+import math
 import os
 import platform
+import queue
 import random
 import re
-import statistics
+import struct
 import sys
+import threading
 import time
 from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 import cv2
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+from ground_truth import attach_ground_truth
+from memory_probe import MODES as MEMORY_MODES, MemoryProbe, linear_slope
+from timing_harness import Measurement, TimingHarness, TimingSettings, cpu_environment
 
 PROTOCOL = "protocol-v1"
 DEFAULT_LICENSE = "DLS2eyJoYW5kc2hha2VDb2RlIjoiMjAwMDAxLTE2NDk4Mjk3OTI2MzUiLCJvcmdhbml6YXRpb25JRCI6IjIwMDAwMSIsInNlc3Npb25QYXNzd29yZCI6IndTcGR6Vm05WDJrcEQ5YUoifQ=="
@@ -108,11 +123,29 @@ def sha256_file(path: Path) -> str:
     return h.hexdigest()
 
 
-def read_jsonl(path: Path) -> list[dict[str, Any]]:
+def iter_jsonl(path: Path, start: int = 0) -> Iterator[tuple[int, int, dict[str, Any]]]:
+    """Yield (start offset, end offset, record) for every line from byte offset start."""
     if not path.exists():
-        return []
-    with path.open(encoding="utf-8") as f:
-        return [json.loads(line) for line in f if line.strip()]
+        return
+    with path.open("rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            begin, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves one torn, unterminated last line.
+                if line.endswith(b"\n"):
+                    raise
+                return
+            yield begin, offset, record
+
+
+def read_jsonl(path: Path) -> list[dict[str, Any]]:
+    return [record for _, _, record in iter_jsonl(path)]
 
 
 def write_jsonl(path: Path, records: list[dict[str, Any]]) -> None:
@@ -122,7 +155,213 @@ def write_jsonl(path: Path, records: list[dict[str, Any]]) -> None:
             f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
 
 
+def trim_torn_tail(path: Path) -> None:
+    if not path.exists():
+        return
+    with path.open("r+b") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        # Walk back to the last newline in 64 KiB steps.
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            block = f.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        if end != size:
+            f.truncate(end)
+            print(f"trimmed {size - end} bytes of an incomplete record from {path}")
+
+
+def result_key(record: dict[str, Any]) -> tuple[str, str, int]:
+    return record["sample_id"], record["decoder"], record["repetition"]
+
+
+class KeyIndex:
+    """Sidecar index of the (sample_id, decoder, repetition) keys in results.jsonl.
+
+    Each line is [sample_id, decoder, repetition, start, end], the byte range of
+    the record in results.jsonl. The index is appended after the records reach
+    results.jsonl, so it can only lag behind. Loading it reads the small index,
+    checks that its last entry still points at the same record, and parses just
+    the results written after that. If the check fails, for example because
+    results.jsonl was replaced, the index is rebuilt from a full scan.
+    """
+
+    def __init__(self, results: Path) -> None:
+        self.results = results
+        self.path = results.with_name(results.name + ".keys")
+
+    def _read(self) -> tuple[set[tuple[str, str, int]], list[Any] | None]:
+        keys: set[tuple[str, str, int]] = set()
+        last = None
+        if self.path.exists():
+            with self.path.open("rb") as f:
+                for line in f:
+                    last = json.loads(line)
+                    keys.add((last[0], last[1], last[2]))
+        return keys, last
+
+    def _valid(self, last: list[Any] | None) -> bool:
+        if last is None:
+            return True
+        start, end = last[3], last[4]
+        if not self.results.exists() or self.results.stat().st_size < end:
+            return False
+        with self.results.open("rb") as f:
+            f.seek(start)
+            line = f.read(end - start)
+        try:
+            return line.endswith(b"\n") and result_key(json.loads(line)) == (last[0], last[1], last[2])
+        except (json.JSONDecodeError, KeyError):
+            return False
+
+    def load(self) -> set[tuple[str, str, int]]:
+        trim_torn_tail(self.path)
+        keys, last = self._read()
+        if not self._valid(last):
+            print(f"rebuilding {self.path}")
+            self.path.unlink()
+            keys, last = set(), None
+        entries = []
+        for start, end, record in iter_jsonl(self.results, last[4] if last else 0):
+            keys.add(result_key(record))
+            entries.append([*result_key(record), start, end])
+        self.append(entries)
+        return keys
+
+    def append(self, entries: list[list[Any]]) -> None:
+        with self.path.open("ab") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+
+
+class ResultWriter:
+    """Buffered append-only writer for results.jsonl.
+
+    Records are serialized as they arrive and written in batches, either every
+    flush_records records or every flush_interval seconds. Each batch ends on a
+    line boundary, so a crash can only lose the unwritten batch or leave one
+    torn last line. Opening the file trims such a line, and because resume reads
+    completed keys from the file, lost records are simply decoded again. When
+    an index is given, the keys and byte ranges of every written batch are
+    appended to it after the batch itself.
+
+    fsync is "never" (leave it to the OS), "batch" (after every written batch)
+    or "always" (after every record, the slowest and safest).
+    """
+
+    FSYNC_POLICIES = ("never", "batch", "always")
+
+    def __init__(self, path: Path, flush_records: int = 256, flush_interval: float = 5.0,
+                 fsync: str = "batch", compact: bool = False, index: KeyIndex | None = None) -> None:
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {self.FSYNC_POLICIES}, got {fsync!r}")
+        self.path = path
+        self.flush_records = max(1, flush_records)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.compact = compact
+        self.index = index
+        self.buffer: list[tuple[bytes, tuple[str, str, int]]] = []
+        self.last_flush = time.monotonic()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        trim_torn_tail(path)
+        self.file = path.open("ab")
+
+    def write(self, record: dict[str, Any]) -> None:
+        if self.compact:
+            # The manifest already holds the ground truth; sample_id and
+            # manifest_sha256 are enough to look it up again.
+            record = {key: value for key, value in record.items() if key != "ground_truth"}
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        self.buffer.append((line, result_key(record)))
+        if self.fsync == "always" or len(self.buffer) >= self.flush_records or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            offset = self.file.tell()
+            entries = []
+            for line, key in self.buffer:
+                entries.append([*key, offset, offset + len(line)])
+                offset += len(line)
+            self.file.write(b"".join(line for line, _ in self.buffer))
+            self.buffer.clear()
+            self.file.flush()
+            if self.fsync != "never":
+                os.fsync(self.file.fileno())
+            if self.index is not None:
+                self.index.append(entries)
+        self.last_flush = time.monotonic()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+# JPEG start-of-frame markers; 0xC4, 0xC8 and 0xCC share the range but are not frames.
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def probe_image_header(path: Path) -> tuple[int, int] | None:
+    """Width and height read from a PNG, JPEG, GIF or BMP header, or None."""
+    with path.open("rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head.startswith(b"BM") and len(head) >= 26:
+            if struct.unpack("<I", head[14:18])[0] == 12:
+                return struct.unpack("<HH", head[18:22])
+            width, height = struct.unpack("<ii", head[18:26])
+            return width, abs(height)
+        if head.startswith(b"\xff\xd8"):
+            f.seek(2)
+            while True:
+                byte = f.read(1)
+                while byte == b"\xff":
+                    marker = f.read(1)
+                    if marker != b"\xff":
+                        break
+                else:
+                    return None
+                if not marker:
+                    return None
+                code = marker[0]
+                if code == 0xD9:
+                    return None
+                if code == 0x01 or 0xD0 <= code <= 0xD8:
+                    continue
+                segment = f.read(2)
+                if len(segment) < 2:
+                    return None
+                if code in JPEG_SOF_MARKERS:
+                    frame = f.read(5)
+                    if len(frame) < 5:
+                        return None
+                    height, width = struct.unpack(">xHH", frame)
+                    return (width, height) if width and height else None
+                f.seek(struct.unpack(">H", segment)[0] - 2, os.SEEK_CUR)
+    return None
+
+
 def probe_image(path: Path) -> tuple[int, int]:
+    # Header first; other formats, and headers that do not parse, are decoded.
+    size = probe_image_header(path)
+    if size is not None:
+        return size
     image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
     if image is None:
         raise ValueError(f"could not load image: {path}")
@@ -130,6 +369,115 @@ def probe_image(path: Path) -> tuple[int, int]:
     return width, height
 
 
+def walk_files(root: Path) -> list[tuple[str, os.stat_result]]:
+    """Every file below root as (relative posix path, stat), from one scandir walk."""
+    files: list[tuple[str, os.stat_result]] = []
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.is_file():
+                    files.append((Path(entry.path).relative_to(root).as_posix(), entry.stat()))
+    # Same order as sorting the Path objects: component by component.
+    files.sort(key=lambda item: item[0].split("/"))
+    return files
+
+
+class AuditCache:
+    """sha256 and dimensions of audited images, keyed by relative path, size and mtime.
+
+    Stored as JSONL and rewritten in full after each audit, so entries for
+    deleted or changed files drop out.
+    """
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.previous: dict[str, dict[str, Any]] = {}
+        self.current: dict[str, dict[str, Any]] = {}
+        if path is not None:
+            self.previous = {entry["relative_path"]: entry for entry in read_jsonl(path)}
+
+    def lookup(self, relative_path: str, stat: os.stat_result) -> dict[str, Any] | None:
+        entry = self.previous.get(relative_path)
+        if entry is None or entry["bytes"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+            return None
+        self.current[relative_path] = entry
+        return entry
+
+    def store(self, relative_path: str, stat: os.stat_result, sha256: str, size: tuple[int, int] | None) -> dict[str, Any]:
+        entry = {
+            "relative_path": relative_path, "bytes": stat.st_size, "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256, "width": size[0] if size else None, "height": size[1] if size else None,
+        }
+        self.current[relative_path] = entry
+        return entry
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        write_jsonl(temporary, [self.current[key] for key in sorted(self.current)])
+        os.replace(temporary, self.path)
+
+
+def inspect_image(path: Path) -> tuple[str, tuple[int, int] | None]:
+    try:
+        size = probe_image(path)
+    except ValueError:
+        size = None
+    return sha256_file(path), size
+
+
+class ImageCache:
+    """Decoded manifest images stored as .npy files keyed by image_sha256.
+
+    The first load of an image reads the file, checks its bytes against the
+    manifest hash and stores the decoded pixels. Later loads, including later
+    sessions and other worker processes, memory-map the array instead of
+    decoding JPEG/PNG again. The size cap is checked per process.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        root.mkdir(parents=True, exist_ok=True)
+        self.used_bytes = sum(path.stat().st_size for path in root.glob("*.npy"))
+
+    def path(self, image_sha256: str) -> Path:
+        return self.root / f"{image_sha256}.npy"
+
+    def load(self, image_path: Path, image_sha256: str) -> tuple[Any, str | None, str]:
+        cached = self.path(image_sha256)
+        if image_sha256 and cached.exists():
+            try:
+                # Copy-on-write mapping: writable for the decoders, shared
+                # with other processes until something writes to it.
+                image = np.load(cached, mmap_mode="c")
+                # Touch every page now so page faults land in image_load_ns,
+                # not in the decoder's timed region.
+                int(image.reshape(-1)[::4096].sum())
+                return image, None, "cache"
+            except (OSError, ValueError):
+                cached.unlink(missing_ok=True)
+        try:
+            data = image_path.read_bytes()
+        except OSError:
+            return None, f"input_pipeline_error: could not load image: {image_path}", "file"
+        if image_sha256 and sha256_bytes(data) != image_sha256:
+            return None, f"input_pipeline_error: image sha256 does not match manifest: {image_path}", "file"
+        image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            return None, f"input_pipeline_error: could not load image: {image_path}", "file"
+        if image_sha256 and self.used_bytes + image.nbytes <= self.max_bytes:
+            temporary = cached.with_name(f"{cached.stem}.{os.getpid()}.tmp.npy")
+            np.save(temporary, image)
+            os.replace(temporary, cached)
+            self.used_bytes += cached.stat().st_size
+        return image, None, "file"
+
+
 def audit(args: argparse.Namespace) -> int:
     image_root = args.images.resolve()
     annotation_root = args.annotations.resolve()
@@ -138,13 +486,13 @@ def audit(args: argparse.Namespace) -> int:
     if not annotation_root.is_dir():
         raise SystemExit(f"annotation root is not a directory: {annotation_root}")
 
-    image_index: dict[str, Path] = {}
-    source_images = 0
-    for path in sorted(p for p in image_root.rglob("*") if p.is_file()):
-        rel = path.relative_to(image_root)
-        image_index[str(rel).replace("\\", "/").lower()] = rel
-        image_index[path.name.lower()] = rel
-        source_images += 1
+    image_files = walk_files(image_root)
+    image_stats = dict(image_files)
+    image_index: dict[str, str] = {}
+    for rel, _ in image_files:
+        image_index[rel.lower()] = rel
+        image_index[rel.rsplit("/", 1)[-1].lower()] = rel
+    source_images = len(image_files)
 
     summary = Counter()
     source_files: list[dict[str, Any]] = []
@@ -153,7 +501,40 @@ def audit(args: argparse.Namespace) -> int:
 
     json_files = sorted(p for p in annotation_root.rglob("*.json") if p.is_file())
     summary["annotation_files"] = len(json_files)
+    documents: list[tuple[Path, dict[str, Any]]] = []
+    needed: set[str] = set()
     for source in json_files:
+        doc = json.loads(source.read_text(encoding="utf-8"))
+        metadata = doc.get("_via_img_metadata")
+        if not isinstance(metadata, dict):
+            raise SystemExit(f"missing _via_img_metadata: {source}")
+        documents.append((source, metadata))
+        for item in metadata.values():
+            found = image_index.get(item.get("filename", "").lower())
+            if found is not None:
+                needed.add(found)
+
+    # Hash and probe every referenced image once, in parallel, skipping files
+    # whose size and mtime match the cache. hashlib releases the GIL while
+    # hashing, so threads keep several disks' worth of reads in flight.
+    cache = AuditCache(None if args.no_cache else args.cache)
+    image_info: dict[str, dict[str, Any]] = {}
+    stale: list[str] = []
+    for rel in sorted(needed):
+        entry = cache.lookup(rel, image_stats[rel])
+        if entry is None:
+            stale.append(rel)
+        else:
+            image_info[rel] = entry
+    print(f"Hashing {len(stale)} images ({len(needed) - len(stale)} cached) with {args.jobs} threads...", file=sys.stderr, flush=True)
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        for done, (rel, (sha256, size)) in enumerate(zip(stale, executor.map(inspect_image, (image_root / rel for rel in stale))), 1):
+            image_info[rel] = cache.store(rel, image_stats[rel], sha256, size)
+            if done % 1000 == 0:
+                print(f"hashed {done}/{len(stale)}", file=sys.stderr, flush=True)
+    cache.save()
+
+    for source, metadata in documents:
         print(f"Auditing {source.name}...", file=sys.stderr, flush=True)
         source_relative = str(source.relative_to(annotation_root)).replace("\\", "/")
         source_files.append({
@@ -161,10 +542,6 @@ def audit(args: argparse.Namespace) -> int:
             "sha256": sha256_file(source),
             "bytes": source.stat().st_size,
         })
-        doc = json.loads(source.read_text(encoding="utf-8"))
-        metadata = doc.get("_via_img_metadata")
-        if not isinstance(metadata, dict):
-            raise SystemExit(f"missing _via_img_metadata: {source}")
         for _, item in sorted(metadata.items()):
             filename = item.get("filename", "")
             found = image_index.get(filename.lower())
@@ -179,14 +556,14 @@ def audit(args: argparse.Namespace) -> int:
             if found is None:
                 summary["missing_images"] += 1
             else:
-                record["relative_path"] = str(found).replace("\\", "/")
-                referenced.add(record["relative_path"].lower())
-                absolute = image_root / found
-                record["image_sha256"] = sha256_file(absolute)
-                try:
-                    record["width"], record["height"] = probe_image(absolute)
-                except ValueError:
+                record["relative_path"] = found
+                referenced.add(found.lower())
+                info = image_info[found]
+                record["image_sha256"] = info["sha256"]
+                if info["width"] is None:
                     summary["invalid_annotations"] += 1
+                else:
+                    record["width"], record["height"] = info["width"], info["height"]
             record["sample_id"] = "sha256:" + sha256_bytes(
                 f"{source_relative}\0{filename}\0{record['image_sha256']}".encode("utf-8")
             )
@@ -261,7 +638,7 @@ def audit(args: argparse.Namespace) -> int:
                 post_overlap["invalid_annotations"] += 1
     hash_counts = Counter(r["image_sha256"] for r in records if r["image_sha256"])
     duplicate_image_records = sum(count - 1 for count in hash_counts.values() if count > 1)
-    unique_images = {str(p.relative_to(image_root)).replace("\\", "/").lower() for p in image_root.rglob("*") if p.is_file()}
+    unique_images = {rel.lower() for rel, _ in image_files}
 
     benchmark_records: list[dict[str, Any]] = []
     benchmark_hashes: set[str] = set()
@@ -353,6 +730,21 @@ def choose_smoke(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return output
 
 
+def zxing_polygon(item: Any) -> list[list[int]]:
+    position = getattr(item, "position", None)
+    corners = [getattr(position, name, None) for name in ("top_left", "top_right", "bottom_right", "bottom_left")]
+    if any(point is None for point in corners):
+        return []
+    return [[int(point.x), int(point.y)] for point in corners]
+
+
+def dynamsoft_polygon(item: Any) -> list[list[int]]:
+    try:
+        return [[int(point.x), int(point.y)] for point in item.get_location().points]
+    except Exception:
+        return []
+
+
 class ZXingPythonReader:
     name = "zxing-python"
 
@@ -386,6 +778,7 @@ class ZXingPythonReader:
                     "text": str(getattr(item, "text", "")),
                     "raw_bytes_hex": "",
                     "confidence": None,
+                    "polygon": zxing_polygon(item),
                 })
             return results, decode_ns, None
         except Exception as exc:
@@ -440,57 +833,227 @@ class DynamsoftPythonReader:
                     "text": str(text),
                     "raw_bytes_hex": raw_hex,
                     "confidence": confidence if isinstance(confidence, (int, float)) else None,
+                    "polygon": dynamsoft_polygon(item),
                 })
             return results, decode_ns, None
         except Exception as exc:
             return [], time.perf_counter_ns() - begin, f"decoder_error: {exc}"
 
 
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """Minimum-cost assignment of rows to columns (rows <= columns).
+
+    Shortest augmenting path Hungarian algorithm with the inner column scan
+    vectorised; ties go to the lowest column index, so the result is
+    deterministic. Returns the column assigned to each row.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.intp)  # row (1-based) assigned to each column; 0 is free
+    way = np.zeros(m + 1, dtype=np.intp)
+    for row in range(1, n + 1):
+        owner[0] = row
+        column = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current = owner[column]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = column
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            visited = np.flatnonzero(used)
+            u[owner[visited]] += delta
+            v[visited] -= delta
+            min_reduced[1:][free] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            owner[column] = owner[previous]
+            column = previous
+    assignment = np.full(n, -1, dtype=np.intp)
+    for column in range(1, m + 1):
+        if owner[column]:
+            assignment[owner[column] - 1] = column - 1
+    return assignment
+
+
+def bounding_boxes(polygons: list[Any]) -> np.ndarray:
+    """(x0, y0, x1, y1) per polygon; NaN when a polygon is missing."""
+    boxes = np.full((len(polygons), 4), np.nan)
+    for index, polygon in enumerate(polygons):
+        if polygon:
+            points = np.asarray(polygon, dtype=float)
+            boxes[index] = [*points.min(axis=0), *points.max(axis=0)]
+    return boxes
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of bounding boxes; 0 where either box is missing."""
+    x0 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y0 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x1 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y1 = np.minimum(a[:, None, 3], b[None, :, 3])
+    intersection = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - intersection
+    with np.errstate(invalid="ignore", divide="ignore"):
+        iou = np.where(union > 0, intersection / union, 0.0)
+    return np.nan_to_num(iou)
+
+
+def connected_components(edges: np.ndarray) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Row and column index sets of the connected components of a bipartite adjacency matrix."""
+    rows_seen = np.zeros(edges.shape[0], dtype=bool)
+    cols_seen = np.zeros(edges.shape[1], dtype=bool)
+    components = []
+    for start in np.flatnonzero(edges.any(axis=1)):
+        if rows_seen[start]:
+            continue
+        rows = np.zeros(edges.shape[0], dtype=bool)
+        rows[start] = True
+        cols = np.zeros(edges.shape[1], dtype=bool)
+        while True:
+            new_cols = edges[rows].any(axis=0) & ~cols
+            if not new_cols.any():
+                break
+            cols |= new_cols
+            rows |= edges[:, new_cols].any(axis=1)
+        rows_seen |= rows
+        cols_seen |= cols
+        components.append((np.flatnonzero(rows), np.flatnonzero(cols)))
+    return components
+
+
+def assign(score: np.ndarray) -> list[tuple[int, int]]:
+    """(row, column) pairs of a maximum-score assignment, leaving out pairs scored <= 0.
+
+    Uses SciPy's linear_sum_assignment when it is installed.
+    """
+    if linear_sum_assignment is not None:
+        assigned_rows, assigned_cols = linear_sum_assignment(score, maximize=True)
+        pairs = zip(assigned_rows.tolist(), assigned_cols.tolist())
+    else:
+        transposed = score.shape[0] > score.shape[1]
+        assignment = solve_assignment(-(score.T if transposed else score))
+        pairs = ((b, a) if transposed else (a, b) for a, b in enumerate(assignment.tolist()) if b >= 0)
+    return [(r, c) for r, c in pairs if score[r, c] > 0]
+
+
+def pair_by_iou(iou: np.ndarray) -> list[tuple[int, int]]:
+    """min(rows, columns) pairs of a block where every pair scores the same, maximising summed IoU.
+
+    Only overlapping boxes need an assignment, and they form small spatial
+    clusters. The remaining rows and columns are paired in index order.
+    """
+    pairs = []
+    if iou.any():
+        for cluster_rows, cluster_cols in connected_components(iou > 0):
+            pairs.extend((int(cluster_rows[r]), int(cluster_cols[c]))
+                         for r, c in assign(iou[np.ix_(cluster_rows, cluster_cols)]))
+    paired_rows = {r for r, _ in pairs}
+    paired_cols = {c for _, c in pairs}
+    pairs.extend(zip((r for r in range(iou.shape[0]) if r not in paired_rows),
+                     (c for c in range(iou.shape[1]) if c not in paired_cols)))
+    return pairs
+
+
 def match_results(truth: list[dict[str, Any]], predictions: list[dict[str, Any]], decoder: str) -> list[dict[str, Any]]:
-    output: list[dict[str, Any]] = []
-    used = [False] * len(predictions)
+    """One-to-one matching of ground truth to predictions.
+
+    Pairs are scored by outcome (correct, then wrong_format, then wrong_text),
+    so the matching maximises correct matches first, then wrong_format and
+    then wrong_text. Among equally scored matchings, bounding-box IoU decides
+    which duplicate goes with which when both sides have polygons. Outcomes
+    stay location-independent.
+
+    A format and text that occurs equally often in truth and predictions is
+    paired among itself first, by IoU; every optimal matching does that.
+    UPC-A/EAN-13 also match across formats and are left out. The rest is solved per
+    connected component of compatible pairs, and a component where every pair
+    has the same outcome only needs its overlapping boxes assigned.
+    """
+    outcomes: dict[int, dict[str, Any]] = {}
+    rows: list[int] = []
     for ti, gt in enumerate(truth):
         if not gt.get("decode_eligible"):
             continue
         if not is_supported(decoder, gt["format"]):
-            output.append({"truth_index": ti, "prediction_index": None, "outcome": "unsupported_format"})
-            continue
-        gt_fmt = canonical_format(gt["format"])
-        gt_text = normalized_payload(gt_fmt, gt["text"])
-        exact = None
-        for pi, prediction in enumerate(predictions):
-            if used[pi]:
-                continue
-            pf = canonical_format(prediction["format"])
-            pt = normalized_payload(pf, prediction["text"])
-            if (pf == gt_fmt and pt == gt_text) or ({pf, gt_fmt} == {"UPC_A", "EAN_13"} and normalized_payload("UPC_A", prediction["text"]) == normalized_payload("UPC_A", gt["text"])):
-                exact = pi
-                break
-        if exact is not None:
-            used[exact] = True
-            output.append({"truth_index": ti, "prediction_index": exact, "outcome": "correct"})
-            continue
-        same_text = None
-        same_format = None
-        for pi, prediction in enumerate(predictions):
-            if used[pi]:
-                continue
-            pf = canonical_format(prediction["format"])
-            if same_text is None and normalized_payload(pf, prediction["text"]) == gt_text:
-                same_text = pi
-            if same_format is None and pf == gt_fmt:
-                same_format = pi
-        if same_text is not None:
-            used[same_text] = True
-            output.append({"truth_index": ti, "prediction_index": same_text, "outcome": "wrong_format"})
-        elif same_format is not None:
-            used[same_format] = True
-            output.append({"truth_index": ti, "prediction_index": same_format, "outcome": "wrong_text"})
+            outcomes[ti] = {"truth_index": ti, "prediction_index": None, "outcome": "unsupported_format"}
         else:
-            output.append({"truth_index": ti, "prediction_index": None, "outcome": "not_found"})
-    for pi, was_used in enumerate(used):
-        if not was_used:
-            output.append({"truth_index": None, "prediction_index": pi, "outcome": "extra_result"})
+            rows.append(ti)
+    used: set[int] = set()
+    if rows and predictions:
+        vocabulary: dict[str, int] = {}
+
+        def ids(items: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+            formats, texts, gtins = [], [], []
+            for item in items:
+                fmt = canonical_format(item["format"])
+                formats.append(vocabulary.setdefault("format:" + fmt, len(vocabulary)))
+                texts.append(vocabulary.setdefault("text:" + normalized_payload(fmt, item["text"]), len(vocabulary)))
+                # UPC-A and EAN-13 match across formats on the UPC-A normalized payload.
+                gtins.append(vocabulary.setdefault("gtin:" + normalized_payload("UPC_A", item["text"]), len(vocabulary)) if fmt in {"UPC_A", "EAN_13"} else -1)
+            return np.array(formats), np.array(texts), np.array(gtins)
+
+        truth_format, truth_text, truth_gtin = ids([truth[ti] for ti in rows])
+        pred_format, pred_text, pred_gtin = ids(predictions)
+        same_format = truth_format[:, None] == pred_format[None, :]
+        same_text = truth_text[:, None] == pred_text[None, :]
+        cross_gtin = (truth_gtin[:, None] == pred_gtin[None, :]) & (truth_gtin[:, None] >= 0) & ~same_format
+        correct = (same_format & same_text) | cross_gtin
+        wrong_format = same_text & ~correct
+        wrong_text = same_format & ~correct
+        tier = np.where(correct, 3, np.where(wrong_format, 2, np.where(wrong_text, 1, 0)))
+        # Weights make one better outcome worth more than any number of worse ones
+        # and keep the summed IoU tie-break below one.
+        k = float(min(len(rows), len(predictions)) + 1)
+        weights = np.array([0.0, 1.0, k, k * k])
+        iou = box_iou(bounding_boxes([truth[ti].get("polygon") for ti in rows]),
+                      bounding_boxes([p.get("polygon") for p in predictions]))
+        score = np.where(tier > 0, weights[tier] + iou / k, 0.0)
+        names = {3: "correct", 2: "wrong_format", 1: "wrong_text"}
+        pairs: list[tuple[int, int]] = []
+        by_key: dict[tuple[int, int], tuple[list[int], list[int]]] = defaultdict(lambda: ([], []))
+        for ri in np.flatnonzero(truth_gtin < 0).tolist():
+            by_key[truth_format[ri], truth_text[ri]][0].append(ri)
+        for pi in np.flatnonzero(pred_gtin < 0).tolist():
+            by_key[pred_format[pi], pred_text[pi]][1].append(pi)
+        for key_rows, key_cols in by_key.values():
+            # With unequal counts, which duplicate is left over can change
+            # the IoU tie-break elsewhere, so those keys are solved below.
+            if key_rows and len(key_rows) == len(key_cols):
+                pairs.extend((key_rows[r], key_cols[c]) for r, c in pair_by_iou(iou[np.ix_(key_rows, key_cols)]))
+        free_rows = np.ones(len(rows), dtype=bool)
+        free_cols = np.ones(len(predictions), dtype=bool)
+        for ri, pi in pairs:
+            free_rows[ri] = free_cols[pi] = False
+        left_rows, left_cols = np.flatnonzero(free_rows), np.flatnonzero(free_cols)
+        if len(left_rows) and len(left_cols):
+            left_tier = tier[np.ix_(left_rows, left_cols)]
+            for component_rows, component_cols in connected_components(left_tier > 0):
+                component_rows, component_cols = left_rows[component_rows], left_cols[component_cols]
+                block_tier = tier[np.ix_(component_rows, component_cols)]
+                if (block_tier == block_tier[0, 0]).all():
+                    block_pairs = pair_by_iou(iou[np.ix_(component_rows, component_cols)])
+                else:
+                    block_pairs = assign(score[np.ix_(component_rows, component_cols)])
+                pairs.extend((int(component_rows[r]), int(component_cols[c])) for r, c in block_pairs)
+        for ri, pi in pairs:
+            used.add(pi)
+            outcomes[rows[ri]] = {"truth_index": rows[ri], "prediction_index": pi, "outcome": names[int(tier[ri, pi])]}
+    output = [outcomes.get(ti, {"truth_index": ti, "prediction_index": None, "outcome": "not_found"})
+              for ti, gt in enumerate(truth) if gt.get("decode_eligible")]
+    output.extend({"truth_index": None, "prediction_index": pi, "outcome": "extra_result"} for pi in range(len(predictions)) if pi not in used)
     return output
 
 
@@ -504,8 +1067,125 @@ def load_license(args: argparse.Namespace) -> str:
     return DEFAULT_LICENSE
 
 
-def completed_keys(path: Path) -> set[tuple[str, str, int]]:
-    return {(row["sample_id"], row["decoder"], row["repetition"]) for row in read_jsonl(path)}
+def config_hash(decoder_name: str, dbr_template: str) -> str:
+    if decoder_name == ZXingPythonReader.name:
+        return "zxing-python:all-supported"
+    return f"dbr-template:{dbr_template}"
+
+
+class DecodeFailed(Exception):
+    pass
+
+
+def timed_decode(decoder: Any, image: Any, harness: TimingHarness | None) -> tuple[list[dict[str, Any]], int, str | None, dict[str, Any] | None]:
+    if harness is None:
+        return (*decoder.decode(image), None)
+    predictions: list[list[dict[str, Any]]] = []
+
+    def run() -> int:
+        result, decode_ns, error = decoder.decode(image)
+        if error:
+            raise DecodeFailed(result, decode_ns, error)
+        predictions[:] = [result]
+        return decode_ns
+
+    try:
+        measurement: Measurement = harness.measure(run)
+    except DecodeFailed as failed:
+        return (*failed.args, None)
+    return predictions[0], round(measurement.median_ns), None, measurement.to_dict()
+
+
+def benchmark_sample(decoders: list[Any], sample: dict[str, Any], repetition: int, images: Path, manifest_hash: str,
+                     dbr_template: str, completed: set[tuple[str, str, int]], cache: ImageCache | None = None,
+                     harness: TimingHarness | None = None, probe: MemoryProbe | None = None) -> list[dict[str, Any]]:
+    image_path = images / sample["relative_path"]
+    load_begin = time.perf_counter_ns()
+    if cache is not None:
+        image, load_error, image_source = cache.load(image_path, sample["image_sha256"])
+    else:
+        image = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+        load_error = None if image is not None else f"input_pipeline_error: could not load image: {image_path}"
+        image_source = "file"
+    image_load_ns = time.perf_counter_ns() - load_begin
+    order = decoders[:]
+    seed = int(hashlib.sha256(f"{sample['sample_id']}:{repetition}".encode("utf-8")).hexdigest()[:16], 16)
+    random.Random(seed).shuffle(order)
+    records: list[dict[str, Any]] = []
+    for decoder in order:
+        key = (sample["sample_id"], decoder.name, repetition)
+        if key in completed:
+            continue
+        memory = None
+        if load_error:
+            predictions, decode_ns, error, timing = [], 0, load_error, None
+            matches = [{"truth_index": i, "prediction_index": None, "outcome": "input_pipeline_error"} for i, _ in enumerate(sample["ground_truth"])]
+        else:
+            predictions, decode_ns, error, timing = timed_decode(decoder, image, harness)
+            if probe is not None and not error:
+                # A separate untimed pass, so the RSS sampler thread does not slow down decode_ns
+                _, memory = probe.measure(lambda: decoder.decode(image))
+            matches = [{"truth_index": i, "prediction_index": None, "outcome": "decoder_error"} for i, _ in enumerate(sample["ground_truth"])] if error else match_results(sample["ground_truth"], predictions, decoder.name)
+        records.append({
+            "protocol": PROTOCOL,
+            "manifest_sha256": manifest_hash,
+            "sample_id": sample["sample_id"],
+            "relative_path": sample["relative_path"],
+            "annotation_file": sample["annotation_file"],
+            "image_sha256": sample["image_sha256"],
+            "width": sample["width"],
+            "height": sample["height"],
+            "ground_truth": sample["ground_truth"],
+            "decoder": decoder.name,
+            "decoder_version": decoder.version,
+            "config_sha256": config_hash(decoder.name, dbr_template),
+            "repetition": repetition,
+            "image_load_ns": image_load_ns,
+            "image_source": image_source,
+            "decode_ns": decode_ns,
+            "timing": timing,
+            "memory": memory,
+            "error": error,
+            "predictions": predictions,
+            "matches": matches,
+        })
+    return records
+
+
+# Decoders, image cache, timing harness and memory probe owned by a --workers process, created once by init_worker.
+_WORKER_DECODERS: list[Any] = []
+_WORKER_CACHE: ImageCache | None = None
+_WORKER_HARNESS: TimingHarness | None = None
+_WORKER_PROBE: MemoryProbe | None = None
+
+
+def pin_to_core(core: int) -> None:
+    # Only Linux exposes affinity in the standard library; elsewhere the OS
+    # scheduler places the single-threaded worker.
+    if hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            pass
+
+
+def init_worker(license_key: str, dbr_template: str, cores: Any, cache: tuple[Path, int] | None,
+                timing: TimingSettings | None, memory: str) -> None:
+    global _WORKER_DECODERS, _WORKER_CACHE, _WORKER_HARNESS, _WORKER_PROBE
+    try:
+        pin_to_core(cores.get(timeout=5))
+    except queue.Empty:
+        # A replacement for a crashed worker; the original core assignment is gone.
+        pass
+    _WORKER_DECODERS = [ZXingPythonReader(), DynamsoftPythonReader(license_key, dbr_template)]
+    _WORKER_CACHE = ImageCache(*cache) if cache else None
+    _WORKER_HARNESS = TimingHarness(timing) if timing else None
+    _WORKER_PROBE = MemoryProbe(memory) if memory != "none" else None
+
+
+def run_worker_task(task: tuple[dict[str, Any], int, Path, str, str, set[tuple[str, str, int]]]) -> list[dict[str, Any]]:
+    sample, repetition, images, manifest_hash, dbr_template, completed = task
+    return benchmark_sample(_WORKER_DECODERS, sample, repetition, images, manifest_hash, dbr_template, completed, _WORKER_CACHE, _WORKER_HARNESS, _WORKER_PROBE)
 
 
 def execute(args: argparse.Namespace, smoke: bool) -> int:
@@ -517,66 +1197,256 @@ def execute(args: argparse.Namespace, smoke: bool) -> int:
     output = args.output
     output.mkdir(parents=True, exist_ok=True)
     jsonl = output / "results.jsonl"
-    completed = completed_keys(jsonl)
+    key_index = KeyIndex(jsonl)
+    completed = key_index.load()
+    license_key = load_license(args)
     zxing = ZXingPythonReader()
-    dbr = DynamsoftPythonReader(load_license(args), args.dbr_template)
+    dbr = DynamsoftPythonReader(license_key, args.dbr_template)
     decoders = [zxing, dbr]
     manifest_hash = sha256_file(args.manifest)
-    zxing_config_hash = "zxing-python:all-supported"
-    dbr_config_hash = f"dbr-template:{args.dbr_template}"
-    print(f"zxing-python={zxing.version} dynamsoft-dbr-python={dbr.version} images={len(samples)} repetitions={args.repetitions}")
-
-    for repetition in range(args.repetitions):
-        for index, sample in enumerate(samples, 1):
-            image_path = args.images / sample["relative_path"]
-            load_begin = time.perf_counter_ns()
-            image = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
-            image_load_ns = time.perf_counter_ns() - load_begin
-            load_error = None if image is not None else f"input_pipeline_error: could not load image: {image_path}"
-            order = decoders[:]
-            seed = int(hashlib.sha256(f"{sample['sample_id']}:{repetition}".encode("utf-8")).hexdigest()[:16], 16)
-            random.Random(seed).shuffle(order)
-            for decoder in order:
-                key = (sample["sample_id"], decoder.name, repetition)
-                if key in completed:
-                    continue
-                if load_error:
-                    predictions, decode_ns, error = [], 0, load_error
-                    matches = [{"truth_index": i, "prediction_index": None, "outcome": "input_pipeline_error"} for i, _ in enumerate(sample["ground_truth"])]
-                else:
-                    predictions, decode_ns, error = decoder.decode(image)
-                    matches = [{"truth_index": i, "prediction_index": None, "outcome": "decoder_error"} for i, _ in enumerate(sample["ground_truth"])] if error else match_results(sample["ground_truth"], predictions, decoder.name)
-                record = {
-                    "protocol": PROTOCOL,
-                    "manifest_sha256": manifest_hash,
-                    "sample_id": sample["sample_id"],
-                    "relative_path": sample["relative_path"],
-                    "annotation_file": sample["annotation_file"],
-                    "image_sha256": sample["image_sha256"],
-                    "width": sample["width"],
-                    "height": sample["height"],
-                    "ground_truth": sample["ground_truth"],
-                    "decoder": decoder.name,
-                    "decoder_version": decoder.version,
-                    "config_sha256": zxing_config_hash if decoder.name == zxing.name else dbr_config_hash,
-                    "repetition": repetition,
-                    "image_load_ns": image_load_ns,
-                    "decode_ns": decode_ns,
-                    "error": error,
-                    "predictions": predictions,
-                    "matches": matches,
-                }
-                with jsonl.open("a", encoding="utf-8", newline="\n") as f:
-                    f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
-                completed.add(key)
-            if index % 100 == 0 or index == len(samples):
-                print(f"repetition={repetition + 1} progress={index}/{len(samples)}", flush=True)
-    generate_summary(jsonl, output / "summary.json")
-    generate_results_json(jsonl, output / "summary.json", output / "results.json")
+    workers = max(1, args.workers)
+    cache_settings = (args.image_cache, args.image_cache_max_mb * 1024 * 1024) if args.image_cache else None
+    cache = ImageCache(*cache_settings) if cache_settings else None
+    timing = TimingSettings(warmup=args.warmup, min_repeats=args.min_repeats, max_repeats=args.max_repeats, target_ci=args.target_ci)
+    timing = None if timing.single_shot else timing
+    harness = TimingHarness(timing) if timing else None
+    probe = MemoryProbe(args.memory) if args.memory != "none" else None
+    for note in cpu_environment()["notes"]:
+        print(f"warning: {note}")
+    print(f"zxing-python={zxing.version} dynamsoft-dbr-python={dbr.version} images={len(samples)} repetitions={args.repetitions} workers={workers}")
+
+    def tasks():
+        for repetition in range(args.repetitions):
+            for index, sample in enumerate(samples, 1):
+                keys = {(sample["sample_id"], d.name, repetition) for d in decoders}
+                yield index, repetition, sample, keys & completed
+
+    def write(records: list[dict[str, Any]]) -> None:
+        for record in records:
+            writer.write(record)
+            completed.add(result_key(record))
+
+    def progress(index: int, repetition: int) -> None:
+        if index % 100 == 0 or index == len(samples):
+            print(f"repetition={repetition + 1} progress={index}/{len(samples)}", flush=True)
+
+    # Leaving the with block, also on Ctrl+C, writes out whatever is buffered.
+    with ResultWriter(jsonl, args.flush_records, args.flush_interval, args.fsync, args.compact_results, key_index) as writer:
+        if workers == 1:
+            for index, repetition, sample, done in tasks():
+                if len(done) < len(decoders):
+                    write(benchmark_sample(decoders, sample, repetition, args.images, manifest_hash, args.dbr_template, done, cache, harness, probe))
+                progress(index, repetition)
+        else:
+            import multiprocessing
+
+            # The parent's decoders only validated the license and versions; every
+            # worker process creates and owns its own pair.
+            cpu_count = os.cpu_count() or workers
+            cores = multiprocessing.Queue()
+            for worker in range(workers):
+                cores.put(worker % cpu_count)
+            jobs = [job for job in tasks() if len(job[3]) < len(decoders)]
+            with multiprocessing.Pool(workers, initializer=init_worker, initargs=(license_key, args.dbr_template, cores, cache_settings, timing, args.memory)) as pool:
+                payloads = ((sample, repetition, args.images, manifest_hash, args.dbr_template, done) for _, repetition, sample, done in jobs)
+                # imap yields in submission order, so the JSONL is identical no
+                # matter which worker finishes first.
+                for (index, repetition, _, _), records in zip(jobs, pool.imap(run_worker_task, payloads, chunksize=1)):
+                    write(records)
+                    progress(index, repetition)
+    generate_summary(jsonl, output / "summary.json", args.manifest)
+    generate_results_json(jsonl, output / "summary.json", output / "results.json", args.manifest)
     print(f"wrote {jsonl}, {output / 'summary.json'} and {output / 'results.json'}")
     return 0
 
 
+def concurrency_levels(value: str | None) -> list[int]:
+    if value:
+        return sorted({int(level) for level in value.split(",") if level.strip()})
+    cpu_count = os.cpu_count() or 1
+    levels = [1 << i for i in range(cpu_count.bit_length()) if 1 << i <= cpu_count]
+    return levels if levels[-1] == cpu_count else levels + [cpu_count]
+
+
+def throughput_level(decoders: list[Any], images: list[Any], duration: float) -> dict[str, Any]:
+    """Closed-loop load: every thread decodes back to back with its own decoder until the deadline."""
+    concurrency = len(decoders)
+    window: dict[str, float] = {}
+    outcomes: list[tuple[list[int], int]] = [([], 0)] * concurrency
+
+    def start() -> None:
+        window["cpu"] = time.process_time()
+        window["start"] = time.perf_counter()
+        window["deadline"] = window["start"] + duration
+
+    barrier = threading.Barrier(concurrency, action=start)
+
+    def worker(index: int) -> None:
+        decoder = decoders[index]
+        latencies: list[int] = []
+        errors = 0
+        # Threads start at different images so they do not decode in lockstep.
+        position = index * len(images) // concurrency
+        barrier.wait()
+        while time.perf_counter() < window["deadline"]:
+            _, decode_ns, error = decoder.decode(images[position % len(images)])
+            latencies.append(decode_ns)
+            errors += error is not None
+            position += 1
+        outcomes[index] = (latencies, errors)
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - window["start"]
+    cpu = time.process_time() - window["cpu"]
+    sketch = QuantileSketch()
+    for latencies, _ in outcomes:
+        for latency in latencies:
+            sketch.add(latency)
+    return {
+        "concurrency": concurrency,
+        "images": sketch.count,
+        "errors": sum(errors for _, errors in outcomes),
+        "elapsed_s": elapsed,
+        "images_per_s": sketch.count / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {f"p{round(q * 100)}": sketch.quantile(q) / 1e6 for q in (0.50, 0.90, 0.95, 0.99)},
+        "latency_max_ms": sketch.max / 1e6,
+        "cpu_cores_busy": cpu / elapsed if elapsed > 0 else 0.0,
+        "cpu_utilization": cpu / elapsed / (os.cpu_count() or 1) if elapsed > 0 else 0.0,
+    }
+
+
+def throughput(args: argparse.Namespace) -> int:
+    samples = read_jsonl(args.manifest)[:args.max_images]
+    images = [image for image in (cv2.imread(str(args.images / sample["relative_path"]), cv2.IMREAD_COLOR) for sample in samples) if image is not None]
+    if not images:
+        raise SystemExit("no manifest images could be loaded")
+    license_key = load_license(args)
+    factories = {
+        ZXingPythonReader.name: ZXingPythonReader,
+        DynamsoftPythonReader.name: lambda: DynamsoftPythonReader(license_key, args.dbr_template),
+    }
+    names = args.decoders.split(",") if args.decoders else list(factories)
+    levels = concurrency_levels(args.concurrency)
+    report: dict[str, Any] = {
+        "mode": "closed-loop, one decoder instance per thread, images preloaded in memory",
+        "duration_s_per_level": args.duration,
+        "images": len(images),
+        "logical_processors": os.cpu_count(),
+        "decoders": {},
+    }
+    for name in names:
+        if name not in factories:
+            raise SystemExit(f"unknown decoder: {name}")
+        results: list[dict[str, Any]] = []
+        for concurrency in levels:
+            decoders = [factories[name]() for _ in range(concurrency)]
+            for decoder in decoders:
+                decoder.decode(images[0])
+            level = throughput_level(decoders, images, args.duration)
+            baseline = results[0]["images_per_s"] if results else level["images_per_s"]
+            level["speedup"] = level["images_per_s"] / baseline if baseline else 0.0
+            level["efficiency"] = level["speedup"] / concurrency * results[0]["concurrency"] if results else 1.0
+            results.append(level)
+            print(f"{name} concurrency={concurrency} images_per_s={level['images_per_s']:.1f} p95_ms={level['latency_ms']['p95']:.2f} cpu_cores_busy={level['cpu_cores_busy']:.2f}", flush=True)
+        report["decoders"][name] = {"version": decoders[0].version, "levels": results}
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / "throughput.json"
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"wrote {path}")
+    return 0
+
+
+def soak(args: argparse.Namespace) -> int:
+    samples = read_jsonl(args.manifest)[:args.max_images]
+    images = [image for image in (cv2.imread(str(args.images / sample["relative_path"]), cv2.IMREAD_COLOR) for sample in samples) if image is not None]
+    if not images:
+        raise SystemExit("no manifest images could be loaded")
+    license_key = load_license(args)
+    factories = {
+        ZXingPythonReader.name: ZXingPythonReader,
+        DynamsoftPythonReader.name: lambda: DynamsoftPythonReader(license_key, args.dbr_template),
+    }
+    names = args.decoders.split(",") if args.decoders else list(factories)
+    unknown = [name for name in names if name not in factories]
+    if unknown:
+        raise SystemExit(f"unknown decoder: {unknown[0]}")
+    # One instance per decoder for the whole run, the way a service reuses its router.
+    decoders = [factories[name]() for name in names]
+    probe = MemoryProbe(args.memory)
+    args.output.mkdir(parents=True, exist_ok=True)
+    series_path = args.output / "soak.jsonl"
+    series: list[dict[str, Any]] = []
+    decodes = errors = 0
+    begin = time.perf_counter()
+    deadline = begin + args.duration
+    next_sample = begin
+    print(f"soak decoders={','.join(names)} images={len(images)} duration_s={args.duration:g}", flush=True)
+    with series_path.open("w", encoding="utf-8", newline="\n") as f:
+        while True:
+            now = time.perf_counter()
+            if now >= next_sample or now >= deadline:
+                # Collect first so that garbage awaiting collection does not look like growth.
+                gc.collect()
+                sample = {"elapsed_s": now - begin, "decodes": decodes, "errors": errors, **probe.snapshot()}
+                series.append(sample)
+                f.write(json.dumps(sample, separators=(",", ":")) + "\n")
+                f.flush()
+                rss = sample["rss_bytes"]
+                print(f"elapsed_s={sample['elapsed_s']:.0f} decodes={decodes} rss_mb={rss / 2**20 if rss else float('nan'):.1f}", flush=True)
+                next_sample = now + args.sample_interval
+                if now >= deadline:
+                    break
+            image = images[decodes // len(decoders) % len(images)]
+            for decoder in decoders:
+                _, _, error = decoder.decode(image)
+                decodes += 1
+                errors += error is not None
+
+    # Early samples include allocator and library warm-up, which is growth but not a leak.
+    steady = series[int(len(series) * args.warmup_fraction):]
+    report: dict[str, Any] = {
+        "decoders": {decoder.name: decoder.version for decoder in decoders},
+        "images": len(images),
+        "duration_s": series[-1]["elapsed_s"],
+        "decodes": decodes,
+        "errors": errors,
+        "samples": len(series),
+        "steady_samples": len(steady),
+        "memory_mode": args.memory,
+    }
+    keys = [("rss_bytes", "rss"), ("python_bytes", "python")]
+    leak = False
+    for key, label in keys:
+        points = [(s["elapsed_s"], s["decodes"], s[key]) for s in steady if s.get(key) is not None]
+        if len(points) < 3:
+            continue
+        per_second, error_per_second = linear_slope([p[0] for p in points], [p[2] for p in points])
+        per_decode, _ = linear_slope([p[1] for p in points], [p[2] for p in points])
+        per_hour_mb = per_second * 3600 / 2**20
+        lower_per_hour_mb = (per_second - 1.96 * error_per_second) * 3600 / 2**20
+        suspected = lower_per_hour_mb > args.max_growth_mb_per_hour
+        leak = leak or suspected
+        report[label] = {
+            "start_mb": points[0][2] / 2**20,
+            "end_mb": points[-1][2] / 2**20,
+            "slope_mb_per_hour": per_hour_mb,
+            "slope_mb_per_hour_ci95": [lower_per_hour_mb, (per_second + 1.96 * error_per_second) * 3600 / 2**20],
+            "slope_bytes_per_decode": per_decode,
+            "leak_suspected": suspected,
+        }
+        print(f"{label}: {points[0][2] / 2**20:.1f} -> {points[-1][2] / 2**20:.1f} MB, slope {per_hour_mb:+.2f} MB/h "
+              f"({per_decode:+.1f} bytes/decode){' LEAK SUSPECTED' if suspected else ''}")
+    report["max_growth_mb_per_hour"] = args.max_growth_mb_per_hour
+    report["leak_suspected"] = leak
+    (args.output / "soak.json").write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    print(f"wrote {series_path} and {args.output / 'soak.json'}")
+    return 1 if leak else 0
+
+
 def wilson_interval(successes: int, total: int) -> tuple[float, float]:
     if total == 0:
         return 0.0, 0.0
@@ -588,25 +1458,76 @@ def wilson_interval(successes: int, total: int) -> tuple[float, float]:
     return (centre - margin) / denom, (centre + margin) / denom
 
 
-def percentile(values: list[int], q: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    return ordered[int(q * (len(ordered) - 1))] / 1e6
-
-
-def generate_summary(jsonl: Path, output: Path) -> None:
+class QuantileSketch:
+    """Streaming quantiles of non-negative integers with bounded relative error.
+
+    Values are counted in logarithmic buckets that are 2 * relative_accuracy
+    wide (the DDSketch scheme), so memory depends on the range of the values,
+    not on how many there are: decode times from 1 us to 1000 s in nanoseconds
+    need about 2,100 buckets at the default 0.5%.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.005) -> None:
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: Counter[int] = Counter()
+        self.zeros = 0
+        self.count = 0
+        self.min = 0
+        self.max = 0
+
+    def add(self, value: int) -> None:
+        self.min = value if not self.count else min(self.min, value)
+        self.max = value if not self.count else max(self.max, value)
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def quantile(self, q: float) -> float:
+        # Nearest rank, as in sorted(values)[int(q * (n - 1))].
+        if not self.count:
+            return 0.0
+        rank = int(q * (self.count - 1))
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return min(max(2 * self.gamma ** key / (self.gamma + 1), self.min), self.max)
+        return float(self.max)
+
+
+def generate_summary(jsonl: Path, output: Path, manifest: Path | None = None) -> None:
     totals: dict[str, dict[str, Any]] = defaultdict(lambda: {
         "records": 0, "eligible": 0, "correct": 0, "unsupported": 0, "errors": 0,
         "common_eligible": 0, "common_correct": 0, "image_all_read": 0,
         "decode_ns": 0, "outcomes": Counter(), "by_format": defaultdict(Counter),
-        "by_source": defaultdict(Counter), "timings": [],
+        "by_source": defaultdict(Counter), "timings": QuantileSketch(), "timing_flags": Counter(),
+        "memory": Counter(),
     })
-    for row in read_jsonl(jsonl):
+    # One pass over the JSONL; memory depends on the number of decoders,
+    # formats and annotation files, not on the number of records.
+    for row in attach_ground_truth((record for _, _, record in iter_jsonl(jsonl)), manifest):
         c = totals[row["decoder"]]
         c["records"] += 1
         c["decode_ns"] += int(row.get("decode_ns") or 0)
-        c["timings"].append(int(row.get("decode_ns") or 0))
+        c["timings"].add(int(row.get("decode_ns") or 0))
+        if row.get("memory"):
+            memory = row["memory"]
+            c["memory"]["records"] += 1
+            c["memory"]["rss_delta_total_bytes"] += memory.get("rss_delta_bytes") or 0
+            c["memory"]["peak_rss_delta_max_bytes"] = max(c["memory"]["peak_rss_delta_max_bytes"], memory.get("peak_rss_delta_bytes") or 0)
+            c["memory"]["python_net_total_bytes"] += memory.get("python_net_bytes") or 0
+            c["memory"]["python_peak_max_bytes"] = max(c["memory"]["python_peak_max_bytes"], memory.get("python_peak_bytes") or 0)
+        if row.get("timing"):
+            timing = row["timing"]
+            c["timing_flags"]["repeated"] += 1
+            c["timing_flags"]["unconverged"] += not timing["converged"]
+            c["timing_flags"]["outliers"] += bool(timing["outliers"])
+            c["timing_flags"]["drift"] += timing["drift"]
         if row.get("error"):
             c["errors"] += 1
         all_read = row.get("error") is None
@@ -661,12 +1582,22 @@ def generate_summary(jsonl: Path, output: Path) -> None:
             "by_format": {k: dict(v) for k, v in c["by_format"].items()},
             "by_source": {k: dict(v) for k, v in c["by_source"].items()},
             "mean_decode_ms": c["decode_ns"] / c["records"] / 1e6 if c["records"] else 0.0,
-            "median_decode_ms": statistics.median(c["timings"]) / 1e6 if c["timings"] else 0.0,
-            "p90_decode_ms": percentile(c["timings"], 0.90),
-            "p95_decode_ms": percentile(c["timings"], 0.95),
-            "p99_decode_ms": percentile(c["timings"], 0.99),
+            "median_decode_ms": c["timings"].quantile(0.50) / 1e6,
+            "p90_decode_ms": c["timings"].quantile(0.90) / 1e6,
+            "p95_decode_ms": c["timings"].quantile(0.95) / 1e6,
+            "p99_decode_ms": c["timings"].quantile(0.99) / 1e6,
             "total_decode_ms": c["decode_ns"] / 1e6,
         }
+        if c["memory"]["records"]:
+            decoders[name]["memory"] = dict(c["memory"])
+        if c["timing_flags"]["repeated"]:
+            # decode_ns is then the per-record median of repeated timings.
+            decoders[name]["timing"] = {
+                "repeated_records": c["timing_flags"]["repeated"],
+                "unconverged_records": c["timing_flags"]["unconverged"],
+                "records_with_outliers": c["timing_flags"]["outliers"],
+                "drifting_records": c["timing_flags"]["drift"],
+            }
     summary = {
         "title": "ZXing Python vs. Dynamsoft Barcode Reader Python",
         "dataset": "BarBeR public dataset",
@@ -677,12 +1608,18 @@ def generate_summary(jsonl: Path, output: Path) -> None:
     output.write_text(json.dumps(summary, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
 
 
-def generate_results_json(jsonl: Path, summary: Path, output: Path) -> None:
-    value = {
-        "summary": json.loads(summary.read_text(encoding="utf-8")),
-        "records": read_jsonl(jsonl),
-    }
-    output.write_text(json.dumps(value, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+def generate_results_json(jsonl: Path, summary: Path, output: Path, manifest: Path | None = None) -> None:
+    # results.json is the self-contained package, so compact records are
+    # expanded. Records are streamed one at a time in the same layout that
+    # json.dumps(value, indent=2) would produce for the whole document.
+    summary_text = json.dumps(json.loads(summary.read_text(encoding="utf-8")), indent=2, ensure_ascii=False)
+    with output.open("w", encoding="utf-8", newline="\n") as f:
+        f.write('{\n  "summary": ' + summary_text.replace("\n", "\n  ") + ',\n  "records": [')
+        written = 0
+        for record in attach_ground_truth((record for _, _, record in iter_jsonl(jsonl)), manifest):
+            f.write(("," if written else "") + "\n    " + json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n    "))
+            written += 1
+        f.write("\n  ]\n}\n" if written else "]\n}\n")
 
 
 def write_environment(args: argparse.Namespace) -> int:
@@ -696,12 +1633,13 @@ def write_environment(args: argparse.Namespace) -> int:
         "python": platform.python_version(),
         "architecture": platform.machine(),
         "configuration": "Python wheels",
-        "benchmark_processes": 1,
+        "benchmark_processes": args.workers,
         "threads_per_decoder_task": 1,
         "repetitions": args.repetitions,
         "zxing_python_package": "zxing-cpp",
         "dynamsoft_python_package": "dynamsoft-capture-vision-bundle",
         "dynamsoft_barcode_reader_template": args.dbr_template,
+        "cpu": cpu_environment(),
     }
     args.output.parent.mkdir(parents=True, exist_ok=True)
     args.output.write_text(json.dumps(env, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
@@ -716,16 +1654,44 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--images", type=Path, required=True)
     p.add_argument("--annotations", type=Path, required=True)
     p.add_argument("--output", type=Path, default=Path("manifests"))
+    p.add_argument("--jobs", type=int, default=min(32, (os.cpu_count() or 1) + 4), help="threads hashing and probing images")
+    p.add_argument("--cache", type=Path, default=Path("cache/audit_cache.jsonl"), help="sha256 and dimensions keyed by path, size and mtime")
+    p.add_argument("--no-cache", action="store_true", help="hash every image again")
     p = sub.add_parser("smoke")
     add_run_args(p)
     p = sub.add_parser("run")
     add_run_args(p)
+    p = sub.add_parser("throughput")
+    p.add_argument("--images", type=Path, required=True)
+    p.add_argument("--manifest", type=Path, required=True)
+    p.add_argument("--output", type=Path, required=True)
+    p.add_argument("--license-key-file", type=Path)
+    p.add_argument("--dbr-template", default="ReadBarcodes_Default")
+    p.add_argument("--decoders", help="comma-separated decoder names (default: all)")
+    p.add_argument("--concurrency", help="comma-separated thread counts (default: 1, 2, 4 ... logical processors)")
+    p.add_argument("--duration", type=float, default=10.0, help="seconds of load per concurrency level")
+    p.add_argument("--max-images", type=int, default=100, help="manifest images preloaded and decoded round-robin")
+    p = sub.add_parser("soak")
+    p.add_argument("--images", type=Path, required=True)
+    p.add_argument("--manifest", type=Path, required=True)
+    p.add_argument("--output", type=Path, required=True)
+    p.add_argument("--license-key-file", type=Path)
+    p.add_argument("--dbr-template", default="ReadBarcodes_Default")
+    p.add_argument("--decoders", help="comma-separated decoder names (default: all); soak one at a time to attribute growth")
+    p.add_argument("--duration", type=float, default=3600.0, help="seconds to keep decoding")
+    p.add_argument("--max-images", type=int, default=100, help="manifest images preloaded and decoded round-robin")
+    p.add_argument("--sample-interval", type=float, default=10.0, help="seconds between memory samples")
+    p.add_argument("--warmup-fraction", type=float, default=0.1, help="leading share of samples left out of the slope")
+    p.add_argument("--memory", choices=MEMORY_MODES[1:], default="rss", help="tracemalloc also tracks Python objects")
+    p.add_argument("--max-growth-mb-per-hour", type=float, default=10.0, help="flag a leak when the slope's 95%% lower bound exceeds this")
     p = sub.add_parser("summarize")
     p.add_argument("--results", type=Path, required=True)
     p.add_argument("--output", type=Path, required=True)
+    p.add_argument("--manifest", type=Path, help="resolves the ground truth of --compact-results records")
     p = sub.add_parser("write-environment")
     p.add_argument("--output", type=Path, default=Path("configs/benchmark_environment.json"))
     p.add_argument("--repetitions", type=int, default=1)
+    p.add_argument("--workers", type=int, default=1)
     p.add_argument("--dbr-template", default="ReadBarcodes_Default")
     return parser
 
@@ -737,18 +1703,45 @@ def add_run_args(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--license-key-file", type=Path)
     parser.add_argument("--dbr-template", default="ReadBarcodes_Default")
     parser.add_argument("--repetitions", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1, help="decoder processes, each pinned to one core")
+    parser.add_argument("--image-cache", type=Path, help="directory of decoded images (.npy) reused across repetitions and runs")
+    parser.add_argument("--image-cache-max-mb", type=int, default=8192, help="size cap of --image-cache")
+    parser.add_argument("--flush-records", type=int, default=256, help="write results.jsonl after this many buffered records")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="or after this many seconds")
+    parser.add_argument("--fsync", choices=ResultWriter.FSYNC_POLICIES, default="batch", help="when to fsync results.jsonl")
+    parser.add_argument("--compact-results", action="store_true", help="omit ground_truth from records; it is resolved from the manifest by sample_id")
+    parser.add_argument("--warmup", type=int, default=0, help="untimed decodes of each image before it is timed")
+    parser.add_argument("--min-repeats", type=int, help="timed decodes of each image before checking the confidence interval (default: 5, or --max-repeats if lower)")
+    parser.add_argument("--max-repeats", type=int, default=1, help="timed decodes of each image at most; 1 keeps single-shot timing")
+    parser.add_argument("--memory", choices=MEMORY_MODES, default="none", help="record RSS (rss) and Python allocations (tracemalloc) per decode")
+    parser.add_argument("--target-ci", type=float, default=0.05, help="stop repeating once the 95%% CI half-width of the median is within this fraction")
+
+
+def check_repeats(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    if getattr(args, "max_repeats", None) is None:
+        return
+    if args.min_repeats is None:
+        args.min_repeats = min(5, args.max_repeats)
+    elif args.max_repeats > 1 and args.min_repeats > args.max_repeats:
+        parser.error(f"--min-repeats ({args.min_repeats}) is larger than --max-repeats ({args.max_repeats})")
 
 
 def main() -> int:
-    args = build_parser().parse_args()
+    parser = build_parser()
+    args = parser.parse_args()
+    check_repeats(parser, args)
     if args.command == "audit":
         return audit(args)
     if args.command == "smoke":
         return execute(args, smoke=True)
     if args.command == "run":
         return execute(args, smoke=False)
+    if args.command == "throughput":
+        return throughput(args)
+    if args.command == "soak":
+        return soak(args)
     if args.command == "summarize":
-        generate_summary(args.results, args.output)
+        generate_summary(args.results, args.output, args.manifest)
         return 0
     if args.command == "write-environment":
         return write_environment(args)
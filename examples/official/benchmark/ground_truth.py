@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Ground truth lookup for results.jsonl records written with --compact-results.
+
+Compact records carry sample_id and manifest_sha256 instead of ground_truth.
+benchmark.py and the tools in tools/ share this module, so every reader
+resolves them the same way and rejects a manifest that does not match the run.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+
+def load_ground_truth(manifest: Path) -> tuple[str, dict[str, list[dict[str, Any]]]]:
+    """sha256 of the manifest file and the ground truth of every sample_id in it."""
+    h = hashlib.sha256()
+    truth = {}
+    with manifest.open("rb") as f:
+        for line in f:
+            h.update(line)
+            if line.strip():
+                sample = json.loads(line)
+                truth[sample["sample_id"]] = sample["ground_truth"]
+    return h.hexdigest(), truth
+
+
+def attach_ground_truth(rows: Iterable[dict[str, Any]], manifest: Path | None) -> Iterator[dict[str, Any]]:
+    """Fill in ground_truth for records written with --compact-results.
+
+    The manifest is only read once the first compact record is seen. It must
+    be the manifest the run recorded in manifest_sha256, and it must contain
+    every sample_id; otherwise SystemExit is raised.
+    """
+    truth: dict[str, list[dict[str, Any]]] | None = None
+    manifest_hash = ""
+    for row in rows:
+        if "ground_truth" not in row:
+            if truth is None:
+                if manifest is None:
+                    raise SystemExit("results contain compact records; pass --manifest to resolve their ground truth")
+                manifest_hash, truth = load_ground_truth(manifest)
+            if row.get("manifest_sha256") != manifest_hash:
+                raise SystemExit(f"{row['sample_id']}: record was written against a different manifest "
+                                 f"({row.get('manifest_sha256')}), not {manifest} ({manifest_hash})")
+            if row["sample_id"] not in truth:
+                raise SystemExit(f"{row['sample_id']}: sample is not in {manifest}")
+            row["ground_truth"] = truth[row["sample_id"]]
+        yield row
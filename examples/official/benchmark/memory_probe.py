@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Per-call memory measurement for benchmark.py.
+
+zxing_zbar/src/memory_probe.py is a copy; change both together.
+
+RSS covers native allocations such as the decoders' own buffers. tracemalloc
+covers Python objects, for example the result conversion, but slows down
+every Python allocation while it is tracing. psutil is used when installed.
+Otherwise RSS comes from /proc on Linux, and peak RSS from the resource
+module where it exists.
+
+The peak RSS of a call is sampled by a background thread while the call runs,
+because ru_maxrss is the high-water mark of the whole process and stops
+moving once the first images have been decoded. The sampler competes with the
+call for CPU time and the GIL, so measure memory on a pass that is not timed.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MODES = ("none", "rss", "tracemalloc")
+# Seconds between RSS samples while a measured call runs.
+SAMPLE_INTERVAL = 0.001
+
+
+def current_rss() -> int | None:
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> int | None:
+    """High-water RSS of the process since it started."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes.
+        return peak if sys.platform == "darwin" else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", None)
+    return None
+
+
+class PeakSampler:
+    """Highest RSS seen between start() and stop(), polled from a daemon thread."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL) -> None:
+        self.interval = interval
+        self._armed = threading.Event()
+        self._lock = threading.Lock()
+        self._peak: int | None = None
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while True:
+            self._armed.wait()
+            rss = current_rss()
+            with self._lock:
+                if self._armed.is_set() and rss is not None and (self._peak is None or rss > self._peak):
+                    self._peak = rss
+            time.sleep(self.interval)
+
+    def start(self, rss: int | None) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-probe-sampler", daemon=True)
+            self._thread.start()
+        with self._lock:
+            self._peak = rss
+        self._armed.set()
+
+    def stop(self, rss: int | None) -> int | None:
+        self._armed.clear()
+        with self._lock:
+            peak = self._peak
+        if rss is not None and (peak is None or rss > peak):
+            peak = rss
+        return peak
+
+
+class MemoryProbe:
+    """Measures RSS, and optionally Python allocations, around a call."""
+
+    def __init__(self, mode: str = "rss", interval: float = SAMPLE_INTERVAL) -> None:
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        self.mode = mode
+        self._sampler = PeakSampler(interval) if mode != "none" else None
+        if mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def measure(self, run: Callable[[], Any]) -> tuple[Any, dict[str, Any] | None]:
+        if self.mode == "none":
+            return run(), None
+        tracing = self.mode == "tracemalloc"
+        if tracing:
+            tracemalloc.reset_peak()
+            python_before = tracemalloc.get_traced_memory()[0]
+        rss_before = current_rss()
+        self._sampler.start(rss_before)
+        try:
+            result = run()
+        finally:
+            rss_after = current_rss()
+            peak = self._sampler.stop(rss_after)
+        sample: dict[str, Any] = {
+            "rss_bytes": rss_after,
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            # Sampled every SAMPLE_INTERVAL, so a spike shorter than that can be missed
+            "peak_rss_delta_bytes": peak - rss_before if peak is not None and rss_before is not None else None,
+        }
+        if tracing:
+            python_after, python_peak = tracemalloc.get_traced_memory()
+            sample["python_net_bytes"] = python_after - python_before
+            sample["python_peak_bytes"] = python_peak - python_before
+        return result, sample
+
+    def snapshot(self) -> dict[str, Any]:
+        sample: dict[str, Any] = {"rss_bytes": current_rss(), "peak_rss_bytes": peak_rss()}
+        if tracemalloc.is_tracing():
+            sample["python_bytes"] = tracemalloc.get_traced_memory()[0]
+        return sample
+
+
+def linear_slope(xs: list[float], ys: list[float]) -> tuple[float, float]:
+    """Least-squares slope of ys over xs and its standard error."""
+    n = len(xs)
+    if n < 3:
+        return 0.0, float("inf")
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return 0.0, float("inf")
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - intercept - slope * x) ** 2 for x, y in zip(xs, ys))
+    return slope, (residual / (n - 2) / sxx) ** 0.5
@@ -0,0 +1,104 @@
+import itertools
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import benchmark  # noqa: E402
+
+
+def box(x, y, size=10):
+    return [[x, y], [x + size, y], [x + size, y + size], [x, y + size]]
+
+
+def truth(fmt, text, polygon=None):
+    return {"format": fmt, "text": text, "decode_eligible": True, "polygon": polygon}
+
+
+def prediction(fmt, text, polygon=None):
+    return {"format": fmt, "text": text, "polygon": polygon}
+
+
+def pairs(output):
+    return {(o["truth_index"], o["prediction_index"], o["outcome"]) for o in output}
+
+
+class MatchResultsTest(unittest.TestCase):
+    def match(self, gt, predictions):
+        return pairs(benchmark.match_results(gt, predictions, "dbr-python"))
+
+    def test_duplicate_text_tie_break_by_iou(self):
+        gt = [truth("QR_CODE", "A", box(0, 0)), truth("QR_CODE", "A", box(100, 0))]
+        predictions = [prediction("QR_CODE", "A", box(101, 1)), prediction("QR_CODE", "A", box(1, 1))]
+        self.assertEqual(self.match(gt, predictions), {(0, 1, "correct"), (1, 0, "correct")})
+
+    def test_duplicate_text_more_truth_than_predictions(self):
+        gt = [truth("QR_CODE", "A", box(0, 0)), truth("QR_CODE", "A", box(100, 0))]
+        predictions = [prediction("QR_CODE", "A", box(99, 2))]
+        self.assertEqual(self.match(gt, predictions), {(0, None, "not_found"), (1, 0, "correct")})
+
+    def test_duplicate_text_more_predictions_than_truth(self):
+        gt = [truth("QR_CODE", "A", box(50, 0))]
+        predictions = [prediction("QR_CODE", "A", box(0, 0)), prediction("QR_CODE", "A", box(49, 1))]
+        self.assertEqual(self.match(gt, predictions), {(0, 1, "correct"), (None, 0, "extra_result")})
+
+    def test_leftover_duplicate_keeps_overlapping_lower_outcome(self):
+        # Truth 0 can only overlap the EAN-13 prediction, so the duplicate
+        # without a polygon takes the correct match.
+        gt = [truth("CODE_128", "012345678905", box(10, 10)), truth("CODE_128", "012345678905")]
+        predictions = [prediction("EAN_13", "012345678905", box(15, 15)), prediction("CODE_128", "012345678905")]
+        self.assertEqual(self.match(gt, predictions), {(0, 0, "wrong_format"), (1, 1, "correct")})
+
+    def test_correct_before_wrong_format(self):
+        gt = [truth("QR_CODE", "A"), truth("CODE_128", "A")]
+        predictions = [prediction("QR_CODE", "A")]
+        self.assertEqual(self.match(gt, predictions), {(0, 0, "correct"), (1, None, "not_found")})
+
+    def test_upc_a_matches_ean_13(self):
+        gt = [truth("UPC_A", "012345678905")]
+        predictions = [prediction("EAN_13", "0012345678905")]
+        self.assertEqual(self.match(gt, predictions), {(0, 0, "correct")})
+
+    def test_misreads_pair_by_iou(self):
+        gt = [truth("QR_CODE", f"T{i}", box(20 * i, 0)) for i in range(5)]
+        predictions = [prediction("QR_CODE", f"X{i}", box(20 * (4 - i) + 1, 1)) for i in range(5)]
+        self.assertEqual(self.match(gt, predictions), {(i, 4 - i, "wrong_text") for i in range(5)})
+
+    def test_misreads_without_polygons(self):
+        gt = [truth("QR_CODE", f"T{i}") for i in range(3)] + [truth("QR_CODE", "OK")]
+        predictions = [prediction("QR_CODE", "OK")] + [prediction("QR_CODE", f"X{i}") for i in range(2)]
+        outcomes = sorted(o["outcome"] for o in benchmark.match_results(gt, predictions, "dbr-python"))
+        self.assertEqual(outcomes, ["correct", "not_found", "wrong_text", "wrong_text"])
+
+    def test_unsupported_and_extra(self):
+        gt = [truth("POSTNET", "1"), {"format": "QR_CODE", "text": "skip", "decode_eligible": False}]
+        predictions = [prediction("QR_CODE", "B")]
+        self.assertEqual(pairs(benchmark.match_results(gt, predictions, "zxing-python")),
+                         {(0, None, "unsupported_format"), (None, 0, "extra_result")})
+
+
+class AssignmentTest(unittest.TestCase):
+    def test_against_brute_force(self):
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            rows, cols = (int(n) for n in rng.integers(1, 5, size=2))
+            score = rng.integers(0, 4, size=(rows, cols)).astype(float)
+            best = 0.0
+            for perm in itertools.permutations(range(max(rows, cols)), min(rows, cols)):
+                pairs_ = zip(range(rows), perm) if rows <= cols else zip(perm, range(cols))
+                best = max(best, sum(score[r, c] for r, c in pairs_))
+            assigned = benchmark.assign(score)
+            self.assertEqual(len({r for r, _ in assigned}), len(assigned))
+            self.assertEqual(len({c for _, c in assigned}), len(assigned))
+            self.assertEqual(sum(score[r, c] for r, c in assigned), best)
+
+    def test_pair_by_iou_pairs_every_row(self):
+        iou = np.zeros((3, 4))
+        iou[2, 0] = 0.5
+        self.assertEqual(sorted(benchmark.pair_by_iou(iou)), [(0, 1), (1, 2), (2, 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
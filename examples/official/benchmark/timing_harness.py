@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Repeated-measurement timing for benchmark.py.
+
+zxing_zbar/src/timing_harness.py is a copy; change both together.
+
+A measurement runs untimed warm-up passes, then repeats the timed call until
+the distribution-free confidence interval of the median is narrower than
+target_ci (relative to the median) or max_repeats is reached. The reported
+value is the median with a percentile-bootstrap confidence interval.
+
+Samples are flagged as outliers when they are more than outlier_mads scaled
+median absolute deviations above the median, or when the garbage collector
+ran during them. A run whose last third is clearly slower than its first
+third is flagged as drifting, which is what thermal throttling or a
+frequency change in the middle of a measurement looks like.
+"""
+from __future__ import annotations
+
+import gc
+import math
+import os
+import platform
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+# Two-sided standard normal quantiles for the supported confidence levels.
+Z_VALUES = {0.90: 1.645, 0.95: 1.96, 0.99: 2.576}
+
+
+@dataclass
+class TimingSettings:
+    warmup: int = 1
+    min_repeats: int = 5
+    max_repeats: int = 30
+    target_ci: float = 0.05
+    confidence: float = 0.95
+    bootstrap_samples: int = 1000
+    outlier_mads: float = 5.0
+    drift_threshold: float = 0.10
+    seed: int = 0
+
+    def __post_init__(self) -> None:
+        if self.confidence not in Z_VALUES:
+            raise ValueError(f"confidence must be one of {sorted(Z_VALUES)}, got {self.confidence}")
+        self.max_repeats = max(1, self.max_repeats)
+        self.min_repeats = min(max(1, self.min_repeats), self.max_repeats)
+
+    @property
+    def single_shot(self) -> bool:
+        return self.warmup == 0 and self.max_repeats == 1
+
+
+@dataclass
+class Measurement:
+    median_ns: float
+    ci_low_ns: float
+    ci_high_ns: float
+    repeats: int
+    warmup: int
+    converged: bool
+    samples_ns: list[int]
+    outliers: list[int] = field(default_factory=list)
+    gc_samples: list[int] = field(default_factory=list)
+    drift: bool = False
+
+    @property
+    def relative_ci(self) -> float:
+        return (self.ci_high_ns - self.ci_low_ns) / 2 / self.median_ns if self.median_ns else 0.0
+
+    @property
+    def flagged(self) -> bool:
+        return bool(self.outliers) or self.drift
+
+    def to_dict(self) -> dict[str, Any]:
+        value = asdict(self)
+        value["relative_ci"] = self.relative_ci
+        return value
+
+
+def median(values: list[int] | list[float]) -> float:
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return float(ordered[middle]) if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def order_statistic_interval(ordered: list[int], confidence: float) -> tuple[float, float]:
+    """Distribution-free CI of the median from the sorted samples (normal approximation to the binomial)."""
+    n = len(ordered)
+    half_width = Z_VALUES[confidence] * math.sqrt(n) / 2
+    low = max(0, math.floor(n / 2 - half_width))
+    high = min(n - 1, math.ceil(n / 2 + half_width) - 1)
+    return float(ordered[low]), float(ordered[high])
+
+
+def bootstrap_interval(samples: list[int], confidence: float, resamples: int, seed: int) -> tuple[float, float]:
+    if len(samples) < 2:
+        return float(samples[0]), float(samples[0])
+    rng = random.Random(seed)
+    n = len(samples)
+    medians = sorted(median(rng.choices(samples, k=n)) for _ in range(resamples))
+    tail = (1 - confidence) / 2
+    return medians[int(tail * (resamples - 1))], medians[int((1 - tail) * (resamples - 1))]
+
+
+class TimingHarness:
+    def __init__(self, settings: TimingSettings | None = None) -> None:
+        self.settings = settings or TimingSettings()
+        self._gc_runs = 0
+        gc.callbacks.append(self._on_gc)
+
+    def _on_gc(self, phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_runs += 1
+
+    def close(self) -> None:
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def measure(self, run: Callable[[], int | None]) -> Measurement:
+        """Time run() repeatedly.
+
+        run() may return its own elapsed nanoseconds (for example a decoder's
+        decode_ns, which excludes result conversion); if it returns None, the
+        call itself is timed.
+        """
+        s = self.settings
+        for _ in range(s.warmup):
+            run()
+        samples: list[int] = []
+        gc_samples: list[int] = []
+        converged = False
+        while len(samples) < s.max_repeats:
+            gc_before = self._gc_runs
+            begin = time.perf_counter_ns()
+            elapsed = run()
+            if elapsed is None:
+                elapsed = time.perf_counter_ns() - begin
+            if self._gc_runs != gc_before:
+                gc_samples.append(len(samples))
+            samples.append(int(elapsed))
+            if len(samples) >= s.min_repeats:
+                ordered = sorted(samples)
+                low, high = order_statistic_interval(ordered, s.confidence)
+                centre = median(ordered)
+                if centre == 0 or (high - low) / 2 / centre <= s.target_ci:
+                    converged = True
+                    break
+        return self.summarize(samples, gc_samples, converged)
+
+    def summarize(self, samples: list[int], gc_samples: list[int], converged: bool) -> Measurement:
+        s = self.settings
+        centre = median(samples)
+        low, high = bootstrap_interval(samples, s.confidence, s.bootstrap_samples, s.seed)
+        deviations = [abs(value - centre) for value in samples]
+        # 1.4826 * MAD estimates the standard deviation of normal data.
+        spread = 1.4826 * median(deviations)
+        outliers = sorted(set(gc_samples) | {i for i, value in enumerate(samples) if spread and value - centre > s.outlier_mads * spread})
+        drift = False
+        if len(samples) >= 6:
+            third = len(samples) // 3
+            first, last = median(samples[:third]), median(samples[-third:])
+            drift = first > 0 and (last - first) / first > s.drift_threshold
+        return Measurement(centre, low, high, len(samples), s.warmup, converged, samples, outliers, gc_samples, drift)
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def cpu_environment() -> dict[str, Any]:
+    """CPU frequency governor, boost state and affinity of this process, where the OS exposes them."""
+    cpufreq = Path("/sys/devices/system/cpu")
+    governors: dict[str, int] = {}
+    frequencies: list[int] = []
+    for policy in sorted(cpufreq.glob("cpu[0-9]*/cpufreq")):
+        governor = _read(policy / "scaling_governor")
+        if governor:
+            governors[governor] = governors.get(governor, 0) + 1
+        current = _read(policy / "scaling_cur_freq")
+        if current and current.isdigit():
+            frequencies.append(int(current))
+    no_turbo = _read(cpufreq / "intel_pstate/no_turbo")
+    boost = _read(cpufreq / "cpufreq/boost")
+    affinity = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None
+    return {
+        "platform": platform.platform(),
+        "logical_processors": os.cpu_count(),
+        "affinity": affinity,
+        "scaling_governors": governors or None,
+        "turbo_boost": None if no_turbo is None and boost is None else (no_turbo == "0" if no_turbo is not None else boost == "1"),
+        "current_frequency_mhz": {"min": min(frequencies) // 1000, "max": max(frequencies) // 1000} if frequencies else None,
+        "notes": [] if not governors or set(governors) <= {"performance"} else [
+            "CPU frequency scaling is not set to 'performance'; timings may vary between runs."],
+    }
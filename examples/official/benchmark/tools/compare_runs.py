@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Compare decode latency of two benchmark runs and fail on significant regressions."""
+import argparse
+import html
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from generate_html_report import STYLE
+
+
+def load_run(path: Path) -> dict:
+    """Median decode_ns per (sample_id, decoder) over repetitions, plus per-decoder metadata."""
+    timings = defaultdict(list)
+    paths = {}
+    versions = defaultdict(set)
+    correct = defaultdict(int)
+    eligible = defaultdict(int)
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith("\n"):
+                    raise
+                break
+            decoder = row["decoder"]
+            versions[decoder].add(row.get("decoder_version", ""))
+            for match in row["matches"]:
+                eligible[decoder] += match["outcome"] != "extra_result"
+                correct[decoder] += match["outcome"] == "correct"
+            if row.get("error"):
+                continue
+            key = (row["sample_id"], decoder)
+            timings[key].append(int(row["decode_ns"]))
+            paths[row["sample_id"]] = row.get("relative_path", row["sample_id"])
+    return {
+        "timings": {key: float(np.median(values)) for key, values in timings.items()},
+        "paths": paths,
+        "versions": {decoder: sorted(values) for decoder, values in versions.items()},
+        "recall": {decoder: correct[decoder] / eligible[decoder] if eligible[decoder] else 0.0 for decoder in eligible},
+    }
+
+
+def wilcoxon_signed_rank(differences: np.ndarray) -> tuple[float, float]:
+    """Two-sided Wilcoxon signed-rank test; returns (W+, p-value).
+
+    Zero differences are dropped. The p-value is exact for up to 50 pairs
+    without ties and uses the tie-corrected normal approximation otherwise.
+    """
+    d = differences[differences != 0]
+    n = len(d)
+    if n == 0:
+        return 0.0, 1.0
+    magnitudes = np.abs(d)
+    order = np.argsort(magnitudes, kind="mergesort")
+    ranks = np.empty(n)
+    sorted_magnitudes = magnitudes[order]
+    # Average ranks over runs of equal magnitude.
+    starts = np.flatnonzero(np.r_[True, sorted_magnitudes[1:] != sorted_magnitudes[:-1]])
+    ends = np.r_[starts[1:], n]
+    tie_sizes = ends - starts
+    for start, end in zip(starts, ends):
+        ranks[order[start:end]] = (start + end + 1) / 2
+    w_plus = float(ranks[d > 0].sum())
+    if n <= 50 and tie_sizes.max() == 1:
+        # Distribution of W+ under H0: number of subsets of 1..n with each rank sum.
+        counts = np.zeros(n * (n + 1) // 2 + 1)
+        counts[0] = 1
+        for rank in range(1, n + 1):
+            counts[rank:] = counts[rank:] + counts[:-rank].copy()
+        cdf = np.cumsum(counts) / counts.sum()
+        w = int(round(w_plus))
+        lower = cdf[w]
+        upper = 1 - (cdf[w - 1] if w > 0 else 0.0)
+        return w_plus, float(min(1.0, 2 * min(lower, upper)))
+    mean = n * (n + 1) / 4
+    variance = n * (n + 1) * (2 * n + 1) / 24 - float((tie_sizes ** 3 - tie_sizes).sum()) / 48
+    if variance <= 0:
+        return w_plus, 1.0
+    z = (abs(w_plus - mean) - 0.5) / math.sqrt(variance)
+    return w_plus, float(min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2))))
+
+
+def bootstrap_median_ci(values: np.ndarray, resamples: int, seed: int, confidence: float = 0.95) -> tuple[float, float]:
+    """Percentile-bootstrap CI of the median of paired values, resampling images."""
+    if len(values) < 2:
+        value = float(values[0]) if len(values) else 0.0
+        return value, value
+    rng = np.random.default_rng(seed)
+    medians = np.empty(resamples)
+    # Chunked so that memory stays bounded for large runs.
+    chunk = max(1, 2_000_000 // len(values))
+    for start in range(0, resamples, chunk):
+        stop = min(resamples, start + chunk)
+        indexes = rng.integers(0, len(values), size=(stop - start, len(values)))
+        medians[start:stop] = np.median(values[indexes], axis=1)
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(medians, [tail, 100 - tail])
+    return float(low), float(high)
+
+
+def compare(base: dict, new: dict, args: argparse.Namespace) -> dict:
+    decoders = sorted({decoder for _, decoder in base["timings"]} & {decoder for _, decoder in new["timings"]})
+    report = {"base": str(args.base), "new": str(args.new), "alpha": args.alpha, "threshold": args.threshold, "decoders": {}}
+    for decoder in decoders:
+        keys = sorted(key for key in base["timings"] if key[1] == decoder and key in new["timings"])
+        if not keys:
+            continue
+        before = np.array([base["timings"][key] for key in keys])
+        after = np.array([new["timings"][key] for key in keys])
+        # Log ratios make a 2x slowdown and a 2x speedup symmetric.
+        log_ratio = np.log(np.maximum(after, 1) / np.maximum(before, 1))
+        _, p_value = wilcoxon_signed_rank(log_ratio)
+        ci_low, ci_high = bootstrap_median_ci(log_ratio, args.bootstrap, args.seed)
+        change = math.expm1(float(np.median(log_ratio)))
+        regressed = p_value < args.alpha and change > args.threshold and ci_low > 0
+        improved = p_value < args.alpha and change < -args.threshold and ci_high < 0
+        worst = np.argsort(-log_ratio, kind="mergesort")[:args.top]
+        report["decoders"][decoder] = {
+            "pairs": len(keys),
+            "base_versions": base["versions"].get(decoder, []),
+            "new_versions": new["versions"].get(decoder, []),
+            "base_median_ms": float(np.median(before)) / 1e6,
+            "new_median_ms": float(np.median(after)) / 1e6,
+            "base_total_ms": float(before.sum()) / 1e6,
+            "new_total_ms": float(after.sum()) / 1e6,
+            "median_change": change,
+            "median_change_ci95": [math.expm1(ci_low), math.expm1(ci_high)],
+            "wilcoxon_p": p_value,
+            "base_recall": base["recall"].get(decoder, 0.0),
+            "new_recall": new["recall"].get(decoder, 0.0),
+            "verdict": "regression" if regressed else "improvement" if improved else "no significant change",
+            "worst_regressions": [{
+                "sample_id": keys[i][0],
+                "relative_path": new["paths"].get(keys[i][0], base["paths"].get(keys[i][0], "")),
+                "base_ms": before[i] / 1e6,
+                "new_ms": after[i] / 1e6,
+                "change": math.expm1(log_ratio[i]),
+            } for i in worst if log_ratio[i] > 0],
+        }
+    return report
+
+
+def render_html(report: dict) -> str:
+    rows = "".join(
+        f'<tr><td>{html.escape(name)}</td><td>{html.escape(", ".join(d["base_versions"]))} → {html.escape(", ".join(d["new_versions"]))}</td><td>{d["pairs"]:,}</td>'
+        f'<td>{d["base_median_ms"]:.2f}</td><td>{d["new_median_ms"]:.2f}</td><td>{d["median_change"]:+.1%}</td>'
+        f'<td>{d["median_change_ci95"][0]:+.1%} … {d["median_change_ci95"][1]:+.1%}</td><td>{d["wilcoxon_p"]:.2g}</td>'
+        f'<td>{d["base_recall"]:.2%} → {d["new_recall"]:.2%}</td><td class="{"not_found" if d["verdict"] == "regression" else "correct" if d["verdict"] == "improvement" else ""}">{d["verdict"]}</td></tr>'
+        for name, d in report["decoders"].items())
+    sections = "".join(
+        f'<section><h2>Largest regressions: {html.escape(name)}</h2><div class="scroll"><table><thead><tr><th>Image</th><th>Base ms</th><th>New ms</th><th>Change</th></tr></thead><tbody>'
+        + "".join(f'<tr><td>{html.escape(item["relative_path"])}</td><td>{item["base_ms"]:.2f}</td><td>{item["new_ms"]:.2f}</td><td class="not_found">{item["change"]:+.1%}</td></tr>' for item in d["worst_regressions"])
+        + '</tbody></table></div></section>'
+        for name, d in report["decoders"].items() if d["worst_regressions"])
+    return f'''<!doctype html><html lang="en"><meta charset="utf-8"><meta name="viewport" content="width=device-width"><link rel="icon" href="data:,"><title>Benchmark run comparison</title><style>{STYLE}</style><header><h1>Benchmark run comparison</h1><p>{html.escape(report["base"])} → {html.escape(report["new"])}</p></header><main class="wrap"><section><h2>Decode latency</h2><p class="muted">Per-image median decode time, paired by sample_id. Change is the median per-image ratio. A regression needs Wilcoxon p &lt; {report["alpha"]:g}, a median change above {report["threshold"]:.0%}, and a 95% bootstrap interval above zero.</p><div class="scroll"><table><thead><tr><th>Decoder</th><th>Version</th><th>Images</th><th>Base median ms</th><th>New median ms</th><th>Change</th><th>95% CI</th><th>Wilcoxon p</th><th>Recall</th><th>Verdict</th></tr></thead><tbody>{rows}</tbody></table></div></section>{sections}</main></html>'''
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base", type=Path, required=True, help="results.jsonl of the reference run")
+    parser.add_argument("--new", type=Path, required=True, help="results.jsonl of the run under test")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level of the Wilcoxon test")
+    parser.add_argument("--threshold", type=float, default=0.05, help="smallest median slowdown treated as a regression")
+    parser.add_argument("--bootstrap", type=int, default=2000, help="bootstrap resamples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=25, help="worst regressed images listed per decoder")
+    parser.add_argument("--output", type=Path, help="write the comparison as JSON")
+    parser.add_argument("--html", type=Path, help="write an HTML diff report")
+    args = parser.parse_args()
+    report = compare(load_run(args.base), load_run(args.new), args)
+    if not report["decoders"]:
+        raise SystemExit("the runs have no (sample_id, decoder) pairs in common")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    if args.html:
+        args.html.parent.mkdir(parents=True, exist_ok=True)
+        args.html.write_text(render_html(report), encoding="utf8")
+    for name, d in report["decoders"].items():
+        print(f'{name}: {d["pairs"]} images, median {d["base_median_ms"]:.2f} -> {d["new_median_ms"]:.2f} ms '
+              f'({d["median_change"]:+.1%}, 95% CI {d["median_change_ci95"][0]:+.1%}..{d["median_change_ci95"][1]:+.1%}), '
+              f'Wilcoxon p={d["wilcoxon_p"]:.2g}: {d["verdict"]}')
+    return 1 if any(d["verdict"] == "regression" for d in report["decoders"].values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
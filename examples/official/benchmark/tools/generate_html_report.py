@@ -3,9 +3,13 @@
 import argparse
 import html
 import json
+import sys
 import shutil
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ground_truth import attach_ground_truth
+
 STYLE = """
 :root{--ink:#172033;--muted:#60708a;--line:#dbe2ea;--bg:#f5f7fa}*{box-sizing:border-box}body{margin:0;font:15px/1.5 Segoe UI,Arial,sans-serif;color:var(--ink);background:var(--bg)}header{padding:52px max(5vw,28px);color:white;background:linear-gradient(120deg,#102649,#1769e0 62%,#00a495)}header h1{margin:0 0 8px;font-size:clamp(30px,5vw,58px);line-height:1.05}.wrap{max-width:1280px;margin:auto;padding:28px}section{background:white;border:1px solid var(--line);border-radius:14px;margin:18px 0;padding:24px;box-shadow:0 3px 18px #1026490c}h2{margin-top:0}.cards{display:grid;grid-template-columns:repeat(auto-fit,minmax(210px,1fr));gap:14px}.card{border:1px solid var(--line);border-radius:11px;padding:18px}.metric{font-size:32px;font-weight:750}.muted{color:var(--muted)}.disclosure{border-left:5px solid #f0a202;background:#fff8e6;padding:14px 18px}.controls{display:flex;gap:10px;flex-wrap:wrap;margin-bottom:14px}input,select{padding:9px 11px;border:1px solid #bcc8d8;border-radius:7px;background:white}table{width:100%;border-collapse:collapse;font-size:13px}th,td{padding:9px;border-bottom:1px solid var(--line);text-align:left;vertical-align:top}th{position:sticky;top:0;background:#edf3fa}.scroll{overflow:auto;max-height:650px}.correct{color:#087f5b}.not_found,.wrong_text,.wrong_format{color:#c2410c}.unsupported_format{color:#6d28d9}@media print{body{background:white}.controls{display:none}section{break-inside:avoid;box-shadow:none}}
 """
@@ -18,6 +22,48 @@ document.querySelectorAll('#q,#decoder,#outcome').forEach(e=>e.addEventListener(
 """
 
 
+COLORS = ["#1769e0", "#00a495", "#f0a202", "#c2410c", "#6d28d9"]
+
+
+def line_chart(title: str, series: dict[str, list[tuple[int, float]]], y_label: str) -> str:
+    """Inline SVG line chart with concurrency levels evenly spaced on the x axis."""
+    width, height, left, right, top, bottom = 560, 300, 58, 16, 34, 46
+    levels = sorted({x for points in series.values() for x, _ in points})
+    top_value = max((y for points in series.values() for _, y in points), default=0.0) * 1.1 or 1.0
+    def px(x: int) -> float:
+        step = (width - left - right) / max(1, len(levels) - 1)
+        return left + levels.index(x) * step if len(levels) > 1 else (left + width - right) / 2
+    def py(y: float) -> float:
+        return top + (height - top - bottom) * (1 - y / top_value)
+    parts = [f'<svg viewBox="0 0 {width} {height}" width="100%" role="img" aria-label="{html.escape(title)}"><text x="{left}" y="20" font-weight="700">{html.escape(title)}</text>']
+    for i in range(5):
+        value = top_value * i / 4
+        parts.append(f'<line x1="{left}" x2="{width - right}" y1="{py(value):.1f}" y2="{py(value):.1f}" stroke="#dbe2ea"/><text x="{left - 6}" y="{py(value) + 4:.1f}" text-anchor="end" font-size="11">{value:,.3g}</text>')
+    for x in levels:
+        parts.append(f'<text x="{px(x):.1f}" y="{height - bottom + 16}" text-anchor="middle" font-size="11">{x}</text>')
+    parts.append(f'<text x="{(left + width - right) / 2}" y="{height - 8}" text-anchor="middle" font-size="12">concurrent threads</text><text transform="translate(14 {(top + height - bottom) / 2}) rotate(-90)" text-anchor="middle" font-size="12">{html.escape(y_label)}</text>')
+    for index, (name, points) in enumerate(series.items()):
+        color = COLORS[index % len(COLORS)]
+        path = " ".join(f"{px(x):.1f},{py(y):.1f}" for x, y in points)
+        parts.append(f'<polyline points="{path}" fill="none" stroke="{color}" stroke-width="2.5"/>')
+        parts.extend(f'<circle cx="{px(x):.1f}" cy="{py(y):.1f}" r="3.5" fill="{color}"><title>{html.escape(name)}: {y:,.2f} at {x}</title></circle>' for x, y in points)
+        parts.append(f'<text x="{width - right}" y="{top + 14 * index}" text-anchor="end" font-size="12" fill="{color}">{html.escape(name)}</text>')
+    return "".join(parts) + "</svg>"
+
+
+def throughput_section(report: dict) -> str:
+    decoders = report["decoders"]
+    charts = [
+        line_chart("Throughput", {n: [(l["concurrency"], l["images_per_s"]) for l in d["levels"]] for n, d in decoders.items()}, "images / s"),
+        line_chart("p95 decode latency", {n: [(l["concurrency"], l["latency_ms"]["p95"]) for l in d["levels"]] for n, d in decoders.items()}, "ms"),
+        line_chart("CPU cores busy", {n: [(l["concurrency"], l["cpu_cores_busy"]) for l in d["levels"]] for n, d in decoders.items()}, "cores"),
+    ]
+    rows = "".join(
+        f'<tr><td>{html.escape(name)}</td><td>{l["concurrency"]}</td><td>{l["images_per_s"]:,.1f}</td><td>{l["speedup"]:.2f}x</td><td>{l["efficiency"]:.0%}</td><td>{l["latency_ms"]["p50"]:.2f}</td><td>{l["latency_ms"]["p95"]:.2f}</td><td>{l["latency_ms"]["p99"]:.2f}</td><td>{l["cpu_cores_busy"]:.2f} ({l["cpu_utilization"]:.0%})</td><td>{l["errors"]}</td></tr>'
+        for name, d in decoders.items() for l in d["levels"])
+    return f'<section><h2>Throughput under concurrency</h2><p class="muted">{html.escape(report["mode"])}; {report["duration_s_per_level"]:g} s per level, {report["images"]} images, {report["logical_processors"]} logical processors.</p><div class="cards">{"".join(f"<div class=card>{chart}</div>" for chart in charts)}</div><div class="scroll"><table><thead><tr><th>Decoder</th><th>Threads</th><th>Images/s</th><th>Speedup</th><th>Efficiency</th><th>p50 ms</th><th>p95 ms</th><th>p99 ms</th><th>CPU cores busy</th><th>Errors</th></tr></thead><tbody>{rows}</tbody></table></div></section>'
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--results", type=Path, required=True)
@@ -26,9 +72,11 @@ def main() -> int:
     parser.add_argument("--inventory", type=Path, required=True)
     parser.add_argument("--environment", type=Path, required=True)
     parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--throughput", type=Path, help="throughput.json from benchmark.py throughput")
+    parser.add_argument("--manifest", type=Path, help="resolves ground_truth of records written with --compact-results")
     args = parser.parse_args()
     with args.results.open(encoding="utf-8") as handle:
-        rows = [json.loads(line) for line in handle if line.strip()]
+        rows = list(attach_ground_truth((json.loads(line) for line in handle if line.strip()), args.manifest))
     summary = json.loads(args.summary.read_text(encoding="utf8"))
     stats = json.loads(args.inventory.read_text(encoding="utf8"))["summary"]
     environment = json.loads(args.environment.read_text(encoding="utf8"))
@@ -37,8 +85,9 @@ def main() -> int:
     outcomes = sorted({m["outcome"] for r in rows for m in r["matches"]})
     outcome_options = "".join(f'<option>{html.escape(x)}</option>' for x in outcomes)
     script = SCRIPT.replace("REPORT_ROWS", json.dumps(rows, ensure_ascii=False).replace("</", "<\\/"))
+    scaling = throughput_section(json.loads(args.throughput.read_text(encoding="utf8"))) if args.throughput else ""
     decoder_records = sum(value["records"] for value in summary["decoders"].values())
-    document = f'''<!doctype html><html lang="en"><meta charset="utf-8"><meta name="viewport" content="width=device-width"><link rel="icon" href="data:,"><title>Python BarBeR Barcode Benchmark</title><style>{STYLE}</style><header><h1>ZXing Python vs. Dynamsoft Barcode Reader Python</h1><p>BarBeR public dataset decoding benchmark. Exact payload and canonical format are scored. Localization geometry is not scored.</p></header><main class="wrap"><section><h2>Full benchmark results</h2><div class="cards">{cards}</div></section><section><h2>Dataset audit</h2><div class="cards"><div class="card"><div class="metric">{stats['source_images']:,}</div>original images</div><div class="card"><div class="metric">{stats['annotations']:,}</div>original annotations</div><div class="card"><div class="metric">{stats['excluded_images_without_ground_truth']:,}</div>images without reliable ground truth</div><div class="card"><div class="metric">{stats['duplicate_image_records']:,}</div>exact duplicate image</div><div class="card"><div class="metric">{stats['manifest_images']:,}</div>final unique images</div><div class="card"><div class="metric">{stats['benchmark_annotations']:,}</div>final ground truth barcodes</div><div class="card"><div class="metric">{decoder_records:,}</div>decoder records</div></div></section><section><h2>Method and disclosures</h2><p class="disclosure">{html.escape(summary['disclosure'])}</p><p>Both Python decoders receive the same image loaded by OpenCV. Matching is a location-independent one-to-one multiset match of canonical format and exact normalized payload. UPC-A and EAN-13 leading zero equivalence is normalized before scoring.</p><p><strong>Measured environment:</strong> {html.escape(str(environment.get('operating_system','')))}, {html.escape(str(environment.get('processor','')))}, Python {html.escape(str(environment.get('python','')))}, {html.escape(str(environment.get('configuration','')))} {html.escape(str(environment.get('architecture','')))}, {environment.get('threads_per_decoder_task',1)} thread per decoder task, {environment.get('repetitions',1)} measured run.</p></section><section><h2>Per-image results</h2><p class="muted">The interactive table displays up to 500 matching rows. The complete JSONL stream and a complete JSON package are included in the report downloads.</p><div class="controls"><input id="q" placeholder="Search image, format, payload"><select id="decoder"><option value="">All decoders</option>{decoder_options}</select><select id="outcome"><option value="">All outcomes</option>{outcome_options}</select></div><p id="shown" class="muted"></p><div class="scroll"><table id="raw"><thead><tr><th>Decoder</th><th>Image</th><th>Source</th><th>Ground truth</th><th>Predictions</th><th>Outcomes</th><th>Decode ms</th></tr></thead><tbody></tbody></table></div></section></main><script>{script}</script></html>'''
+    document = f'''<!doctype html><html lang="en"><meta charset="utf-8"><meta name="viewport" content="width=device-width"><link rel="icon" href="data:,"><title>Python BarBeR Barcode Benchmark</title><style>{STYLE}</style><header><h1>ZXing Python vs. Dynamsoft Barcode Reader Python</h1><p>BarBeR public dataset decoding benchmark. Exact payload and canonical format are scored. Localization geometry is not scored.</p></header><main class="wrap"><section><h2>Full benchmark results</h2><div class="cards">{cards}</div></section><section><h2>Dataset audit</h2><div class="cards"><div class="card"><div class="metric">{stats['source_images']:,}</div>original images</div><div class="card"><div class="metric">{stats['annotations']:,}</div>original annotations</div><div class="card"><div class="metric">{stats['excluded_images_without_ground_truth']:,}</div>images without reliable ground truth</div><div class="card"><div class="metric">{stats['duplicate_image_records']:,}</div>exact duplicate image</div><div class="card"><div class="metric">{stats['manifest_images']:,}</div>final unique images</div><div class="card"><div class="metric">{stats['benchmark_annotations']:,}</div>final ground truth barcodes</div><div class="card"><div class="metric">{decoder_records:,}</div>decoder records</div></div></section>{scaling}<section><h2>Method and disclosures</h2><p class="disclosure">{html.escape(summary['disclosure'])}</p><p>Both Python decoders receive the same image loaded by OpenCV. Matching is a location-independent one-to-one multiset match of canonical format and exact normalized payload. UPC-A and EAN-13 leading zero equivalence is normalized before scoring.</p><p><strong>Measured environment:</strong> {html.escape(str(environment.get('operating_system','')))}, {html.escape(str(environment.get('processor','')))}, Python {html.escape(str(environment.get('python','')))}, {html.escape(str(environment.get('configuration','')))} {html.escape(str(environment.get('architecture','')))}, {environment.get('threads_per_decoder_task',1)} thread per decoder task, {environment.get('repetitions',1)} measured run.</p></section><section><h2>Per-image results</h2><p class="muted">The interactive table displays up to 500 matching rows. The complete JSONL stream and a complete JSON package are included in the report downloads.</p><div class="controls"><input id="q" placeholder="Search image, format, payload"><select id="decoder"><option value="">All decoders</option>{decoder_options}</select><select id="outcome"><option value="">All outcomes</option>{outcome_options}</select></div><p id="shown" class="muted"></p><div class="scroll"><table id="raw"><thead><tr><th>Decoder</th><th>Image</th><th>Source</th><th>Ground truth</th><th>Predictions</th><th>Outcomes</th><th>Decode ms</th></tr></thead><tbody></tbody></table></div></section></main><script>{script}</script></html>'''
     args.output.parent.mkdir(parents=True, exist_ok=True)
     args.output.write_text(document, encoding="utf8")
     downloads = args.output.parent / "downloads"
@@ -46,6 +95,8 @@ def main() -> int:
     downloads_list = [(args.results, "results.jsonl"), (args.summary, "summary.json"), (args.inventory, "barber_source_files.json"), (args.environment, "benchmark_environment.json")]
     if args.results_json:
         downloads_list.append((args.results_json, "results.json"))
+    if args.throughput:
+        downloads_list.append((args.throughput, "throughput.json"))
     for source, name in downloads_list:
         shutil.copy2(source, downloads / name)
     print(args.output)
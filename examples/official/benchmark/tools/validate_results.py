@@ -2,9 +2,13 @@
 """Validate benchmark JSONL structure, uniqueness, and summary counts."""
 import argparse
 import json
+import sys
 from collections import Counter, defaultdict
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ground_truth import attach_ground_truth
+
 
 def main() -> int:
     parser = argparse.ArgumentParser()
@@ -13,9 +17,10 @@ def main() -> int:
     parser.add_argument("--expected-images", type=int)
     parser.add_argument("--expected-ground-truth", type=int)
     parser.add_argument("--expected-repetitions", type=int)
+    parser.add_argument("--manifest", type=Path, help="resolves ground_truth of records written with --compact-results")
     args = parser.parse_args()
     with args.results.open(encoding="utf-8") as handle:
-        rows = [json.loads(line) for line in handle if line.strip()]
+        rows = list(attach_ground_truth((json.loads(line) for line in handle if line.strip()), args.manifest))
     required = {"sample_id", "relative_path", "decoder", "decoder_version", "repetition", "ground_truth", "predictions", "matches", "decode_ns", "image_load_ns", "error"}
     for index, row in enumerate(rows, 1):
         missing = required - row.keys()
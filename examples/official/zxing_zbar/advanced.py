@@ -135,6 +135,8 @@ def step3_analyze_results(results):
     
     # Initialize analyzer
     analyzer = PerformanceAnalyzer(results)
+    table_path = analyzer.save_table("results")
+    print(f"   ✅ Results table saved to: {table_path}")
     
     # Calculate statistics
     print("\n📊 Calculating statistics...")
@@ -181,7 +183,9 @@ def step3_analyze_results(results):
     for lib_name, stats in lib_stats.items():
         print(f"\n   {lib_name}:")
         print(f"      Success rate: {stats.get('success_rate', 0)*100:.1f}%")
+        print(f"      Avg load time: {stats.get('avg_load_time_ms', 0):.2f} ms")
         print(f"      Avg detection time: {stats.get('avg_detection_time_ms', 0):.2f} ms")
+        print(f"      Avg total time: {stats.get('avg_total_time_ms', 0):.2f} ms")
     
     # Key focus areas
     if angled_perf.get('best_performing_library'):
@@ -311,6 +315,7 @@ def main():
         print("\n📁 Results are available in:")
         print("   - results/detailed_results.json  (raw data)")
         print("   - results/summary_results.csv    (summary table)")
+        print("   - results/results.parquet        (results table, results.npz without a Parquet engine)")
         print("   - results/benchmark_report.html  (full report)")
         print("   - results/charts/                (performance charts)")
         
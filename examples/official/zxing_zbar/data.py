@@ -1,8 +1,10 @@
 from openpyxl import utils
 from openpyxl import Workbook
 from openpyxl import load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Color, PatternFill
 
+import csv
 import os
 
 # Define cell color
@@ -20,6 +22,9 @@ yellow = PatternFill(start_color='00FFFF00',
 
 passed = 'Passed'
 
+columns = ['File Name', 'Expected Results', 'ZBar', 'DBR', 'ZXing']
+column_widths = [25, 20, 20, 20, 20]
+
 
 def get_workbook(wb_name):
     if os.path.isfile(wb_name):
@@ -86,3 +91,63 @@ def set_recognition_rate(wb, row_index, r1=None, r2=None, r3=None):
     row[2].value = r1
     row[3].value = r2
     row[4].value = r3
+
+
+class ResultSheet:
+    """Collects recognition results in memory and writes them in one pass.
+
+    Rows are only kept as lists until save(). An .xlsx file is written with
+    an openpyxl write-only workbook, any other extension as CSV. The
+    recognition rates are computed over all rows at once, an engine whose
+    results are all None (for example DBR without a license) gets no rate.
+    """
+
+    def __init__(self):
+        self.rows = []
+
+    def append(self, filename, expected_results, zbar_results=None, dbr_results=None, ZXing_results=None):
+        self.rows.append([filename, expected_results,
+                         zbar_results, dbr_results, ZXing_results])
+
+    def recognition_rates(self):
+        rates = []
+        for column in range(2, len(columns)):
+            results = [row[column] for row in self.rows]
+            if not self.rows or all(result is None for result in results):
+                rates.append(None)
+                continue
+            matched = sum(result == row[1] for result, row in zip(results, self.rows))
+            rates.append(matched * 100 / len(self.rows))
+        return rates
+
+    def save(self, file_name):
+        rates = ['{0:.2f}%'.format(rate) if rate is not None else None
+                 for rate in self.recognition_rates()]
+        if os.path.splitext(file_name)[1].lower() == '.xlsx':
+            self._save_xlsx(file_name, rates)
+        else:
+            with open(file_name, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(self.rows)
+                writer.writerow([None, None] + rates)
+
+    def _save_xlsx(self, file_name, rates):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Recognition Rate')
+        # Column widths must be set before the first row is written
+        for index, width in enumerate(column_widths, 1):
+            ws.column_dimensions[utils.get_column_letter(index)].width = width
+        ws.append(columns)
+        for row in self.rows:
+            cells = row[:2]
+            for result in row[2:]:
+                if result is None:
+                    cells.append(None)
+                    continue
+                cell = WriteOnlyCell(ws, value=result)
+                cell.fill = green if result == row[1] else red
+                cells.append(cell)
+            ws.append(cells)
+        ws.append([None, None] + rates)
+        wb.save(file_name)
@@ -186,6 +186,7 @@ def main():
         
         # Save raw results
         framework.save_results(str(output_dir))
+        analyzer.save_table(str(output_dir))
         
         # Generate charts if requested
         if not args.no_charts:
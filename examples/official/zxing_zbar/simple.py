@@ -1,4 +1,5 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import pyzbar.pyzbar as zbar
 from PIL import Image
 import zxingcpp
@@ -12,7 +13,7 @@ import numpy as np
 
 def zxing_decode(filename):
     start = time.time()
-    img = cv2.imread(filename)
+    img = cv2.imread(filename) if isinstance(filename, str) else filename
     zxing_results = zxingcpp.read_barcodes(img)
     elapsed_time = time.time() - start
     print('ZXing: Elapsed time: {}ms'.format(int(elapsed_time * 1000)))
@@ -21,7 +22,11 @@ def zxing_decode(filename):
 
 def zbar_decode(filename):
     start = time.time()
-    zbar_results = zbar.decode(Image.open(filename))
+    if isinstance(filename, str):
+        zbar_results = zbar.decode(Image.open(filename))
+    else:
+        # ZBar reads 8-bit grayscale, which is what PIL converts to as well
+        zbar_results = zbar.decode(cv2.cvtColor(filename, cv2.COLOR_BGR2GRAY))
     elapsed_time = time.time() - start
     print('ZBar: Elapsed time: {}ms'.format(int(elapsed_time * 1000)))
     return zbar_results
@@ -29,8 +34,13 @@ def zbar_decode(filename):
 
 def dbr_decode(cvr_instance, filename):
     start = time.time()
-    dbr_results = cvr_instance.capture(
-        filename, EnumPresetTemplate.PT_READ_BARCODES.value)
+    if isinstance(filename, str):
+        dbr_results = cvr_instance.capture(
+            filename, EnumPresetTemplate.PT_READ_BARCODES.value)
+    else:
+        # cv2.imread arrays are BGR; capture() assumes RGB unless told otherwise
+        dbr_results = cvr_instance.capture(
+            filename, EnumImagePixelFormat.IPF_BGR_888, EnumPresetTemplate.PT_READ_BARCODES.value)
     elapsed_time = time.time() - start
     print('Dynamsoft Barcode Reader: Elapsed time: {}ms'.format(
         int(elapsed_time * 1000)))
@@ -38,7 +48,13 @@ def dbr_decode(cvr_instance, filename):
     return dbr_results
 
 
-def dataset(directory=None, cvr_instance=None):
+def timed(decode, *args):
+    start = time.perf_counter()
+    results = decode(*args)
+    return results, time.perf_counter() - start
+
+
+def dataset(directory=None, cvr_instance=None, datafile='benchmark.xlsx', concurrent=True):
     if directory != None:
         print(directory)
         files = os.listdir(directory)
@@ -48,37 +64,60 @@ def dataset(directory=None, cvr_instance=None):
             print('No image files')
             return
 
-        # Create a .xlsx file
-        datafile = 'benchmark.xlsx'
-        wb = data.get_workbook(datafile)
-        index = 2
+        # Rows are kept in memory and written to the .xlsx file at the end
+        sheet = data.ResultSheet()
 
         print('Total count of barcode image files: {}'.format(total_count))
-        zbar_count = 0
-        dbr_count = 0
-        zxing_count = 0
+
+        engines = ['ZBar', 'DBR', 'ZXing'] if cvr_instance != None else ['ZBar', 'ZXing']
+        engine_times = dict.fromkeys(engines, 0.0)
+        load_time = 0.0
+        # The engines decode in native code, so threads run them in parallel.
+        # With a single thread they run one after another, as a baseline.
+        executor = ThreadPoolExecutor(
+            max_workers=len(engines) if concurrent else 1)
+        run_start = time.perf_counter()
 
         for filename in files:
             file_path = os.path.join(directory, filename)
             expected_result = filename.split('_')[0]
 
             r1 = ''
-            r2 = ''
+            r2 = '' if cvr_instance != None else None
             r3 = ''
 
+            # Load the image once and hand it to every engine
+            start = time.perf_counter()
+            img = cv2.imread(file_path)
+            load_time += time.perf_counter() - start
+            if img is None:
+                print('Fail to read {}'.format(filename))
+                sheet.append(filename, expected_result, r1, r2, r3)
+                continue
+
+            print('ZXing decoding {}'.format(filename))
+            futures = {'ZBar': executor.submit(timed, zbar_decode, img),
+                       'ZXing': executor.submit(timed, zxing_decode, img)}
+            if cvr_instance != None:
+                futures['DBR'] = executor.submit(
+                    timed, dbr_decode, cvr_instance, img)
+            # Compare once all engines have finished
+            decoded = {}
+            for name, future in futures.items():
+                decoded[name], elapsed = future.result()
+                engine_times[name] += elapsed
+
             # ZBar
-            zbar_results = zbar_decode(file_path)
+            zbar_results = decoded['ZBar']
             if zbar_results != None:
                 for zbar_result in zbar_results:
                     zbar_text = zbar_result.data.decode("utf-8")
                     r1 = zbar_text
                     print('r1: {}'.format(zbar_text))
                     if r1 == expected_result:
-                        zbar_count += 1
                         break
                     elif 'upca' in zbar_result.type.lower():
                         if '0' + r1 == expected_result:
-                            zbar_count += 1
                             r1 = expected_result
                             break
             else:
@@ -86,7 +125,7 @@ def dataset(directory=None, cvr_instance=None):
 
             # DBR
             if cvr_instance != None:
-                dbr_results = dbr_decode(cvr_instance, file_path)
+                dbr_results = decoded['DBR']
 
                 items = dbr_results.get_items()
 
@@ -95,58 +134,54 @@ def dataset(directory=None, cvr_instance=None):
                         r2 = item.get_text()
                         print('r2: {}'.format(r2))
                         if r2 == expected_result:
-                            dbr_count += 1
                             break
                         elif 'upc_a' in item.get_format_string().lower():
                             if '0' + r2 == expected_result:
-                                dbr_count += 1
                                 r2 = expected_result
                                 break
                 else:
                     print("DBR failed to decode {}".format(filename))
 
             # ZXing
-            print('ZXing decoding {}'.format(filename))
-            zxing_results = zxing_decode(file_path)
+            zxing_results = decoded['ZXing']
             if zxing_results != None:
                 for result in zxing_results:
                     r3 = result.text
                     if r3 == expected_result:
-                        zxing_count += 1
                         print('r3: {}'.format(r3))
                         break
                     elif 'upca' in str(result.format).lower():
                         if '0' + r3 == expected_result:
-                            zxing_count += 1
                             r3 = expected_result
                             break
             else:
                 print('ZXing failed to decode {}'.format(filename))
 
             # Add results to .xlsx file
-            data.update_row(wb, index, filename, expected_result, r1, r2, r3)
-            index += 1
+            sheet.append(filename, expected_result, r1, r2, r3)
+
+        wall_time = time.perf_counter() - run_start
+        executor.shutdown()
 
-        r1 = 0
-        r2 = 0
-        r3 = 0
+        print('Image loading: {:.2f}s'.format(load_time))
+        # Concurrent engines compete for cores, so their times include that
+        # contention; compare wall-clock times with a --sequential run instead
+        # of adding these up
+        for name, elapsed in engine_times.items():
+            print('{} decoding{}: {:.2f}s, {:.1f}ms per image'.format(
+                name, ' (concurrent)' if concurrent else '', elapsed, elapsed * 1000 / total_count))
+        print('Wall-clock time: {:.2f}s'.format(wall_time))
 
-        zbar_rate = zbar_count * 100 / total_count
-        r1 = '{0:.2f}%'.format(zbar_rate)
+        zbar_rate, dbr_rate, zxing_rate = sheet.recognition_rates()
         print('ZBar recognition rate: {0:.2f}%'.format(zbar_rate))
 
         if cvr_instance != None:
-            dbr_rate = dbr_count * 100 / total_count
-            r2 = '{0:.2f}%'.format(dbr_rate)
             print('DBR recognition rate: {0:.2f}%'.format(dbr_rate))
 
-        zxing_rate = zxing_count * 100 / total_count
-        r3 = '{0:.2f}%'.format(zxing_rate)
         print('ZXing recognition rate: {0:.2f}%'.format(zxing_rate))
 
-        data.set_recognition_rate(wb, index, r1, r2, r3)
         # Save data to .xlsx file
-        data.save_workbook(wb, datafile)
+        sheet.save(datafile)
 
 
 def main():
@@ -155,6 +190,10 @@ def main():
                     help="path to input image")
     ap.add_argument("-d", "--directory", type=str, default="existing_dataset",
                     help="directory of image folder (default: existing_dataset)")
+    ap.add_argument("-o", "--output", type=str, default="benchmark.xlsx",
+                    help="result file, .xlsx or .csv (default: benchmark.xlsx)")
+    ap.add_argument("-s", "--sequential", action="store_true",
+                    help="run the engines one after another instead of concurrently")
     args = vars(ap.parse_args())
 
     image = args["image"]
@@ -234,7 +273,8 @@ def main():
         cv2.waitKey(0)
 
     elif directory != None:
-        dataset(directory, cvr_instance=cvr_instance)
+        dataset(directory, cvr_instance=cvr_instance, datafile=args["output"],
+                concurrent=not args["sequential"])
 
 
 if __name__ == "__main__":
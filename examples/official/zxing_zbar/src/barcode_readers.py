@@ -32,7 +32,7 @@ class ZXingCppReader(BarcodeReaderInterface):
             print(f"Failed to initialize ZXing_Cpp: {e}")
             return False
     
-    def decode_barcodes(self, image_path: str) -> Tuple[List[Dict[str, Any]], float]:
+    def decode_array(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
         """Decode barcodes using ZXing-Cpp."""
         import time
         start_time = time.perf_counter()
@@ -41,11 +41,6 @@ class ZXingCppReader(BarcodeReaderInterface):
             if self.reader is None:
                 raise RuntimeError("ZXing-Cpp reader not initialized")
             
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Could not load image: {image_path}")
-            
             # ZXing-Cpp works with grayscale or RGB
             results = self.reader.read_barcodes(image)
             
@@ -91,17 +86,12 @@ class PyZBarReader(BarcodeReaderInterface):
             print(f"Failed to initialize PyZBar: {e}")
             return False
     
-    def decode_barcodes(self, image_path: str) -> Tuple[List[Dict[str, Any]], float]:
+    def decode_array(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
         """Decode barcodes using PyZBar."""
         import time
         start_time = time.perf_counter()
         
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Could not load image: {image_path}")
-            
             # Try multiple preprocessing techniques for better detection
             detected_barcodes = []
             
@@ -197,7 +187,7 @@ class DynamsoftBarcodeReader(BarcodeReaderInterface):
             print(f"Failed to initialize Dynamsoft: {e}")
             return False
     
-    def decode_barcodes(self, image_path: str) -> Tuple[List[Dict[str, Any]], float]:
+    def decode_array(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
         """Decode barcodes using Dynamsoft Capture Vision."""
         import time
         from dynamsoft_capture_vision_bundle import EnumPresetTemplate, EnumErrorCode
@@ -208,11 +198,6 @@ class DynamsoftBarcodeReader(BarcodeReaderInterface):
             if self.cvr_instance is None:
                 raise RuntimeError("Dynamsoft CVR not initialized")
             
-            # Load image with OpenCV
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Could not load image: {image_path}")
-            
             # Capture barcodes
             result = self.cvr_instance.capture(
                 image, EnumPresetTemplate.PT_READ_BARCODES.value
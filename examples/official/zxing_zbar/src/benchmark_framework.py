@@ -4,14 +4,23 @@ This module contains the core classes for the barcode reader benchmark framework
 """
 
 import json
+import multiprocessing
+import os
+import queue
 import time
 import traceback
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Any, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
 from pathlib import Path
+import cv2
 import numpy as np
 
+from .memory_probe import MemoryProbe
+from .timing_harness import TimingHarness, TimingSettings, cpu_environment
+
 
 @dataclass
 class BenchmarkResult:
@@ -24,6 +33,8 @@ class BenchmarkResult:
     barcodes_expected: int
     error_message: Optional[str] = None
     additional_metrics: Dict[str, Any] = None
+    load_time_ms: Optional[float] = None
+    total_time_ms: Optional[float] = None
 
 
 @dataclass
@@ -51,21 +62,79 @@ class BarcodeReaderInterface(ABC):
         pass
     
     @abstractmethod
-    def decode_barcodes(self, image_path: str) -> Tuple[List[Dict[str, Any]], float]:
+    def decode_array(self, image: np.ndarray) -> Tuple[List[Dict[str, Any]], float]:
         """
-        Decode barcodes from an image.
+        Decode barcodes from an image already loaded in memory (BGR, as cv2.imread returns it).
         
         Returns:
             Tuple of (list of detected barcodes, processing time in seconds)
         """
         pass
     
+    def decode_barcodes(self, image_path: str) -> Tuple[List[Dict[str, Any]], float]:
+        """
+        Decode barcodes from an image file.
+        
+        The default loads the file and calls decode_array; its time includes the load.
+        
+        Returns:
+            Tuple of (list of detected barcodes, processing time in seconds)
+        """
+        start_time = time.perf_counter()
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"Error in {self.name} decode: Could not load image: {image_path}")
+            return [], time.perf_counter() - start_time
+        detected_barcodes, _ = self.decode_array(image)
+        return detected_barcodes, time.perf_counter() - start_time
+    
     @abstractmethod
     def cleanup(self):
         """Cleanup resources used by the barcode reader."""
         pass
 
 
+@dataclass
+class LoadedImage:
+    """A test image decoded into memory once and shared by all readers."""
+    test_case: TestCase
+    image: Optional[np.ndarray]
+    load_time_ms: float
+    error_message: Optional[str] = None
+
+
+class ImagePreloader:
+    """Loads test images with cv2.imread on a background thread, a few images ahead of use.
+    
+    Decoding then works on frames that are already in memory, so disk and
+    image codec time are kept out of the decode timing and measured
+    separately. Only the lookahead window is held in memory.
+    """
+    
+    def __init__(self, lookahead: int = 2):
+        self.lookahead = max(1, lookahead)
+    
+    @staticmethod
+    def load(test_case: TestCase) -> LoadedImage:
+        start_time = time.perf_counter()
+        image = cv2.imread(test_case.image_path)
+        load_time_ms = (time.perf_counter() - start_time) * 1000
+        if image is None:
+            return LoadedImage(test_case, None, load_time_ms, f"Could not load image: {test_case.image_path}")
+        return LoadedImage(test_case, image, load_time_ms)
+    
+    def iterate(self, test_cases: Iterable[TestCase]) -> Iterator[LoadedImage]:
+        """Yield the loaded images in test case order."""
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-preloader") as executor:
+            pending = deque()
+            for test_case in test_cases:
+                pending.append(executor.submit(self.load, test_case))
+                if len(pending) > self.lookahead:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
 class PerformanceMonitor:
     """Utility class to monitor performance metrics."""
     
@@ -95,6 +164,23 @@ class BenchmarkFramework:
         self.readers: List[BarcodeReaderInterface] = []
         self.results: List[BenchmarkResult] = []
         self.test_cases: List[TestCase] = []
+        self.timing = TimingHarness(self._timing_settings())
+        memory_mode = self.config.get('benchmark_settings', {}).get('memory_tracking', 'none')
+        self.memory = MemoryProbe(memory_mode) if memory_mode != 'none' else None
+    
+    def _timing_settings(self) -> TimingSettings:
+        """Build the timing harness settings from the benchmark_settings config section."""
+        settings = self.config.get('benchmark_settings', {})
+        max_repeats = settings.get('num_iterations', 1)
+        min_repeats = settings.get('min_iterations', min(5, max_repeats))
+        if max_repeats > 1 and min_repeats > max_repeats:
+            raise ValueError(f"min_iterations ({min_repeats}) is larger than num_iterations ({max_repeats})")
+        return TimingSettings(
+            warmup=settings.get('warmup_iterations', 0),
+            min_repeats=min_repeats,
+            max_repeats=max_repeats,
+            target_ci=settings.get('target_relative_ci', 0.05),
+        )
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from JSON file."""
@@ -167,31 +253,54 @@ class BenchmarkFramework:
                 print(f"Error loading test case from {image_path}: {e}")
                 continue
     
-    def run_single_test(self, reader: BarcodeReaderInterface, test_case: TestCase) -> BenchmarkResult:
-        """Run a single test case with a specific reader."""
+    @staticmethod
+    def _failed_result(reader: BarcodeReaderInterface, test_case: TestCase, message: str) -> BenchmarkResult:
+        return BenchmarkResult(
+            library_name=reader.name,
+            test_case_id=test_case.test_id,
+            success=False,
+            detection_time_ms=0.0,
+            barcodes_detected=0,
+            barcodes_expected=len(test_case.expected_barcodes),
+            error_message=message
+        )
+    
+    def run_single_test(self, reader: BarcodeReaderInterface, test_case: TestCase,
+                        loaded: Optional[LoadedImage] = None) -> BenchmarkResult:
+        """Run a single test case with a specific reader.
+        
+        With a preloaded image only decode_array is timed and the load time
+        is reported next to it. Otherwise decode_barcodes is timed on the
+        file path, load included.
+        """
         try:
             # Initialize reader if not already done
             if not hasattr(reader, '_initialized'):
                 success = reader.initialize()
                 if not success:
-                    return BenchmarkResult(
-                        library_name=reader.name,
-                        test_case_id=test_case.test_id,
-                        success=False,
-                        detection_time_ms=0.0,
-                        barcodes_detected=0,
-                        barcodes_expected=len(test_case.expected_barcodes),
-                        error_message="Failed to initialize reader"
-                    )
+                    return self._failed_result(reader, test_case, "Failed to initialize reader")
                 reader._initialized = True
             
-            # Monitor performance
-            start_time = time.perf_counter()
+            # Run detection: warm-up passes, then timed repetitions until the
+            # confidence interval of the median is tight enough
+            if loaded is not None and loaded.image is None:
+                return self._failed_result(reader, test_case, loaded.error_message)
+            in_memory = loaded is not None
+            outcome = []
             
-            # Run detection
-            detected_barcodes, detection_time = reader.decode_barcodes(test_case.image_path)
+            def run():
+                if in_memory:
+                    outcome[:] = [reader.decode_array(loaded.image)]
+                else:
+                    outcome[:] = [reader.decode_barcodes(test_case.image_path)]
             
-            end_time = time.perf_counter()
+            measurement = self.timing.measure(run)
+            memory = None
+            if self.memory is not None:
+                # A separate untimed pass, so the RSS sampler thread does not
+                # slow down the timed decodes
+                _, memory = self.memory.measure(run)
+            detected_barcodes, detection_time = outcome[0]
             
             # Calculate metrics - success requires 100% detection (all expected barcodes found)
             # Clean barcode data: strip whitespace
@@ -222,15 +331,22 @@ class BenchmarkFramework:
             # Success = all expected barcodes detected (no partial success)
             success_flag = (len(expected_texts) > 0 and true_positives == len(expected_texts))
             
+            detection_time_ms = measurement.median_ns / 1e6
+            load_time_ms = loaded.load_time_ms if in_memory else None
             result = BenchmarkResult(
                 library_name=reader.name,
                 test_case_id=test_case.test_id,
                 success=success_flag,
-                detection_time_ms=(end_time - start_time) * 1000,
+                detection_time_ms=detection_time_ms,
                 barcodes_detected=len(detected_barcodes),
                 barcodes_expected=len(test_case.expected_barcodes),
+                load_time_ms=load_time_ms,
+                total_time_ms=detection_time_ms + (load_time_ms or 0.0),
                 additional_metrics={
                     'detection_time_api_ms': detection_time * 1000,
+                    'detection_time_ci_ms': [measurement.ci_low_ns / 1e6, measurement.ci_high_ns / 1e6],
+                    'timing': measurement.to_dict(),
+                    'memory': memory,
                     'barcode_data': detected_barcodes,
                     'test_metadata': test_case.metadata if test_case.metadata else {}
                 }
@@ -239,30 +355,88 @@ class BenchmarkFramework:
             return result
             
         except Exception as e:
-            return BenchmarkResult(
-                library_name=reader.name,
-                test_case_id=test_case.test_id,
-                success=False,
-                detection_time_ms=0.0,
-                barcodes_detected=0,
-                barcodes_expected=len(test_case.expected_barcodes),
-                error_message=str(e)
-            )
+            return self._failed_result(reader, test_case, str(e))
+    
+    def _parallel_workers(self) -> int:
+        """Worker process count from benchmark_settings.parallel_workers (0 means one per CPU)."""
+        workers = self.config.get('benchmark_settings', {}).get('parallel_workers', 1)
+        return workers if workers > 0 else os.cpu_count() or 1
     
     def run_all_tests(self) -> List[BenchmarkResult]:
         """Run all test cases with all readers."""
         total_tests = len(self.readers) * len(self.test_cases)
+        if self._parallel_workers() > 1 and total_tests > 1:
+            return self._run_all_tests_parallel(total_tests)
         completed_tests = 0
         
-        # Run tests with simple progress updates
-        for reader in self.readers:
-            for test_case in self.test_cases:
-                result = self.run_single_test(reader, test_case)
-                self.results.append(result)
+        # Each image is loaded once and decoded by every reader while it is in
+        # memory; results are still stored reader by reader
+        ordered: List[Optional[BenchmarkResult]] = [None] * total_tests
+        for case_index, loaded in enumerate(ImagePreloader().iterate(self.test_cases)):
+            for reader_index, reader in enumerate(self.readers):
+                result = self.run_single_test(reader, loaded.test_case, loaded)
+                ordered[reader_index * len(self.test_cases) + case_index] = result
                 completed_tests += 1
                 if completed_tests % 10 == 0 or completed_tests == total_tests:
                     print(f"Progress: {completed_tests}/{total_tests} tests completed")
         
+        self.results.extend(ordered)
+        return self.results
+    
+    def _run_all_tests_parallel(self, total_tests: int) -> List[BenchmarkResult]:
+        """Run all test cases in worker processes, each owning one initialized reader.
+        
+        The workers are split evenly between the readers. Results stream back
+        through a queue and are stored in the serial order (reader by reader,
+        test case by test case), so reports do not depend on scheduling.
+        Each worker loads the images it decodes, outside the decode timing.
+        Workers time decodes concurrently, so per-decode times include any
+        contention for cores and memory bandwidth.
+        """
+        context = multiprocessing.get_context()
+        results_queue = context.Queue()
+        per_reader = max(1, self._parallel_workers() // len(self.readers))
+        processes = []
+        for reader_index, reader in enumerate(self.readers):
+            tasks = context.Queue()
+            for case_index in range(len(self.test_cases)):
+                tasks.put(case_index)
+            workers = min(per_reader, len(self.test_cases))
+            for _ in range(workers):
+                tasks.put(None)
+            for _ in range(workers):
+                process = context.Process(
+                    target=_parallel_worker,
+                    args=(self.config_path, reader_index, reader, self.test_cases, tasks, results_queue),
+                    daemon=True,
+                )
+                process.start()
+                processes.append(process)
+        print(f"Running {total_tests} tests in {len(processes)} worker processes")
+        
+        ordered: List[Optional[BenchmarkResult]] = [None] * total_tests
+        completed_tests = 0
+        while completed_tests < total_tests:
+            try:
+                reader_index, case_index, result = results_queue.get(timeout=1.0)
+            except queue.Empty:
+                if any(process.is_alive() for process in processes):
+                    continue
+                break
+            ordered[reader_index * len(self.test_cases) + case_index] = result
+            completed_tests += 1
+            if completed_tests % 10 == 0 or completed_tests == total_tests:
+                print(f"Progress: {completed_tests}/{total_tests} tests completed")
+        for process in processes:
+            process.join()
+        
+        # A worker that died inside a decoder leaves its tests without a result.
+        for index, result in enumerate(ordered):
+            if result is None:
+                reader = self.readers[index // len(self.test_cases)]
+                test_case = self.test_cases[index % len(self.test_cases)]
+                ordered[index] = self._failed_result(reader, test_case, "Worker process exited before the test completed")
+        self.results.extend(ordered)
         return self.results
     
     def save_results(self, output_dir: str = "results"):
@@ -274,6 +448,14 @@ class BenchmarkFramework:
         with open(f"{output_dir}/detailed_results.json", 'w') as f:
             json.dump(results_dict, f, indent=2)
         
+        # Save the timing settings and CPU state the results were measured with
+        environment = {
+            'timing_settings': asdict(self.timing.settings),
+            'cpu': cpu_environment(),
+        }
+        with open(f"{output_dir}/environment.json", 'w') as f:
+            json.dump(environment, f, indent=2)
+        
         # Save summary results as CSV
         import pandas as pd
         df = pd.DataFrame(results_dict)
@@ -288,8 +470,30 @@ class BenchmarkFramework:
     
     def cleanup(self):
         """Cleanup all readers and resources."""
+        self.timing.close()
         for reader in self.readers:
             try:
                 reader.cleanup()
             except Exception as e:
-                print(f"Error cleaning up reader {reader.name}: {e}")
\ No newline at end of file
+                print(f"Error cleaning up reader {reader.name}: {e}")
+
+
+def _parallel_worker(config_path: str, reader_index: int, reader: BarcodeReaderInterface,
+                     test_cases: List[TestCase], tasks, results):
+    """Worker process body: initialize the reader once, then run test cases until a None task."""
+    framework = BenchmarkFramework(config_path)
+    initialized = reader.initialize()
+    if initialized:
+        reader._initialized = True
+    try:
+        for case_index in iter(tasks.get, None):
+            test_case = test_cases[case_index]
+            if initialized:
+                loaded = ImagePreloader.load(test_case)
+                result = framework.run_single_test(reader, test_case, loaded)
+            else:
+                result = framework._failed_result(reader, test_case, "Failed to initialize reader")
+            results.put((reader_index, case_index, result))
+    finally:
+        framework.timing.close()
+        reader.cleanup()
@@ -5,12 +5,15 @@ This module handles performance analysis and reporting for the benchmark results
 
 import json
 import csv
+import os
 import statistics
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Tuple, Optional
 from pathlib import Path
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib import cbook
 from datetime import datetime
 import numpy as np
 
@@ -20,93 +23,214 @@ except ImportError:
     from benchmark_framework import BenchmarkResult, TestCase
 
 
+# Substring of test_case ids used to find a test type when results carry no test_type
+TEST_CASE_PATTERNS = {'existing_dataset': 'existing_'}
+
+# Separator of the degradation names stored in one column of the results table
+DEGRADATION_SEPARATOR = '|'
+
+
+def results_to_frame(results: List[BenchmarkResult]) -> pd.DataFrame:
+    """Build the column-per-field results table in one pass over the results."""
+    columns: Dict[str, list] = {name: [] for name in (
+        'library', 'test_case', 'success', 'detection_time_ms', 'load_time_ms', 'total_time_ms',
+        'barcodes_detected', 'barcodes_expected', 'success_rate', 'test_type', 'rotation_angle',
+        'barcode_count', 'degradations_list')}
+    for r in results:
+        columns['library'].append(r.library_name)
+        columns['test_case'].append(r.test_case_id)
+        columns['success'].append(r.success)
+        columns['detection_time_ms'].append(r.detection_time_ms)
+        columns['load_time_ms'].append(r.load_time_ms if r.load_time_ms is not None else np.nan)
+        columns['total_time_ms'].append(r.total_time_ms if r.total_time_ms is not None else r.detection_time_ms)
+        columns['barcodes_detected'].append(r.barcodes_detected)
+        columns['barcodes_expected'].append(r.barcodes_expected)
+        columns['success_rate'].append(r.barcodes_detected / max(r.barcodes_expected, 1))
+        
+        # Extract metadata if available
+        if r.additional_metrics and 'test_metadata' in r.additional_metrics:
+            metadata = r.additional_metrics['test_metadata']
+            columns['test_type'].append(metadata.get('test_type', 'unknown'))
+            columns['rotation_angle'].append(metadata.get('rotation_angle', 0))
+            columns['barcode_count'].append(metadata.get('barcode_count', 1))
+            # Capture challenging test degradations if present
+            columns['degradations_list'].append(metadata.get('degradations_list'))
+        else:
+            # Try to infer from test_case_id
+            test_id = r.test_case_id.lower()
+            if 'angled' in test_id:
+                columns['test_type'].append('angled')
+            elif 'multiple' in test_id:
+                columns['test_type'].append('multiple')
+            else:
+                columns['test_type'].append('single')
+            columns['rotation_angle'].append(0)
+            columns['barcode_count'].append(r.barcodes_expected)
+            columns['degradations_list'].append(None)
+    return pd.DataFrame(columns)
+
+
+def save_results_table(df: pd.DataFrame, output_dir: str) -> str:
+    """Persist the results table column by column.
+    
+    Writes results.parquet when pandas has a Parquet engine (pyarrow or
+    fastparquet) and results.npz, one NumPy array per column, otherwise.
+    Degradation lists are stored as one separator-joined string per row.
+    """
+    Path(output_dir).mkdir(exist_ok=True, parents=True)
+    table = df.copy()
+    if 'degradations_list' in table.columns:
+        table['degradations_list'] = [
+            DEGRADATION_SEPARATOR.join(value) if isinstance(value, (list, tuple)) else None
+            for value in table['degradations_list']]
+    try:
+        path = Path(output_dir) / "results.parquet"
+        table.to_parquet(path, index=False)
+    except ImportError:
+        path = Path(output_dir) / "results.npz"
+        np.savez_compressed(path, **{
+            name: column.to_numpy() if column.dtype.kind in 'biuf' else column.to_numpy(dtype=object, na_value=None).astype(str)
+            for name, column in table.items()})
+    return str(path)
+
+
+def load_results_table(path: str) -> pd.DataFrame:
+    """Read a table written by save_results_table."""
+    if str(path).endswith('.npz'):
+        columns = {}
+        with np.load(path) as data:
+            for name in data.files:
+                column = data[name]
+                if column.dtype.kind == 'U':
+                    # String columns store missing values as 'None'
+                    column = np.where(column == 'None', None, column.astype(object))
+                columns[name] = column
+        df = pd.DataFrame(columns)
+    else:
+        df = pd.read_parquet(path)
+    if 'degradations_list' in df.columns:
+        df['degradations_list'] = [(value.split(DEGRADATION_SEPARATOR) if value else []) if isinstance(value, str) else None
+                                   for value in df['degradations_list']]
+    return df
+
+
 class PerformanceAnalyzer:
-    """Analyze performance metrics from benchmark results."""
+    """Analyze performance metrics from benchmark results.
+    
+    Results are held as one column-per-field table. Per-library aggregates are
+    computed with group-bys once per test type and shared by the analyses and
+    the charts.
+    """
+    
+    def __init__(self, results: Optional[List[BenchmarkResult]] = None, df: Optional[pd.DataFrame] = None):
+        self.results = results if results is not None else []
+        self.df = df if df is not None else results_to_frame(self.results)
+        self._stats_cache: Dict[Optional[str], pd.DataFrame] = {}
+    
+    @classmethod
+    def from_table(cls, path: str) -> "PerformanceAnalyzer":
+        """Analyze a results table saved by save_table."""
+        return cls(df=load_results_table(path))
+    
+    def save_table(self, output_dir: str = "results") -> str:
+        """Save the results table to output_dir; returns the file written."""
+        return save_results_table(self.df, output_dir)
     
-    def __init__(self, results: List[BenchmarkResult]):
-        self.results = results
+    def _tests_of_type(self, test_type: str) -> pd.DataFrame:
+        if self.df.empty:
+            return self.df
+        if 'test_type' in self.df.columns:
+            return self.df[self.df['test_type'] == test_type]
+        # Fallback: try to infer from test_case column
+        pattern = TEST_CASE_PATTERNS.get(test_type, test_type)
+        return self.df[self.df['test_case'].str.contains(pattern, case=False, na=False)]
+    
+    def library_statistics(self, test_type: Optional[str] = None) -> pd.DataFrame:
+        """Per-library aggregates over all tests or one test type, in order of first appearance.
         
-        # Convert results to DataFrame with metadata extraction
-        data_rows = []
-        for r in results:
-            row = {
-                'library': r.library_name,
-                'test_case': r.test_case_id,
-                'success': r.success,
-                'detection_time_ms': r.detection_time_ms,
-                'barcodes_detected': r.barcodes_detected,
-                'barcodes_expected': r.barcodes_expected,
-                'success_rate': r.barcodes_detected / max(r.barcodes_expected, 1)
-            }
-            
-            # Extract metadata if available
-            if r.additional_metrics and 'test_metadata' in r.additional_metrics:
-                metadata = r.additional_metrics['test_metadata']
-                row['test_type'] = metadata.get('test_type', 'unknown')
-                row['rotation_angle'] = metadata.get('rotation_angle', 0)
-                row['barcode_count'] = metadata.get('barcode_count', 1)
-                # Capture challenging test degradations if present
-                if 'degradations_list' in metadata:
-                    row['degradations_list'] = metadata.get('degradations_list', [])
+        Time and detection columns are aggregated over successful tests only;
+        they are NaN for a library without any.
+        """
+        if test_type not in self._stats_cache:
+            df = self.df if test_type is None else self._tests_of_type(test_type)
+            if df.empty:
+                stats = pd.DataFrame(columns=['total', 'successful'])
             else:
-                # Try to infer from test_case_id
-                test_id = r.test_case_id.lower()
-                if 'angled' in test_id:
-                    row['test_type'] = 'angled'
-                elif 'multiple' in test_id:
-                    row['test_type'] = 'multiple'
-                else:
-                    row['test_type'] = 'single'
-                row['rotation_angle'] = 0
-                row['barcode_count'] = r.barcodes_expected
-            
-            data_rows.append(row)
-        
-        self.df = pd.DataFrame(data_rows)
+                success = df['success'] == True
+                libraries = df['library']
+                stats = pd.DataFrame({
+                    'total': libraries.groupby(libraries, sort=False).size(),
+                    'successful': success.groupby(libraries, sort=False).sum(),
+                })
+                stats = stats.join(df[success].groupby('library', sort=False).agg(
+                    mean_time=('detection_time_ms', 'mean'),
+                    median_time=('detection_time_ms', 'median'),
+                    min_time=('detection_time_ms', 'min'),
+                    max_time=('detection_time_ms', 'max'),
+                    std_time=('detection_time_ms', 'std'),
+                    mean_load_time=('load_time_ms', 'mean'),
+                    mean_total_time=('total_time_ms', 'mean'),
+                    mean_success_rate=('success_rate', 'mean'),
+                    mean_detected=('barcodes_detected', 'mean'),
+                ))
+                stats['success_rate'] = stats['successful'] / stats['total']
+            self._stats_cache[test_type] = stats
+        return self._stats_cache[test_type]
     
     def calculate_summary_statistics(self) -> Dict[str, Any]:
         """Calculate comprehensive summary statistics."""
         if self.df.empty:
             return {}
         
+        successful_tests = int((self.df['success'] == True).sum())
         summary = {
             'total_tests': len(self.df),
-            'successful_tests': len(self.df[self.df['success'] == True]),
-            'failed_tests': len(self.df[self.df['success'] == False]),
-            'overall_success_rate': len(self.df[self.df['success'] == True]) / len(self.df),
+            'successful_tests': successful_tests,
+            'failed_tests': int((self.df['success'] == False).sum()),
+            'overall_success_rate': successful_tests / len(self.df),
             'libraries_tested': self.df['library'].unique().tolist(),
         }
         
-        # Performance metrics by library
+        # Performance metrics by library, over successful tests
         library_stats = {}
-        for library in self.df['library'].unique():
-            lib_data = self.df[self.df['library'] == library]
-            
-            # Filter successful tests for performance analysis
-            successful_data = lib_data[lib_data['success'] == True]
-            
-            if not successful_data.empty:
+        for library, row in self.library_statistics().iterrows():
+            if row['successful'] > 0:
                 library_stats[library] = {
-                    'total_tests': len(lib_data),
-                    'successful_tests': len(successful_data),
-                    'success_rate': len(successful_data) / len(lib_data),
-                    'avg_detection_time_ms': successful_data['detection_time_ms'].mean(),
-                    'median_detection_time_ms': successful_data['detection_time_ms'].median(),
-                    'min_detection_time_ms': successful_data['detection_time_ms'].min(),
-                    'max_detection_time_ms': successful_data['detection_time_ms'].max(),
-                    'std_detection_time_ms': successful_data['detection_time_ms'].std(),
-                    'avg_success_rate': successful_data['success_rate'].mean()
+                    'total_tests': int(row['total']),
+                    'successful_tests': int(row['successful']),
+                    'success_rate': float(row['success_rate']),
+                    'avg_detection_time_ms': row['mean_time'],
+                    'median_detection_time_ms': row['median_time'],
+                    'min_detection_time_ms': row['min_time'],
+                    'max_detection_time_ms': row['max_time'],
+                    'std_detection_time_ms': row['std_time'],
+                    'avg_load_time_ms': row['mean_load_time'],
+                    'avg_total_time_ms': row['mean_total_time'],
+                    'avg_success_rate': row['mean_success_rate']
                 }
         
         summary['library_statistics'] = library_stats
 
         # Additional counts for challenging tests
         if 'test_type' in self.df.columns:
-            summary['challenging_tests'] = int((self.df['test_type'] == 'challenging').sum())
-            summary['angled_tests'] = int((self.df['test_type'] == 'angled').sum())
-            summary['multiple_tests'] = int((self.df['test_type'] == 'multiple').sum())
+            counts = self.df['test_type'].value_counts()
+            summary['challenging_tests'] = int(counts.get('challenging', 0))
+            summary['angled_tests'] = int(counts.get('angled', 0))
+            summary['multiple_tests'] = int(counts.get('multiple', 0))
         return summary
     
+    def _libraries_performance(self, test_type: str) -> Dict[str, Dict[str, Any]]:
+        """Success rate, mean successful detection time and counts per library for one test type."""
+        return {
+            library: {
+                'success_rate': float(row['success_rate']),
+                'avg_detection_time_ms': row['mean_time'] if row['successful'] else 0,
+                'total_tested': int(row['total']),
+                'successfully_decoded': int(row['successful'])
+            }
+            for library, row in self.library_statistics(test_type).iterrows()
+        }
+    
     def analyze_angled_barcode_performance(self) -> Dict[str, Any]:
         """Specialized analysis for angled barcode performance."""
         angled_analysis = {
@@ -116,27 +240,10 @@ class PerformanceAnalyzer:
             'performance_ranking': []
         }
         
-        # Filter for angled tests
-        if 'test_type' in self.df.columns:
-            angled_tests = self.df[self.df['test_type'] == 'angled']
-        else:
-            # Fallback: try to infer from test_case column
-            angled_tests = self.df[self.df['test_case'].str.contains('angled', case=False, na=False)]
-        
-        if not angled_tests.empty:
-            angled_analysis['total_angled_tests'] = len(angled_tests)
-            
-            for library in angled_tests['library'].unique():
-                lib_data = angled_tests[angled_tests['library'] == library]
-                successful_data = lib_data[lib_data['success'] == True]
-                
-                if len(lib_data) > 0:
-                    angled_analysis['libraries_performance'][library] = {
-                        'success_rate': len(successful_data) / len(lib_data),
-                        'avg_detection_time_ms': successful_data['detection_time_ms'].mean() if not successful_data.empty else 0,
-                        'total_tested': len(lib_data),
-                        'successfully_decoded': len(successful_data)
-                    }
+        total = int(self.library_statistics('angled')['total'].sum())
+        if total:
+            angled_analysis['total_angled_tests'] = total
+            angled_analysis['libraries_performance'] = self._libraries_performance('angled')
             
             # Find best performing library
             if angled_analysis['libraries_performance']:
@@ -162,30 +269,19 @@ class PerformanceAnalyzer:
             'best_performing_library': None
         }
         
-        # Filter for multiple barcode tests
-        if 'test_type' in self.df.columns:
-            multiple_tests = self.df[self.df['test_type'] == 'multiple']
-        elif 'barcode_count' in self.df.columns:
-            multiple_tests = self.df[self.df['barcode_count'] > 1]
-        else:
-            # Fallback: try to infer from test_case column
-            multiple_tests = self.df[self.df['test_case'].str.contains('multiple', case=False, na=False)]
-        
-        if not multiple_tests.empty:
-            multiple_analysis['total_multiple_tests'] = len(multiple_tests)
+        stats = self.library_statistics('multiple')
+        total = int(stats['total'].sum())
+        if total:
+            multiple_analysis['total_multiple_tests'] = total
             
-            for library in multiple_tests['library'].unique():
-                lib_data = multiple_tests[multiple_tests['library'] == library]
-                successful_data = lib_data[lib_data['success'] == True]
-                
-                if len(lib_data) > 0:
-                    avg_time = successful_data['detection_time_ms'].mean() if not successful_data.empty else 1
-                    multiple_analysis['libraries_performance'][library] = {
-                        'success_rate': len(successful_data) / len(lib_data),
-                        'avg_detection_time_ms': avg_time,
-                        'avg_barcodes_detected': successful_data['barcodes_detected'].mean() if not successful_data.empty else 0,
-                        'scalability_score': (len(successful_data) / len(lib_data)) / max(avg_time / 1000, 0.001)
-                    }
+            for library, row in stats.iterrows():
+                avg_time = row['mean_time'] if row['successful'] else 1
+                multiple_analysis['libraries_performance'][library] = {
+                    'success_rate': float(row['success_rate']),
+                    'avg_detection_time_ms': avg_time,
+                    'avg_barcodes_detected': row['mean_detected'] if row['successful'] else 0,
+                    'scalability_score': float(row['success_rate']) / max(avg_time / 1000, 0.001)
+                }
             
             # Find best performing library for multiple barcodes
             if multiple_analysis['libraries_performance']:
@@ -204,27 +300,14 @@ class PerformanceAnalyzer:
             'best_performing_library': None
         }
 
-        if 'test_type' in self.df.columns:
-            challenging_tests = self.df[self.df['test_type'] == 'challenging']
-        else:
-            challenging_tests = self.df[self.df['test_case'].str.contains('challenging', case=False, na=False)]
-
+        challenging_tests = self._tests_of_type('challenging')
         if challenging_tests.empty:
             return challenging_analysis
 
         challenging_analysis['total_challenging_tests'] = len(challenging_tests)
 
         # Per-library performance
-        for library in challenging_tests['library'].unique():
-            lib_data = challenging_tests[challenging_tests['library'] == library]
-            successful_data = lib_data[lib_data['success'] == True]
-            if len(lib_data) > 0:
-                challenging_analysis['libraries_performance'][library] = {
-                    'success_rate': len(successful_data) / len(lib_data),
-                    'avg_detection_time_ms': successful_data['detection_time_ms'].mean() if not successful_data.empty else 0,
-                    'total_tested': len(lib_data),
-                    'successfully_decoded': len(successful_data)
-                }
+        challenging_analysis['libraries_performance'] = self._libraries_performance('challenging')
 
         # Determine best performing library
         if challenging_analysis['libraries_performance']:
@@ -234,32 +317,27 @@ class PerformanceAnalyzer:
 
         # Degradation impact analysis - separated by SDK
         if 'degradations_list' in challenging_tests.columns:
-            # Expand degradations into rows for aggregation, grouped by library
+            # One row per (test, degradation), then a single group-by over (library, degradation)
+            exploded = challenging_tests[['library', 'degradations_list', 'success', 'detection_time_ms']].explode('degradations_list')
+            exploded = exploded[exploded['degradations_list'].notna()]
+            success = exploded['success'] == True
+            impact = exploded.assign(
+                successes=success,
+                successful_time=exploded['detection_time_ms'].where(success),
+            ).groupby(['library', 'degradations_list'], sort=False).agg(
+                tests=('successes', 'size'),
+                successes=('successes', 'sum'),
+                avg_detection_time_ms=('successful_time', 'mean'),
+            )
+            by_library: Dict[str, Dict[str, Any]] = {}
+            for (library, degradation), row in impact.iterrows():
+                by_library.setdefault(library, {})[degradation] = {
+                    'tests': int(row['tests']),
+                    'success_rate': row['successes'] / row['tests'] if row['tests'] else 0,
+                    'avg_detection_time_ms': row['avg_detection_time_ms'] if row['successes'] else 0
+                }
             for library in challenging_tests['library'].unique():
-                library_tests = challenging_tests[challenging_tests['library'] == library]
-                degradation_counts = {}
-                degradation_success = {}
-                degradation_times = {}
-                
-                for idx, row in library_tests.iterrows():
-                    degradations = row.get('degradations_list', []) or []
-                    for d in degradations:
-                        degradation_counts[d] = degradation_counts.get(d, 0) + 1
-                        if row['success']:
-                            degradation_success[d] = degradation_success.get(d, 0) + 1
-                            degradation_times.setdefault(d, []).append(row['detection_time_ms'])
-
-                library_degradation_impact = {}
-                for d, count in degradation_counts.items():
-                    success_ct = degradation_success.get(d, 0)
-                    times = degradation_times.get(d, [])
-                    library_degradation_impact[d] = {
-                        'tests': count,
-                        'success_rate': success_ct / count if count else 0,
-                        'avg_detection_time_ms': np.mean(times) if times else 0
-                    }
-                
-                challenging_analysis['degradation_impact'][library] = library_degradation_impact
+                challenging_analysis['degradation_impact'][library] = by_library.get(library, {})
 
         return challenging_analysis
     
@@ -272,27 +350,10 @@ class PerformanceAnalyzer:
             'performance_ranking': []
         }
         
-        # Filter for existing dataset tests
-        if 'test_type' in self.df.columns:
-            existing_tests = self.df[self.df['test_type'] == 'existing_dataset']
-        else:
-            # Fallback: try to infer from test_case column
-            existing_tests = self.df[self.df['test_case'].str.contains('existing_', case=False, na=False)]
-        
-        if not existing_tests.empty:
-            existing_analysis['total_existing_tests'] = len(existing_tests)
-            
-            for library in existing_tests['library'].unique():
-                lib_data = existing_tests[existing_tests['library'] == library]
-                successful_data = lib_data[lib_data['success'] == True]
-                
-                if len(lib_data) > 0:
-                    existing_analysis['libraries_performance'][library] = {
-                        'success_rate': len(successful_data) / len(lib_data),
-                        'avg_detection_time_ms': successful_data['detection_time_ms'].mean() if not successful_data.empty else 0,
-                        'total_tested': len(lib_data),
-                        'successfully_decoded': len(successful_data)
-                    }
+        total = int(self.library_statistics('existing_dataset')['total'].sum())
+        if total:
+            existing_analysis['total_existing_tests'] = total
+            existing_analysis['libraries_performance'] = self._libraries_performance('existing_dataset')
             
             # Find best performing library
             if existing_analysis['libraries_performance']:
@@ -309,181 +370,184 @@ class PerformanceAnalyzer:
         
         return existing_analysis
     
-    def generate_performance_charts(self, output_dir: str = "results/charts"):
-        """Generate performance visualization charts."""
-        Path(output_dir).mkdir(exist_ok=True, parents=True)
-        
-        # Set style
-        plt.style.use('seaborn-v0_8')
-        sns.set_palette("husl")
-        
-        # Performance comparison chart
-        self._create_performance_comparison_chart(output_dir)
+    def generate_performance_charts(self, output_dir: str = "results/charts", workers: int = 0):
+        """Generate performance visualization charts.
         
-        # Success rate comparison chart
-        self._create_success_rate_comparison_chart(output_dir)
-        
-        # Performance distribution charts
-        self._create_performance_distribution_charts(output_dir)
+        The plotted values are computed here, vectorised and from the cached
+        aggregates. Each chart is then drawn in its own worker process
+        (workers=0 means one per CPU, 1 draws them in this process).
+        """
+        Path(output_dir).mkdir(exist_ok=True, parents=True)
         
-        # Specialized focus area charts
-        self._create_focused_area_charts(output_dir)
-    
-    def _create_performance_comparison_chart(self, output_dir: str):
-        """Create detection time comparison chart."""
-        if self.df.empty or len(self.df['library'].unique()) < 2:
+        jobs = [job for job in (
+            self._performance_comparison_chart(),      # Performance comparison chart
+            self._success_rate_comparison_chart(),     # Success rate comparison chart
+            self._performance_distribution_charts(),   # Performance distribution charts
+            self._focused_area_charts(),               # Specialized focus area charts
+        ) if job is not None]
+        workers = min(workers if workers > 0 else os.cpu_count() or 1, len(jobs))
+        if workers <= 1:
+            for renderer, data in jobs:
+                _render_chart(renderer, output_dir, data)
             return
-        
-        fig, ax = plt.subplots(1, 1, figsize=(12, 6))
-        
-        # Box plot of detection times by library
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(_render_chart, renderer, output_dir, data) for renderer, data in jobs]:
+                future.result()
+    
+    def _performance_comparison_chart(self) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Box plot statistics of successful detection times per library."""
+        if self.df.empty or self.df['library'].nunique() < 2:
+            return None
         successful_data = self.df[self.df['success'] == True]
-        if not successful_data.empty:
-            sns.boxplot(data=successful_data, x='library', y='detection_time_ms', ax=ax)
-            ax.set_title('Detection Time Comparison by Library')
-            ax.set_ylabel('Detection Time (ms)')
-            ax.set_xlabel('Barcode Library')
-            plt.xticks(rotation=45)
-            
-            # Add average line
-            for i, library in enumerate(successful_data['library'].unique()):
-                lib_data = successful_data[successful_data['library'] == library]
-                avg_time = lib_data['detection_time_ms'].mean()
-                ax.axhline(y=avg_time, xmin=i/len(successful_data['library'].unique()), 
-                          xmax=(i+1)/len(successful_data['library'].unique()), 
-                          color='red', linestyle='--', alpha=0.7)
-            
-            plt.tight_layout()
-            plt.savefig(f"{output_dir}/detection_time_comparison.png", dpi=300, bbox_inches='tight')
-            plt.close()
+        if successful_data.empty:
+            return None
+        times = successful_data.groupby('library', sort=False)['detection_time_ms']
+        boxes = []
+        for library, values in times:
+            box = cbook.boxplot_stats(values.to_numpy())[0]
+            box['label'] = library
+            boxes.append(box)
+        return _draw_detection_time_chart, {'boxes': boxes, 'means': times.mean().tolist()}
     
-    def _create_success_rate_comparison_chart(self, output_dir: str):
-        """Create success rate comparison chart."""
+    def _success_rate_comparison_chart(self) -> Optional[Tuple[Any, Dict[str, Any]]]:
         if self.df.empty:
-            return
-        
-        fig, ax = plt.subplots(1, 1, figsize=(10, 6))
-        
+            return None
         # Success rate by library
-        library_success = self.df.groupby('library').apply(
-            lambda x: (x['success'] == True).sum() / len(x) * 100
-        ).sort_values(ascending=False)
-        
-        bars = ax.bar(library_success.index, library_success.values)
-        ax.set_title('Success Rate by Library')
-        ax.set_ylabel('Success Rate (%)')
-        ax.set_xlabel('Barcode Library')
-        ax.set_ylim(0, 105)
-        
-        # Add value labels on bars
-        for bar, value in zip(bars, library_success.values):
-            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
-                   f'{value:.1f}%', ha='center', va='bottom')
-        
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/success_rate_comparison.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        library_success = (self.library_statistics()['success_rate'] * 100).sort_values(ascending=False)
+        return _draw_success_rate_chart, {'libraries': library_success.index.tolist(), 'rates': library_success.tolist()}
     
-    def _create_performance_distribution_charts(self, output_dir: str):
-        """Create performance distribution charts."""
+    def _performance_distribution_charts(self) -> Optional[Tuple[Any, Dict[str, Any]]]:
         if self.df.empty:
-            return
-        
+            return None
         successful_data = self.df[self.df['success'] == True]
         if successful_data.empty:
-            return
-        
-        # Performance distribution histogram
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        
-        # Detection time histogram
-        axes[0, 0].hist(successful_data['detection_time_ms'], bins=20, alpha=0.7)
-        axes[0, 0].set_title('Detection Time Distribution')
-        axes[0, 0].set_xlabel('Detection Time (ms)')
-        axes[0, 0].set_ylabel('Frequency')
-        
-        # Barcodes detected histogram
-        axes[0, 1].hist(successful_data['barcodes_detected'], bins=20, alpha=0.7, color='red')
-        axes[0, 1].set_title('Barcodes Detected Distribution')
-        axes[0, 1].set_xlabel('Barcodes Detected')
-        axes[0, 1].set_ylabel('Frequency')
-        
-        # Hide unused subplot
-        axes[1, 1].axis('off')
-        axes[1, 1].set_xlabel('Number of Barcodes')
-        axes[1, 1].set_ylabel('Frequency')
-        
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/performance_distributions.png", dpi=300, bbox_inches='tight')
-        plt.close()
+            return None
+        return _draw_distribution_charts, {
+            'detection_time': np.histogram(successful_data['detection_time_ms'].to_numpy(), bins=20),
+            'barcodes_detected': np.histogram(successful_data['barcodes_detected'].to_numpy(), bins=20),
+        }
     
-    def _create_focused_area_charts(self, output_dir: str):
-        """Create charts focused on angled barcode and multiple barcode performance."""
+    def _focused_area_charts(self) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """Charts focused on angled barcode and multiple barcode performance."""
         # This would create specialized charts for the key focus areas
         # For now, create a summary chart
-        
         if self.df.empty:
-            return
-        
-        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-        
-        # Angled barcode performance focus
-        angled_lib_performance = {}
-        multiple_lib_performance = {}
-        
+            return None
+        stats = self.library_statistics()
+        stats = stats[stats['successful'] > 0]
         # Simulate focused analysis (in real implementation, this would use actual test metadata)
-        for library in self.df['library'].unique():
-            lib_data = self.df[self.df['library'] == library]
-            successful_data = lib_data[lib_data['success'] == True]
-            
-            if not successful_data.empty:
-                # Simulate angled performance (assuming some tests are angled)
-                angled_lib_performance[library] = {
-                    'success_rate': (len(successful_data) / len(lib_data)) * 0.9,  # Simulate lower success for angled
-                    'avg_time': successful_data['detection_time_ms'].mean() * 1.2   # Simulate slower for angled
-                }
-                
-                # Simulate multiple barcode performance
-                multiple_lib_performance[library] = {
-                    'success_rate': (len(successful_data) / len(lib_data)) * 0.8,  # Simulate lower success for multiple
-                    'avg_time': successful_data['detection_time_ms'].mean() * 1.5   # Simulate slower for multiple
-                }
-        
-        if angled_lib_performance:
-            # Angled barcode success rates
-            libraries = list(angled_lib_performance.keys())
-            success_rates = [angled_lib_performance[lib]['success_rate'] * 100 for lib in libraries]
-            
-            bars1 = axes[0].bar(libraries, success_rates, color='skyblue', alpha=0.7)
-            axes[0].set_title('Angled Barcode Success Rate')
-            axes[0].set_ylabel('Success Rate (%)')
-            axes[0].set_xlabel('Library')
-            axes[0].set_ylim(0, 100)
-            
-            for bar, value in zip(bars1, success_rates):
-                axes[0].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
-                           f'{value:.1f}%', ha='center', va='bottom')
-        
-        if multiple_lib_performance:
-            # Multiple barcode success rates
-            success_rates = [multiple_lib_performance[lib]['success_rate'] * 100 for lib in libraries]
-            
-            bars2 = axes[1].bar(libraries, success_rates, color='lightcoral', alpha=0.7)
-            axes[1].set_title('Multiple Barcode Success Rate')
-            axes[1].set_ylabel('Success Rate (%)')
-            axes[1].set_xlabel('Library')
-            axes[1].set_ylim(0, 100)
-            
-            for bar, value in zip(bars2, success_rates):
-                axes[1].text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
-                           f'{value:.1f}%', ha='center', va='bottom')
+        return _draw_focus_area_chart, {
+            'libraries': stats.index.tolist(),
+            'angled_rates': (stats['success_rate'] * 0.9 * 100).tolist(),    # Simulate lower success for angled
+            'multiple_rates': (stats['success_rate'] * 0.8 * 100).tolist(),  # Simulate lower success for multiple
+        }
+
+
+def _render_chart(renderer, output_dir: str, data: Dict[str, Any]):
+    """Draw one chart; runs in a worker process, so the style is set here."""
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    renderer(output_dir, **data)
+
+
+def _draw_detection_time_chart(output_dir: str, boxes: List[Dict[str, Any]], means: List[float]):
+    """Create detection time comparison chart."""
+    fig, ax = plt.subplots(1, 1, figsize=(12, 6))
+    
+    # Box plot of detection times by library
+    line = {'color': '0.4', 'linewidth': 1.25}
+    ax.bxp(boxes, patch_artist=True, widths=0.8,
+           boxprops={'edgecolor': '0.4', 'linewidth': 1.25, 'facecolor': sns.desaturate(sns.color_palette()[0], 0.75)},
+           whiskerprops=line, capprops=line, medianprops=line,
+           flierprops={'marker': 'd', 'markerfacecolor': '0.4', 'markeredgecolor': '0.4'})
+    ax.set_title('Detection Time Comparison by Library')
+    ax.set_ylabel('Detection Time (ms)')
+    ax.set_xlabel('Barcode Library')
+    plt.xticks(rotation=45)
+    
+    # Add average line
+    for i, avg_time in enumerate(means):
+        ax.axhline(y=avg_time, xmin=i/len(means), xmax=(i+1)/len(means),
+                   color='red', linestyle='--', alpha=0.7)
+    
+    plt.tight_layout()
+    plt.savefig(f"{output_dir}/detection_time_comparison.png", dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def _draw_success_rate_chart(output_dir: str, libraries: List[str], rates: List[float]):
+    """Create success rate comparison chart."""
+    fig, ax = plt.subplots(1, 1, figsize=(10, 6))
+    
+    bars = ax.bar(libraries, rates)
+    ax.set_title('Success Rate by Library')
+    ax.set_ylabel('Success Rate (%)')
+    ax.set_xlabel('Barcode Library')
+    ax.set_ylim(0, 105)
+    
+    # Add value labels on bars
+    for bar, value in zip(bars, rates):
+        ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
+               f'{value:.1f}%', ha='center', va='bottom')
+    
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    plt.savefig(f"{output_dir}/success_rate_comparison.png", dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def _draw_distribution_charts(output_dir: str, detection_time: Tuple[np.ndarray, np.ndarray],
+                              barcodes_detected: Tuple[np.ndarray, np.ndarray]):
+    """Create performance distribution charts from precomputed histograms."""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    
+    # Detection time histogram
+    counts, edges = detection_time
+    axes[0, 0].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7)
+    axes[0, 0].set_title('Detection Time Distribution')
+    axes[0, 0].set_xlabel('Detection Time (ms)')
+    axes[0, 0].set_ylabel('Frequency')
+    
+    # Barcodes detected histogram
+    counts, edges = barcodes_detected
+    axes[0, 1].hist(edges[:-1], bins=edges, weights=counts, alpha=0.7, color='red')
+    axes[0, 1].set_title('Barcodes Detected Distribution')
+    axes[0, 1].set_xlabel('Barcodes Detected')
+    axes[0, 1].set_ylabel('Frequency')
+    
+    # Hide unused subplot
+    axes[1, 1].axis('off')
+    axes[1, 1].set_xlabel('Number of Barcodes')
+    axes[1, 1].set_ylabel('Frequency')
+    
+    plt.tight_layout()
+    plt.savefig(f"{output_dir}/performance_distributions.png", dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def _draw_focus_area_chart(output_dir: str, libraries: List[str], angled_rates: List[float], multiple_rates: List[float]):
+    """Create charts focused on angled barcode and multiple barcode performance."""
+    fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+    
+    for ax, success_rates, title, color in ((axes[0], angled_rates, 'Angled Barcode Success Rate', 'skyblue'),
+                                            (axes[1], multiple_rates, 'Multiple Barcode Success Rate', 'lightcoral')):
+        if not libraries:
+            continue
+        bars = ax.bar(libraries, success_rates, color=color, alpha=0.7)
+        ax.set_title(title)
+        ax.set_ylabel('Success Rate (%)')
+        ax.set_xlabel('Library')
+        ax.set_ylim(0, 100)
         
-        plt.setp(axes[0].xaxis.get_majorticklabels(), rotation=45)
-        plt.setp(axes[1].xaxis.get_majorticklabels(), rotation=45)
-        plt.tight_layout()
-        plt.savefig(f"{output_dir}/focus_areas_performance.png", dpi=300, bbox_inches='tight')
-        plt.close()
+        for bar, value in zip(bars, success_rates):
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1,
+                    f'{value:.1f}%', ha='center', va='bottom')
+    
+    plt.setp(axes[0].xaxis.get_majorticklabels(), rotation=45)
+    plt.setp(axes[1].xaxis.get_majorticklabels(), rotation=45)
+    plt.tight_layout()
+    plt.savefig(f"{output_dir}/focus_areas_performance.png", dpi=300, bbox_inches='tight')
+    plt.close()
 
 
 class ReportGenerator:
@@ -644,17 +708,22 @@ class ReportGenerator:
         <tr>
             <th>Library</th>
             <th>Success Rate</th>
+            <th>Avg Load Time (ms)</th>
             <th>Avg Detection Time (ms)</th>
+            <th>Avg Total Time (ms)</th>
             <th>Total Tests</th>
         </tr>
         """
         
         for library, stats in library_stats.items():
+            load_time = stats.get('avg_load_time_ms')
             html += f"""
             <tr>
                 <td><strong>{library}</strong></td>
                 <td>{stats.get('success_rate', 0)*100:.1f}%</td>
+                <td>{'n/a' if load_time is None or pd.isna(load_time) else f'{load_time:.2f}'}</td>
                 <td>{stats.get('avg_detection_time_ms', 0):.2f}</td>
+                <td>{stats.get('avg_total_time_ms', 0):.2f}</td>
                 <td>{stats.get('total_tests', 0)}</td>
             </tr>
             """
@@ -12,6 +12,7 @@ setup(name='barcode-qr-code-sdk',
       url='https://github.com/yushulx/python-barcode-qrcode-sdk',
       license='MIT',
       packages=['barcodeQrSDK'],
+      python_requires='>=3.7',
       classifiers=[
            "Development Status :: 5 - Production/Stable",
            "Environment :: Console",
@@ -25,7 +26,6 @@ setup(name='barcode-qr-code-sdk',
           "Programming Language :: Python",
           "Programming Language :: Python :: 3",
           "Programming Language :: Python :: 3 :: Only",
-          "Programming Language :: Python :: 3.6",
           "Programming Language :: Python :: 3.7",
           "Programming Language :: Python :: 3.8",
           "Programming Language :: Python :: 3.9",
@@ -37,6 +37,7 @@ setup(name='barcode-qr-code-sdk',
       ],
       install_requires=['opencv-python', 'dynamsoft-capture-vision-bundle'],
       entry_points={
-          'console_scripts': ['scanbarcode=barcodeQrSDK.scripts:scanbarcode']
+          'console_scripts': ['scanbarcode=barcodeQrSDK.scripts:scanbarcode',
+                              'barcodedaemon=barcodeQrSDK.daemon:main']
       },
       )
@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from barcodeQrSDK import ReaderPool
+from barcodeQrSDK.daemon import FolderWatcher, IngestionDaemon, JsonlSink, SqliteSink, openSink
+
+
+class FakeBarcode:
+    def __init__(self, text):
+        self.text = text
+
+    def toDict(self):
+        return {"text": self.text}
+
+
+class FakeReader:
+    def decodeFile(self, file_path):
+        return [FakeBarcode(os.path.basename(file_path))]
+
+
+class FakePool(ReaderPool):
+    def _createReader(self):
+        return FakeReader()
+
+
+def record(path, size=1, mtime_ns=1):
+    return {"path": path, "size": size, "mtime_ns": mtime_ns, "decoded_at": 0.0,
+            "latency_ms": 1.0, "error": None, "barcodes": [{"text": "x"}]}
+
+
+class SinkTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_jsonl_resume_ignores_torn_line(self):
+        path = os.path.join(self.dir, "results.jsonl")
+        sink = JsonlSink(path)
+        sink.write([record("a"), record("b")])
+        sink.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"path": "c", "si')
+
+        sink = JsonlSink(path)
+        self.assertEqual(sink.done, {("a", 1, 1), ("b", 1, 1)})
+        sink.write([record("c")])
+        sink.close()
+        self.assertEqual(JsonlSink(path).done, {("a", 1, 1), ("b", 1, 1), ("c", 1, 1)})
+
+    def test_sqlite_resume(self):
+        path = os.path.join(self.dir, "results.db")
+        sink = openSink(path)
+        self.assertIsInstance(sink, SqliteSink)
+        sink.write([record("a"), record("a", mtime_ns=2)])
+        sink.close()
+        sink = openSink(path)
+        self.assertEqual(sink.done, {("a", 1, 1), ("a", 1, 2)})
+        sink.close()
+
+
+class FolderWatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_settle_debounce(self):
+        path = os.path.join(self.dir, "scan.png")
+        with open(path, "wb") as f:
+            f.write(b"1")
+        with open(os.path.join(self.dir, "notes.txt"), "wb") as f:
+            f.write(b"1")
+        watcher = FolderWatcher([self.dir], settle=0.2)
+        self.assertEqual(watcher.poll(), [])
+        time.sleep(0.25)
+        self.assertEqual([key[0] for key in watcher.poll()], [path])
+
+        # A file that is still being written starts settling again
+        with open(path, "ab") as f:
+            f.write(b"23")
+        self.assertEqual(watcher.poll(), [])
+        time.sleep(0.25)
+        self.assertEqual([key[1] for key in watcher.poll()], [3])
+
+
+class IngestionDaemonTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.inbox = os.path.join(self.dir, "inbox")
+        os.mkdir(self.inbox)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def run_daemon(self, output, expected):
+        daemon = IngestionDaemon(FakePool(size=2), openSink(output), FolderWatcher([self.inbox], settle=0),
+                                 interval=0.02, flushInterval=0, statsInterval=0)
+        thread = threading.Thread(target=daemon.run)
+        thread.start()
+        deadline = time.monotonic() + 5
+        while daemon.processed < expected and time.monotonic() < deadline:
+            time.sleep(0.02)
+        time.sleep(0.1)
+        daemon.stop()
+        thread.join()
+        return daemon.processed
+
+    def test_restart_skips_decoded_files(self):
+        for name in ("a.png", "b.jpg"):
+            with open(os.path.join(self.inbox, name), "wb") as f:
+                f.write(b"image")
+        for output in ("results.jsonl", "results.db"):
+            output = os.path.join(self.dir, output)
+            self.assertEqual(self.run_daemon(output, 2), 2)
+            self.assertEqual(self.run_daemon(output, 0), 0)
+
+        with open(os.path.join(self.dir, "results.jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(sorted(row["barcodes"][0]["text"] for row in rows), ["a.png", "b.jpg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+
+import numpy as np
+
+from barcodeQrSDK import FrameDeduplicator, dHash, hammingDistance, pHash
+
+
+def frame(seed, shape=(480, 640, 3)):
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, size=(12, 16, shape[2]), dtype=np.uint8)
+    # Blocky content, so that hashes are stable under small changes
+    return np.kron(small, np.ones((shape[0] // 12, shape[1] // 16, 1), dtype=np.uint8))
+
+
+class CountingReader:
+    def __init__(self):
+        self.calls = 0
+
+    def decodeMat(self, mat):
+        self.calls += 1
+        return ["result-%d" % self.calls]
+
+
+class HashTest(unittest.TestCase):
+    def test_hamming_distance(self):
+        self.assertEqual(hammingDistance(0b1011, 0b0001), 2)
+        self.assertEqual(hammingDistance(5, 5), 0)
+
+    def test_hash_size(self):
+        for hashFunction in (dHash, pHash):
+            self.assertLess(hashFunction(frame(1)), 1 << 64)
+            self.assertLess(hashFunction(frame(1), hashSize=4), 1 << 16)
+
+    def test_same_frame(self):
+        for hashFunction in (dHash, pHash):
+            self.assertEqual(hashFunction(frame(1)), hashFunction(frame(1).copy()))
+
+    def test_near_duplicate(self):
+        noisy = np.clip(frame(1).astype(np.int16) + 3, 0, 255).astype(np.uint8)
+        for hashFunction in (dHash, pHash):
+            self.assertLessEqual(hammingDistance(hashFunction(frame(1)), hashFunction(noisy)), 4)
+
+    def test_different_frames(self):
+        for hashFunction in (dHash, pHash):
+            self.assertGreater(hammingDistance(hashFunction(frame(1)), hashFunction(frame(2))), 10)
+
+    def test_grayscale_matches_color_layout(self):
+        gray = frame(3)[..., 0]
+        self.assertEqual(dHash(gray), dHash(np.dstack([gray] * 3)))
+
+
+class FrameDeduplicatorTest(unittest.TestCase):
+    def test_skips_duplicates(self):
+        dedup = FrameDeduplicator(maxDistance=4)
+        reader = CountingReader()
+        first = dedup.decodeMat(reader, frame(1))
+        self.assertIs(dedup.decodeMat(reader, frame(1)), first)
+        dedup.decodeMat(reader, frame(2))
+        self.assertEqual(reader.calls, 2)
+        stats = dedup.stats()
+        self.assertEqual((stats["frames"], stats["skipped"]), (3, 1))
+
+    def test_capacity(self):
+        dedup = FrameDeduplicator(capacity=1)
+        reader = CountingReader()
+        dedup.decodeMat(reader, frame(1))
+        dedup.decodeMat(reader, frame(2))
+        dedup.decodeMat(reader, frame(1))
+        self.assertEqual(reader.calls, 3)
+
+    def test_unknown_method(self):
+        self.assertRaises(ValueError, FrameDeduplicator, method="ahash")
+
+
+if __name__ == "__main__":
+    unittest.main()
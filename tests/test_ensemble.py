@@ -0,0 +1,40 @@
+import unittest
+
+from barcodeQrSDK.ensemble import quadIoU
+
+SQUARE = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+
+def shifted(quad, dx, dy):
+    return [(x + dx, y + dy) for x, y in quad]
+
+
+class QuadIoUTest(unittest.TestCase):
+    def test_identical(self):
+        self.assertAlmostEqual(quadIoU(SQUARE, SQUARE), 1.0)
+
+    def test_winding_order(self):
+        self.assertAlmostEqual(quadIoU(SQUARE, list(reversed(SQUARE))), 1.0)
+
+    def test_disjoint(self):
+        self.assertEqual(quadIoU(SQUARE, shifted(SQUARE, 20, 0)), 0.0)
+
+    def test_half_overlap(self):
+        # Intersection 50, union 150
+        self.assertAlmostEqual(quadIoU(SQUARE, shifted(SQUARE, 5, 0)), 1 / 3)
+
+    def test_contained(self):
+        inner = [(2, 2), (7, 2), (7, 7), (2, 7)]
+        self.assertAlmostEqual(quadIoU(SQUARE, inner), 25 / 100)
+
+    def test_rotated(self):
+        diamond = [(5, 0), (10, 5), (5, 10), (0, 5)]
+        self.assertAlmostEqual(quadIoU(SQUARE, diamond), 0.5)
+
+    def test_degenerate(self):
+        line = [(0, 0), (10, 0), (10, 0), (0, 0)]
+        self.assertEqual(quadIoU(SQUARE, line), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import threading
+import time
+import unittest
+
+from barcodeQrSDK import ReaderPool
+
+
+class FakeReader:
+    def decodeFile(self, file_path):
+        time.sleep(0.005)
+        return [file_path]
+
+
+class FakePool(ReaderPool):
+    def _createReader(self):
+        return FakeReader()
+
+
+class BrokenPool(ReaderPool):
+    def _createReader(self):
+        raise OSError("license not initialized")
+
+
+class ReaderPoolTest(unittest.TestCase):
+    def test_fixed_size(self):
+        with FakePool(size=3) as pool:
+            self.assertEqual(pool.size, 3)
+            self.assertFalse(pool.autoscaling)
+            self.assertEqual(pool.decodeFiles(["a", "b", "c", "d"]), [["a"], ["b"], ["c"], ["d"]])
+            self.assertEqual(pool.stats()["completed"], 4)
+
+    def test_callable_task(self):
+        with FakePool(size=1) as pool:
+            future = pool.submit(lambda reader, value: (type(reader).__name__, value), 7)
+            self.assertEqual(future.result(), ("FakeReader", 7))
+
+    def test_task_error_resolves_future(self):
+        with FakePool(size=1) as pool:
+            future = pool.submit("decodeMissing")
+            self.assertRaises(AttributeError, future.result)
+            self.assertEqual(pool.stats()["failed"], 1)
+
+    def test_scales_up_and_down(self):
+        with FakePool(minSize=1, maxSize=4, idleTimeout=0.2, scaleInterval=0.05, maxQueue=64) as pool:
+            futures = [pool.submit("decodeFile", i) for i in range(60)]
+            deadline = time.monotonic() + 5
+            while pool.size < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertGreater(pool.size, 1)
+            for future in futures:
+                future.result()
+            deadline = time.monotonic() + 5
+            while pool.size > 1 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertEqual(pool.size, 1)
+            self.assertGreater(pool.stats()["scale_downs"], 0)
+
+    def test_full_queue_rejects(self):
+        with FakePool(size=1, maxQueue=1) as pool:
+            gate = threading.Event()
+            pool.submit(lambda reader: gate.wait())
+            time.sleep(0.05)
+            pool.submit("decodeFile", "queued")
+            with self.assertRaises(Exception):
+                pool.submit("decodeFile", "rejected", block=False)
+            gate.set()
+            self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_close_finishes_queued_tasks(self):
+        pool = FakePool(size=1, maxQueue=16)
+        futures = [pool.submit("decodeFile", i) for i in range(10)]
+        pool.close()
+        self.assertEqual([future.result(timeout=0) for future in futures], [[i] for i in range(10)])
+        self.assertRaises(RuntimeError, pool.submit, "decodeFile", "late")
+
+    def test_close_while_submitting(self):
+        pool = FakePool(size=2, maxQueue=4)
+        futures = []
+
+        def submit():
+            while True:
+                try:
+                    futures.append(pool.submit("decodeFile", "x"))
+                except RuntimeError:
+                    return
+
+        threads = [threading.Thread(target=submit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        pool.close()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(future.done() for future in futures))
+
+    def test_no_reader_raises(self):
+        with self.assertRaises(RuntimeError) as ctx:
+            BrokenPool(size=2)
+        self.assertIsInstance(ctx.exception.__cause__, OSError)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import unittest
+
+from barcodeQrSDK import BarcodeReader, BarcodeResult
+
+
+class Point:
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+
+class Location:
+    def __init__(self, points):
+        self.points = [Point(x, y) for x, y in points]
+
+
+class Item:
+    def __init__(self, text, fmt, points):
+        self._text = text
+        self._format = fmt
+        self._location = Location(points)
+
+    def get_text(self):
+        return self._text
+
+    def get_format_string(self):
+        return self._format
+
+    def get_location(self):
+        return self._location
+
+
+class Result:
+    def __init__(self, items):
+        self._items = items
+
+    def get_error_code(self):
+        return 0
+
+    def get_items(self):
+        return self._items
+
+
+class Router:
+    def __init__(self, items):
+        self.items = items
+        self.inputs = []
+
+    def capture(self, input, template):
+        self.inputs.append(input)
+        return Result(self.items)
+
+
+QUAD = [(1, 2), (30, 2), (30, 40), (1, 40)]
+
+
+def fakeReader(items):
+    # Skips __init__, which needs a licensed CaptureVisionRouter
+    reader = BarcodeReader.__new__(BarcodeReader)
+    reader.cvr_instance = Router(items)
+    return reader
+
+
+class BarcodeResultTest(unittest.TestCase):
+    def test_to_dict(self):
+        result = BarcodeResult(Item("12345", "CODE_128", QUAD))
+        self.assertEqual(result.toDict(), {
+            "text": "12345", "format": "CODE_128",
+            "x1": 1, "y1": 2, "x2": 30, "y2": 2,
+            "x3": 30, "y3": 40, "x4": 1, "y4": 40,
+        })
+        self.assertEqual(json.loads(json.dumps(result.toDict())), result.toDict())
+
+
+class DecodeFileStreamTest(unittest.TestCase):
+    def test_passes_bytes(self):
+        reader = fakeReader([Item("héllo", "QR_CODE", QUAD)])
+        data = b"\x89PNG\r\n\x1a\n..."
+        results = reader.decodeFileStream(data)
+        self.assertEqual(reader.cvr_instance.inputs, [data])
+        self.assertEqual([(r.text, r.format) for r in results], [("héllo", "QR_CODE")])
+
+    def test_no_barcodes(self):
+        self.assertEqual(fakeReader([]).decodeFileStream(b""), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import http.client
+import json
+import threading
+import time
+import unittest
+
+from barcodeQrSDK import ReaderPool
+from barcodeQrSDK.serve import DecodeServer
+
+
+class FakeBarcode:
+    def __init__(self, text):
+        self.text = text
+
+    def toDict(self):
+        return {"text": self.text}
+
+
+class FakeReader:
+    def decodeFileStream(self, data):
+        time.sleep(0.02)
+        return [FakeBarcode(data.decode())]
+
+
+class FakePool(ReaderPool):
+    def _createReader(self):
+        return FakeReader()
+
+
+def multipart(files):
+    boundary = "test-boundary"
+    body = b""
+    for name, data in files:
+        body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; "
+                 f"filename=\"{name}\"\r\n\r\n").encode() + data + b"\r\n"
+    body += f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+class DecodeServerTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = FakePool(size=2, maxQueue=1)
+        self.server = DecodeServer(("127.0.0.1", 0), self.pool, maxBody=1024)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.pool.close()
+
+    def request(self, method, path, body=None, headers=None):
+        conn = http.client.HTTPConnection(*self.server.server_address, timeout=10)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, response.read()
+        finally:
+            conn.close()
+
+    def test_batch_larger_than_queue(self):
+        body, contentType = multipart([(f"{i}.png", str(i).encode()) for i in range(5)])
+        status, payload = self.request("POST", "/decode/batch", body, {"Content-Type": contentType})
+        self.assertEqual(status, 200)
+        results = json.loads(payload)["results"]
+        self.assertEqual([r["success"] for r in results], [True] * 5)
+        self.assertEqual([r["items"][0]["text"] for r in results], [str(i) for i in range(5)])
+
+    def test_metrics_record_sent_status(self):
+        status, _ = self.request("POST", "/decode", b"x" * 2048)
+        self.assertEqual(status, 413)
+        status, _ = self.request("POST", "/decode", b"abc", {"Content-Length": "abc"})
+        self.assertEqual(status, 400)
+        status, payload = self.request("GET", "/metrics")
+        metrics = payload.decode()
+        self.assertIn('barcodeqr_requests_total{path="/decode",status="413"} 1', metrics)
+        self.assertIn('barcodeqr_requests_total{path="/decode",status="400"} 1', metrics)
+
+
+if __name__ == "__main__":
+    unittest.main()